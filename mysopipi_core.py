@@ -0,0 +1,4503 @@
+"""Mysopipi core: pengolahan Rekapan & Laporan Iklan Shopee tanpa Streamlit.
+
+Modul ini bisa di-import oleh worker, script dan tes tanpa efek samping UI.
+pandas, numpy & rapidfuzz baru benar-benar dimuat saat pertama dipakai.
+Front end Streamlit ada di mysopipi.py.
+"""
+import importlib.util
+import io
+import gzip
+import os
+import sys
+import json
+import sqlite3
+import tempfile
+import zipfile
+import time
+import re
+import hashlib
+import logging
+import threading
+import types
+import multiprocessing
+from contextlib import contextmanager
+from datetime import date, datetime
+from concurrent.futures import ProcessPoolExecutor, Future, FIRST_COMPLETED, wait
+
+try:
+    import fcntl
+except ImportError:  # Windows: file bersama hanya dikunci antar thread
+    fcntl = None
+
+# ============================================
+# IMPORT MALAS & PESAN UNTUK USER
+# ============================================
+
+class _ModulMalas(types.ModuleType):
+    """Pengganti modul yang baru meng-import modul aslinya saat atribut pertamanya diakses.
+
+    importlib.util.LazyLoader tidak thread-safe di Python 3.11: thread yang ikut mengakses saat modul
+    sedang dieksekusi bisa mendapat AttributeError. Di sini import dijalankan lewat import_module biasa
+    (yang sudah memakai lock import per modul), dan proxy tidak pernah dipasang di sys.modules.
+    """
+
+    def __getattr__(self, atribut):
+        modul = importlib.import_module(self.__name__)
+        # Salin isi modul supaya akses berikutnya tidak lagi lewat __getattr__
+        self.__dict__.update(modul.__dict__)
+        return getattr(modul, atribut)
+
+def _impor_malas(nama):
+    """Modul yang baru di-import saat atribut pertamanya diakses (atau modul asli jika sudah di-import)."""
+    if nama in sys.modules:
+        return sys.modules[nama]
+    return _ModulMalas(nama)
+
+pd = _impor_malas('pandas')
+np = _impor_malas('numpy')
+rapidfuzz = _impor_malas('rapidfuzz')
+
+logger = logging.getLogger('mysopipi')
+
+# Penerima peringatan untuk user; front end memasang st.warning, selain itu ke logging
+_PENERIMA_PESAN = {'peringatan': None}
+
+def set_penerima_peringatan(func):
+    """Memasang fungsi penerima peringatan (mis. st.warning); None = kembali ke logging."""
+    _PENERIMA_PESAN['peringatan'] = func
+
+def peringatan(pesan):
+    """Meneruskan peringatan non-fatal ke user."""
+    func = _PENERIMA_PESAN['peringatan']
+    if func is None:
+        logger.warning(pesan)
+    else:
+        func(pesan)
+
+# ============================================
+# ENGINE AGREGASI (PANDAS / DUCKDB)
+# ============================================
+
+def available_backends():
+    """Daftar engine agregasi yang bisa dipakai di environment ini."""
+    tersedia = ['pandas']
+    try:
+        import duckdb  # noqa: F401
+        tersedia.append('duckdb')
+    except ImportError:
+        pass
+    return tersedia
+
+def _groupby_agg_pandas(df, keys, agg_dict):
+    return df.groupby(keys, as_index=False).agg(agg_dict)
+
+def _groupby_agg_duckdb(df, keys, agg_dict):
+    try:
+        import duckdb
+    except ImportError:
+        raise ImportError("Engine 'duckdb' belum terpasang. Jalankan: pip install duckdb")
+
+    def q(col):
+        return '"' + str(col).replace('"', '""') + '"'
+
+    kolom = list(dict.fromkeys(list(keys) + list(agg_dict.keys())))
+    data = df[kolom].copy()
+    data['__row__'] = np.arange(len(data))
+
+    # Urutan kolom hasil mengikuti pandas: key yang juga diagregasi pindah ke posisi agregasinya
+    select_parts = [q(k) for k in keys if k not in agg_dict]
+    for col, fungsi in agg_dict.items():
+        if fungsi == 'sum':
+            if pd.api.types.is_float_dtype(data[col]):
+                # fsum = penjumlahan terkompensasi (Kahan), sama seperti groupby-sum pandas
+                select_parts.append(f"COALESCE(fsum({q(col)}), 0) AS {q(col)}")
+            else:
+                select_parts.append(f"COALESCE(sum({q(col)}), 0) AS {q(col)}")
+        elif fungsi == 'first':
+            select_parts.append(f"arg_min({q(col)}, __row__) FILTER (WHERE {q(col)} IS NOT NULL) AS {q(col)}")
+        else:
+            raise ValueError(f"Fungsi agregasi '{fungsi}' belum didukung engine duckdb")
+
+    where = ' AND '.join(f"{q(k)} IS NOT NULL" for k in keys)
+    group_by = ', '.join(q(k) for k in keys)
+    sql = f"SELECT {', '.join(select_parts)} FROM data WHERE {where} GROUP BY {group_by} ORDER BY {group_by}"
+
+    con = duckdb.connect()
+    try:
+        con.register('data', data)
+        hasil = con.execute(sql).df()
+    finally:
+        con.close()
+
+    # Samakan tipe data dengan hasil pandas (sum int -> int, bukan float/HUGEINT)
+    for col in hasil.columns:
+        asal = df[col].dtype
+        if pd.api.types.is_integer_dtype(asal) and (agg_dict.get(col) == 'sum' or col in keys):
+            hasil[col] = hasil[col].astype(asal)
+        elif pd.api.types.is_float_dtype(asal):
+            hasil[col] = hasil[col].astype(asal)
+    return hasil
+
+_GROUPBY_BACKENDS = {
+    'pandas': _groupby_agg_pandas,
+    'duckdb': _groupby_agg_duckdb,
+}
+
+def groupby_agg(df, keys, agg_dict, backend='pandas'):
+    """Setara df.groupby(keys, as_index=False).agg(agg_dict) dengan engine yang bisa dipilih."""
+    if backend not in _GROUPBY_BACKENDS:
+        raise ValueError(f"Engine agregasi tidak dikenal: {backend}")
+    return _GROUPBY_BACKENDS[backend](df, keys, agg_dict)
+
+# ============================================
+# PROFIL TOKO (ATURAN PER TOKO, DIKOMPILASI SEKALI SAAT IMPORT)
+# ============================================
+
+PRODUK_PAKET_WAKAF_50 = "Paket Wakaf Murah 50 pcs Alquran Al Aqeel | Alquran 18 Baris"
+
+# --- REKAP: produk yang namanya ditambah variasi ---
+REKAP_PRODUK_KHUSUS_HUMAN = [
+    "CUSTOM AL QURAN MENGENANG/WAFAT 40/100/1000 HARI",
+    "AL QUR'AN GOLD TERMURAH",
+    "Alquran Cover Emas Kertas HVS Al Aqeel Gold Murah",
+    "AL-QUR'AN SAKU A7 MAHEER HAFALAN AL QUR'AN",
+    "AL QUR'AN NON TERJEMAH AL AQEEL A5 KERTAS KORAN WAKAF",
+    "AL QUR'AN NON TERJEMAH Al AQEEL A5 KERTAS KORAN WAKAF",
+    "AL-QURAN AL AQEEL SILVER TERMURAH",
+    "AL-QUR'AN TERJEMAH HC AL ALEEM A5",
+    "AL QUR'AN EDISI TAHLILAN 30 Juz + Doa Tahlil | Pengganti Buku Yasin | Al Aqeel A6 Pastel HVS Edisi Tahlilan",
+    "AL QUR'AN A6 NON TERJEMAH HVS WARNA PASTEL",
+    "Paket Wakaf Murah 50 pcs Alquran Al Aqeel | Alquran 18 Baris", 
+    "Alquran Cover Emas Kertas HVS Al Aqeel A7 Gold Murah"
+]
+REKAP_PRODUK_FULL_VARIASI_HUMAN = [
+    "CUSTOM AL QURAN MENGENANG", 
+    "AL QUR'AN GOLD TERMURAH",
+    "Alquran Cover Emas Kertas HVS Al Aqeel Gold Murah",
+    "AL-QUR'AN SAKU A7 MAHEER HAFALAN AL QUR'AN",
+    "AL-QURAN AL AQEEL SILVER TERMURAH",
+    "Paket Wakaf Murah 50 pcs Alquran Al Aqeel | Alquran 18 Baris"
+]
+REKAP_PRODUK_KHUSUS_PACIFIC = [
+    "CUSTOM AL QURAN MENGENANG/WAFAT 40/100/1000 HARI",
+    "AL QUR'AN GOLD TERMURAH",
+    "Alquran Cover Emas Kertas HVS Al Aqeel Gold Murah",
+    "TERBARU Al Quran Edisi Tahlilan Pengganti Buku Yasin Al Aqeel A6 Kertas HVS | SURABAYA | Mushaf Untuk Pengajian Kado Islami Hampers",
+    "Al Quran Terjemah Al Aleem A5 HVS 15 Baris | SURABAYA | Alquran Untuk Pengajian Majelis Taklim",
+    "Al Quran Saku Resleting Al Quddus A7 QPP Cover Kulit | SURABAYA | Untuk Santri Traveler Muslim",
+    "Al Quran Wakaf Ibtida Al Quddus A5 Kertas HVS | Alquran SURABAYA",
+    "Al Fikrah Al Quran Terjemah Fitur Lengkap A5 Kertas HVS | Alquran SURABAYA",
+    "Al Quddus Al Quran Wakaf Ibtida A5 Kertas HVS | Alquran SURABAYA",
+    "Al Quran Terjemah Al Aleem A5 Kertas HVS 15 Baris | SURABAYA | Alquran Untuk Majelis Taklim Kajian",
+    "Al Quran Terjemah Per Kata A5 | Tajwid 2 Warna | Alquran Al Fikrah HVS 15 Baris | SURABAYA",
+    "Al Quran Saku Resleting Al Quddus A7 Cover Kulit Kertas QPP | Alquran SURABAYA",
+    "Al Quran Saku Pastel Al Aqeel A6 Kertas HVS | SURABAYA | Alquran Untuk Wakaf Hadiah Islami Hampers",
+    "Al Quran Untuk Wakaf Al Aqeel A5 Kertas Koran 18 Baris | SURABAYA | Alquran Hadiah Islami Hampers",
+    "Al Qur'an Untuk Wakaf Al Aqeel A5 Kertas Koran 18 Baris",
+    "Alquran Edisi Tahlilan Lebih Mulia Daripada Buku Yasin Biasa | Al Aqeel A6 Kertas HVS | SURABAYA |",
+    "PAKET MURAH ALQURAN AL AQEEL MUSHAF NON TERJEMAHAN | SURABAYA | al quran Wakaf/Shodaqoh hadiah hampers islami",
+    "Alquran GOLD Hard Cover Al Aqeel Kertas HVS | SURABAYA | Alquran untuk Pengajian Wakaf Hadiah Islami Hampers"
+]
+REKAP_PRODUK_FULL_VARIASI_PACIFIC = [
+    "CUSTOM AL QURAN MENGENANG", 
+    "AL QUR'AN GOLD TERMURAH",
+    "Alquran Cover Emas Kertas HVS Al Aqeel Gold Murah",
+    "AL-QUR'AN SAKU A7 MAHEER HAFALAN AL QUR'AN",
+    "Alquran GOLD Hard Cover Al Aqeel Kertas HVS | SURABAYA | Alquran untuk Pengajian Wakaf Hadiah Islami Hampers",
+    "AL QUR'AN EDISI TAHLILAN 30 Juz + Doa Tahlil | Pengganti Buku Yasin | Al Aqeel A6 Pastel HVS Edisi Tahlilan"
+]
+REKAP_WARNA_KEYWORDS_PACIFIC = ['MERAH', 'COKLAT', 'BIRU', 'UNGU', 'HIJAU', 'RANDOM', 'HITAM']
+
+# --- SUMMARY: iklan yang dibagi rata ke semua variasi (denom = total eksemplar paket) ---
+FORCE_CONFIG_HUMAN = {
+    "Alquran Cover Emas Kertas HVS Al Aqeel Gold Murah": {
+        "variasi": ["A7 SATUAN", "A7 PAKET ISI 3", "A7 PAKET ISI 5", "A7 PAKET ISI 7", "A5 SATUAN", "A5 PAKET ISI 3"],
+        "denom": 20
+    },
+    "AL QUR'AN NON TERJEMAH Al AQEEL A5 KERTAS KORAN WAKAF": {
+        "variasi": ["SATUAN", "PAKET ISI 3", "PAKET ISI 5", "PAKET ISI 7"],
+        "denom": 16
+    }
+}
+FORCE_CONFIG_PACIFIC = {
+    "Alquran GOLD Hard Cover Al Aqeel Kertas HVS | SURABAYA | Alquran untuk Pengajian Wakaf Hadiah Islami Hampers": {
+        "variasi": ["A5 Gold Satuan", "A5 Gold Paket isi 3", "A7 Gold Satuan", "A7 Gold Paket isi 3", "A7 Gold Paket isi 5", "A7 Gold Paket isi 7"],
+        "denom": 20
+    }
+}
+FORCE_CONFIG_DAMA = {
+    "Al Quran Wakaf Saku A6 Al Aqeel HVS Paket Wakaf": {
+        "variasi": ["SATUAN", "PAKET ISI 3", "PAKET ISI 5", "PAKET ISI 7"],
+        "denom": 16
+    },
+    "Al Quran Gold Silver Al Aqeel Besar Sedang Kecil": {
+        "variasi": ["A4 Satuan", "B5 Satuan", "A7 Satuan", "A6 Satuan", "A5 Satuan", "A7 Paket isi 3", "A7 Paket isi 5", "A7 Paket isi 7", "A5 Paket isi 3"],
+        "denom": 23
+    }
+}
+
+# --- SUMMARY: iklan produk yang dibagi rata ke baris summary yang cocok ---
+PRODUK_IKLAN_BIASA = [
+    "Paket Alquran Khusus Wakaf Al Aqeel A5 Kertas Koran",
+    "AL QUR'AN A6 NON TERJEMAH HVS WARNA PASTEL",
+    "Alquran Edisi Tahlilan Lebih Mulia Daripada Buku Yasin Biasa",
+    "Al Quran Saku Pastel Al Aqeel A6 Kertas HVS | SURABAYA | Alquran Untuk Wakaf Hadiah Islami Hampers",
+    "Al Quran Untuk Wakaf Al Aqeel A5 Kertas Koran 18 Baris | SURABAYA | Alquran Hadiah Islami Hampers",
+    "Paket Wakaf Murah 50 pcs Alquran Al Aqeel | Alquran 18 Baris",
+    "PAKET MURAH ALQURAN AL AQEEL MUSHAF NON TERJEMAHAN | SURABAYA | al quran Wakaf/Shodaqoh hadiah hampers islami",
+    "Alquran Edisi Tahlilan Lebih Mulia Daripada Buku Yasin Biasa | Al Aqeel A6 Kertas HVS | SURABAYA |",
+    "Alquran Cover Emas Kertas HVS Al Aqeel A5 Gold Murah", 
+    "Alquran Cover Emas Kertas HVS Al Aqeel A7 Gold Murah"
+]
+PRODUK_IKLAN_BIASA_DAMA = ["ALQURAN SAKU A6 EDISI TAHLIL TERBARU"]
+
+# --- SUMMARY: produk custom (Total Pembelian + Harga Custom TLJ) ---
+PRODUK_CUSTOM = ["CUSTOM AL QURAN MENGENANG/WAFAT 40/100/1000 HARI", "AL QUR'AN EDISI TAHLILAN 30 Juz + Doa Tahlil | Pengganti Buku Yasin | Al Aqeel A6 Pastel HVS Edisi Tahlilan (Custom sisipan 1 hal)", 
+                     "AL QUR'AN EDISI TAHLILAN 30 Juz + Doa Tahlil | Pengganti Buku Yasin | Al Aqeel A6 Pastel HVS Edisi Tahlilan (Custom sisipan 2 hal)", "AL QUR'AN EDISI TAHLILAN 30 Juz + Doa Tahlil | Pengganti Buku Yasin | Al Aqeel A6 Pastel HVS Edisi Tahlilan (Custom jacket)", 
+                     "AL QUR'AN EDISI TAHLILAN 30 Juz + Doa Tahlil | Pengganti Buku Yasin | Al Aqeel A6 Pastel HVS Edisi Tahlilan (Custom case)", "AL QUR'AN EDISI TAHLILAN 30 Juz + Doa Tahlil | Pengganti Buku Yasin | Al Aqeel A6 Pastel HVS Edisi Tahlilan (Sisipan 1hal+jaket)"]
+PRODUK_CUSTOM_DAMA = ["CUSTOM AL QURAN MENGENANG/WAFAT 40/100/1000 HARI"]
+
+# --- SUMMARY DAMA: produk non-buku (Jumlah Eksemplar = 0) ---
+PRODUK_TANPA_EKSEMPLAR_DAMA = ['PIRING', 'BAJU', 'MOBIL']
+
+# --- SUMMARY: singkatan nama produk ---
+MAPPING_SINGKATAN_HUMAN = {
+    "AL-QUR'AN TERJEMAH HC AL ALEEM QPP A6": "Al Aleem A6 QPP",
+    "AL-QUR'AN TERJEMAH  HC AL ALEEM QPP A6": "Al Aleem A6 QPP",
+    "AL-QURAN AL AQEEL SILVER TERMURAH": "Al Aqeel Silver",
+    "Paket Wakaf Murah 50 pcs Alquran Al Aqeel | Alquran 18 Baris": "Paket Wakaf Murah Al Aqeel 50 pcs",
+    "AL QUR'AN WAQF IBTIDA | AL QUDDUS A5 KERTAS HVS": "Al Quddus A5 HVS",
+    "AL QUR'AN AL AQEEL B5 KERTAS HVS": "Al Aqeel B5 HVS",
+    "KAMUS BERGAMBAR 3 BAHASA - INDONESIA INGGRIS ARAB": "Kamus Bergambar 3 Bahasa",
+    "AL QUR'AN NON TERJEMAH Al AQEEL A5 KERTAS KORAN WAKAF": "AL AQEEL A5 KORAN",
+    "Paket Alquran Khusus Wakaf Al Aqeel A5 Kertas Koran | Alquran Murah Kualitas Terbaik Harga Ekonomis | Jakarta": "Al Aqeel A5 Koran",
+    "Al QUR'AN NON TERJEMAH AL AQEEL KERTAS KORAN B5 WAKAF": "Al Aqeel B5 Koran",
+    "Alquran Cover Emas Kertas HVS Al Aqeel Gold Murah": "Al Aqeel Gold",
+    "AL-QUR'AN TERJEMAH HC AL ALEEM A5": "Al Aleem A5",
+    "Komik Pahlawan, Pendidikan Sejarah Untuk Anak": "Komik Pahlawan",
+    "AL QUR'AN AL FIKRAH TERJEMAH PER AYAT PER KATA A4 KERTAS HVS": "Al Fikrah A4 HVS",
+    "AL QUR'AN HAFALAN SAKU A7 MAHEER KERTAS QPP": "A7 Maheer QPP",
+    "AL QUR'AN B5 NON TERJEMAH HVS WARNA PASTEL": "Al Aqeel B5 Pastel",
+    "AL QURAN SAKU RESLETING A7 AL QUDDUS KERTAS QPP": "Al Quddus A7 Saku QPP",
+    "BUKU CERITA ANAK FABEL SERI DONGENG BINATANG DUA BAHASA": "Fabel Binatang",
+    "BUKU CERITA KISAH TELADAN NABI SERI VOL 1-6": "Kisah Teladan Nabi",
+    "AL- QUR'AN TAJWID WARNA WAQF IBTIDA | SUBHAAN A5 KERTAS QPP": "Subhaan A5 QPP",
+    "BUKU LAGU HARMONI NUSANTARA LAGU NASIONAL & DAERAH": "Buku Lagu Harmoni Nusantara",
+    "[KOLEKSI TERBARU] SERI CERITA RAKYAT": "Seri Cerita Rakyat",
+    "[KOLEKSI TERBARU] BUKU CERITA ANAK SERI BUDI PEKERTI": "Seri Budi Pekerti",
+    "AL- QUR'AN TERJEMAH TAJWID MUMTAAZ A5 KERTAS QPP": "Mumtaaz A5 QPP",
+    "AL QUR'AN A6 NON TERJEMAH HVS WARNA PASTEL": "Al Aqeel 6 Pastel",
+    "Custom Al Quran Mengenang/Wafat 40/100/1000 Hari": "Alquran Custom",
+    "AL QUR'AN EDISI TAHLILAN 30 Juz + Doa Tahlil | Pengganti Buku Yasin | Al Aqeel A6 Pastel HVS Edisi Tahlilan": "A6 edisi Tahlilan",
+    "Al-Qur'an Non Terjemah Al Aqeel HVS A5": "Al Aqeel A5 HVS",
+    "Al Qur'an Terjemah Per Kata | Tajwid 2 Warna | Al Fikrah A5 Kertas HVS": "Al Fikrah A5 HVS"
+}
+MAPPING_SINGKATAN_PACIFIC = {
+    "Alquran Custom Nama Foto | SURABAYA | Al-Quran untuk Wakaf Tasyakuran Tahlil Yasin Hadiah Hampers Islami": "Alquran Custom Al Aqeel",
+    "PAKET MURAH ALQURAN AL AQEEL MUSHAF NON TERJEMAHAN | SURABAYA | al quran Wakaf/Shodaqoh hadiah hampers islami": "PAKET MURAH AL AQEEL MIN 10 EKS",
+    "Al Quran Terjemah Per Kata A5 | Tajwid 2 Warna | Alquran Al Fikrah HVS 15 Baris | SURABAYA": "Al Fikrah A5 HVS",
+    "Alquran GOLD Hard Cover Al Aqeel Kertas HVS | SURABAYA | Alquran untuk Pengajian Wakaf Hadiah Islami Hampers": "Al Aqeel Gold Kertas HVS",
+    "Al Quran Untuk Wakaf Al Aqeel A5 Kertas Koran 18 Baris | SURABAYA | Alquran Hadiah Islami Hampers": "Al Aqeel A5 Kertas Koran",
+    "Al Quran Saku Pastel Al Aqeel A6 Kertas HVS | SURABAYA | Alquran Untuk Wakaf Hadiah Islami Hampers": "Al Aqeel A6 Kertas HVS",
+    "Alquran Edisi Tahlilan Lebih Mulia Daripada Buku Yasin Biasa | Al Aqeel A6 Kertas HVS | SURABAYA |": "Al Aqeel A6 Edisi Tahlilan Kertas HVS",
+    "Alquran Edisi Tahlilan Lebih Mulia Daripada Buku Yasin Biasa": "Al Aqeel A6 Edisi Tahlilan Kertas HVS",
+    "Al Quran Saku Resleting Al Quddus A7 Cover Kulit Kertas QPP | Alquran SURABAYA": "Al Quddus A7 Cover Kulit Kertas QPP",
+    "Al Quran Saku Resleting Al Quddus A7 QPP Cover Kulit | SURABAYA | Untuk Santri Traveler Muslim": "Al Quddus A7 Cover Kulit Kertas QPP",
+    "Al Quran Terjemah Al Aleem A5 Kertas HVS 15 Baris | SURABAYA | Alquran Untuk Majelis Taklim Kajian": "Al Aleem A5 Kertas HVS",
+    "Al Quran Wakaf Ibtida Al Quddus A5 Kertas HVS | Alquran SURABAYA": "Al Quddus Ibtida A5 Kertas HVS"
+}
+MAPPING_SINGKATAN_DAMA = {
+    "Alquran Al Aqeel A5 Kertas Koran Tanpa Terjemahan Wakaf Ibtida": "Al Aqeel A5 Kertas Koran",
+    "AL QUR'AN CUSTOM NAMA FOTO DI COVER SISIPAN ACARA TASYAKUR TAHLIL YASIN": "AL QUR'AN CUSTOM COVER SISIPAN",
+    "PAKET MURAH Alquran Al-Aqeel Tanpa Terjemahan | BANDUNG | Alquran Wakaf Hadiah Hampers Islami": "PAKET MURAH Al-Aqeel Tanpa Terjemahan",
+    "Al Quran Gold Silver Al Aqeel Besar Sedang Kecil": "Al Aqeel Gold Silver",
+    "ALQURAN A6 HVS EDISI TAHLIL TERBARU": "al aqeel A6 edisi tahlilan",
+    "Al Quran Wakaf Saku A6 Al Aqeel HVS Paket Wakaf": "Al Aqeel A6 HVS",
+    "AL QURAN LATIN TERJEMAHAN DAN TADJWID MUSHAF AL FIKRAH KERTAS HVS": "AL FIKRAH A5 HVS",
+    "Al Quran Mushaf Al Aqeel Full Color A5 HVS": "Al Aqeel A5 HVS",
+    "AL QURAN AL QUDDUS SAKU A7 KULIT RESLETING": "AL QUDDUS SAKU A7 KULIT",
+    "BELLA SQUARE PREMIUM | HIJAB SEGIEMPAT | VARIASI WARNA | MURAH FASHION MUSLIM": "HIJAB SEGIEMPAT BELLA SQUARE",
+    "Mushaf Al-Qur'an Al Quddus Tanpa terjemahan uk A5 DAN A4": "Al Quddus Tanpa terjemahan uk A5 DAN A4",
+    "Juz'amma Edisi Terbaru Lebih Lengkap Terjemahan Tadjwid Asmaul Husna Soft Cover Kertas Koran": "Juz'amma Kertas Koran",
+    "HIJAB PASMINA KAOS RAYON COOL TECH BY DAMA": "PASMINA KAOS RAYON",
+    "PASHMINA OVAL CERUTY BABYDOLL PREMIUM": "PASHMINA OVAL CERUTY BABYDOLL",
+    "BUKU CERITA ANAK SERI BUDI PEKERTI KOBER TK SD": "BUKU CERITA SERI BUDI PEKERTI TK SD",
+    "AL QUR'AN TERJEMAHAN AL ALEEM WAQAF IBTIDA": "AL ALEEM WAQAF IBTIDA",
+    "AlQuran Mushaf Al Aqeel B5": "Al Aqeel B5 HVS",
+    "SERI DONGENG BINATANG | DONGENG FABEL | DONGENG BINATANG MENARIK": "SERI DONGENG BINATANG",
+    "Buku Cerita Seri Terladan Nabi Seri 6 Untuk Anak Anak": "Buku Cerita Seri Teladan Nabi",
+    "BUKU CERITA SERI CERITA RAKYAT | NUSANTARA": "BUKU CERITA SERI CERITA RAKYAT",
+    "AL QUR'AN TADJWID DAN TERJEMAHAN TAFSIR ASBABUNNUZUL WAQAF IBTIDA MUSHAF MUMTAAZ": "AL QUR'AN TADJWID DAN TERJEMAHAN MUMTAAZ WAQAF IBTIDA",
+    "Juz'amma Edisi Terbaru Lebih Lengkap Terjemahan Tajwid Asmaul Husnah kertas HVS": "Juz'amma kertas HVS",
+    "Kamus Bergambar Bilingual TK SD PAUD": "Kamus Bergambar TK SD PAUD",
+    "AL QURAN MUSHAF AL ALEEM A6 SAKU": "AL ALEEM A6 SAKU",
+    "HIJAB PAYET CANTIK | PARIS JEPANG | hijab kekinian": "HIJAB PAYET PARIS JEPANG",
+    "TERBARU KOMIK SERI PAHLAWAN INDONESIA | BUKU PAHLAWAN": "KOMIK SERI PAHLAWAN INDONESIA",
+    "HARMONI NUSANTARA | LAGU NASIONAL DAN LAGU DAERAH INDONESIA": "LAGU NASIONAL DAN LAGU DAERAH INDONESIA",
+    "HIJAB BERGO JERSEY BY DAMA | KERUDUNG INSTAN": "HIJAB BERGO JERSEY",
+    "HIJAB VOAL MOTIF LASER CUT PREMIUM": "HIJAB VOAL MOTIF LASER CUT",
+    "Al QURAN TADJWID TANPA TERJEMAHAN MUSHAF SUBHAAN": "SUBHAAN TADJWID TANPA TERJEMAHAN"
+}
+
+# --- IKLAN HARIAN: rincian biaya iklan (label, pola regex, case sensitive) ---
+RINCIAN_BIAYA_IKLAN_HUMAN = [
+    # A5 Koran (Kapital WAKAF)
+    ('Biaya Iklan A5 Koran', r"AL QUR'AN NON TERJEMAH Al AQEEL A5 KERTAS KORAN WAKAF", True),
+    ('Biaya Iklan A6 Pastel', r"AL QUR'AN A6 NON TERJEMAH HVS WARNA PASTEL", False),
+    ('Biaya Iklan A5 Koran Paket 7', r"Paket.*Alquran.*khusus.*A5.*Kertas.*Koran", False),
+    # Al Aqeel Gold (menggantikan Komik Pahlawan)
+    ('Biaya Iklan A5 Gold', r"Alquran Cover Emas Kertas HVS Al Aqeel A5 Gold Murah", False),
+    ('Biaya Iklan A7 Gold', r"Alquran Cover Emas Kertas HVS Al Aqeel A7 Gold Murah", False),
+    ('Biaya Iklan A6 EDISI TAHLIL', r"AL QUR'AN EDISI TAHLILAN 30 Juz + Doa Tahlil | Pengganti Buku Yasin | Al Aqeel A6 Pastel HVS Edisi Tahlilan", False),
+    ('Biaya Iklan Paket 50 pcs', r"Paket Wakaf Murah 50 pcs Alquran Al Aqeel | Alquran 18 Baris", False),
+]
+RINCIAN_BIAYA_IKLAN_PACIFIC = [
+    ('Biaya Iklan A5 Kertas Koran', r"A5.*Kertas.*Koran", False),
+    ('Biaya Iklan A6 Kertas HVS', r"Saku.*Pastel.*A6.*Kertas.*HVS", False),
+    ('Biaya Iklan A6 EDISI TAHLIL', r"Edisi.*Tahlilan.*A6.*Kertas.*HVS", False),
+    ('Biaya Iklan Al Aqeel Gold', r"Alquran.*GOLD.*Hard.*Cover", False),
+    ('Biaya Iklan Paket Murah', r"PAKET.*MURAH.*ALQURAN.*NON.*TERJEMAHAN", False),
+]
+RINCIAN_BIAYA_IKLAN_DAMA = [
+    ('Biaya Iklan A5 Koran', r"Alquran Al Aqeel A5 Kertas Koran Tanpa Terjemahan Wakaf Ibtida", False),
+    ('Biaya Iklan Paket Hemat Al Aqeel', r"Paket Hemat Paket Grosir Al Quran | AQ Al Aqeel Wakaf Kerta koran Non Terjemah", False),
+    ('Biaya Iklan A6 EDISI TAHLIL', r"A6.*EDISI.*TAHLIL", False),
+    ('Biaya Iklan Al Aqeel Gold', r"Al.*Quran.*Gold.*Silver.*Aqeel", False),
+    ('Biaya Iklan Paket Al Aqeel Tanpa Terjemahan', r"PAKET.*MURAH.*Alquran.*Al-Aqeel.*Tanpa.*Terjemahan.*BANDUNG.*Wakaf", False),
+]
+
+def _nama_bersih(name):
+    """Normalisasi spasi (termasuk NBSP) pada nama produk."""
+    return re.sub(r'\s+', ' ', name.replace('\xa0', ' ')).strip()
+
+def _pola_gabungan(teks_list, flags=0):
+    """Satu regex alternasi (literal) untuk cek 'salah satu teks ada di dalam nama'; None bila daftar kosong."""
+    if not teks_list:
+        return None
+    return re.compile('|'.join(re.escape(t) for t in teks_list), flags)
+
+def build_store_profile(produk_khusus=(), produk_full_variasi=(), warna_keywords=(), force_config=None,
+                        produk_iklan_biasa=(), produk_custom=(), produk_tanpa_eksemplar=(),
+                        mapping_singkatan=None, rincian_biaya_iklan=()):
+    """Membekukan aturan satu toko: set nama, regex gabungan, dan pola biaya iklan yang sudah dikompilasi."""
+    mapping_singkatan = mapping_singkatan or {}
+    return {
+        'produk_khusus': frozenset(_nama_bersih(name) for name in produk_khusus),
+        'produk_full_variasi_re': _pola_gabungan(produk_full_variasi),
+        'warna_keywords': tuple(warna_keywords),
+        'force_config': force_config or {},
+        'produk_iklan_biasa': tuple(produk_iklan_biasa),
+        'produk_custom_re': _pola_gabungan(produk_custom),
+        'produk_tanpa_eksemplar_re': _pola_gabungan(produk_tanpa_eksemplar),
+        # Singkatan dicek urut (yang pertama cocok menang); regex gabungan hanya penyaring cepat
+        'mapping_singkatan': tuple((original.lower(), short) for original, short in mapping_singkatan.items()),
+        'mapping_singkatan_re': _pola_gabungan([original.lower() for original in mapping_singkatan]),
+        'rincian_biaya_iklan': tuple(
+            (label, re.compile(pattern, 0 if case_sensitive else re.IGNORECASE))
+            for label, pattern, case_sensitive in rincian_biaya_iklan
+        ),
+    }
+
+STORE_PROFILES = {
+    'Human Store': build_store_profile(
+        produk_khusus=REKAP_PRODUK_KHUSUS_HUMAN, produk_full_variasi=REKAP_PRODUK_FULL_VARIASI_HUMAN,
+        force_config=FORCE_CONFIG_HUMAN, produk_iklan_biasa=PRODUK_IKLAN_BIASA, produk_custom=PRODUK_CUSTOM,
+        mapping_singkatan=MAPPING_SINGKATAN_HUMAN, rincian_biaya_iklan=RINCIAN_BIAYA_IKLAN_HUMAN,
+    ),
+    'Raka Bookstore': build_store_profile(
+        produk_khusus=REKAP_PRODUK_KHUSUS_HUMAN, produk_full_variasi=REKAP_PRODUK_FULL_VARIASI_HUMAN,
+        produk_iklan_biasa=PRODUK_IKLAN_BIASA, produk_custom=PRODUK_CUSTOM,
+        rincian_biaya_iklan=RINCIAN_BIAYA_IKLAN_HUMAN,
+    ),
+    'Pacific Bookstore': build_store_profile(
+        produk_khusus=REKAP_PRODUK_KHUSUS_PACIFIC, produk_full_variasi=REKAP_PRODUK_FULL_VARIASI_PACIFIC,
+        warna_keywords=REKAP_WARNA_KEYWORDS_PACIFIC, force_config=FORCE_CONFIG_PACIFIC,
+        produk_iklan_biasa=PRODUK_IKLAN_BIASA, produk_custom=PRODUK_CUSTOM,
+        mapping_singkatan=MAPPING_SINGKATAN_PACIFIC, rincian_biaya_iklan=RINCIAN_BIAYA_IKLAN_PACIFIC,
+    ),
+    'DAMA.ID STORE': build_store_profile(
+        force_config=FORCE_CONFIG_DAMA, produk_iklan_biasa=PRODUK_IKLAN_BIASA_DAMA, produk_custom=PRODUK_CUSTOM_DAMA,
+        produk_tanpa_eksemplar=PRODUK_TANPA_EKSEMPLAR_DAMA, mapping_singkatan=MAPPING_SINGKATAN_DAMA,
+        rincian_biaya_iklan=RINCIAN_BIAYA_IKLAN_DAMA,
+    ),
+}
+
+def get_store_profile(toko):
+    """Profil aturan untuk toko; nama toko yang tidak dikenal memakai aturan Human Store."""
+    if toko in STORE_PROFILES:
+        return STORE_PROFILES[toko]
+    for nama_toko, profil in STORE_PROFILES.items():
+        if nama_toko in str(toko):
+            return profil
+    return STORE_PROFILES['Human Store']
+
+def singkat_nama_produk(nama_full, profil):
+    """Mengganti nama produk dengan singkatan dari profil toko; akhiran variasi '(...)' dipertahankan."""
+    if pd.isna(nama_full): return nama_full
+    nama_full = str(nama_full)
+    match_variasi = VARIASI_AKHIRAN_RE.search(nama_full)
+    variasi_part = match_variasi.group(1) if match_variasi else ""
+    nama_produk_saja = nama_full.replace(variasi_part, "").strip().lower()
+
+    if profil['mapping_singkatan_re'] is None or not profil['mapping_singkatan_re'].search(nama_produk_saja):
+        return nama_full
+    for original_name, short_name in profil['mapping_singkatan']:
+        if original_name in nama_produk_saja:
+            return f"{short_name}{variasi_part}"
+    return nama_full
+
+
+# ============================================
+# FUNGSI-FUNGSI UTAMA (DARI REKAPANKU.PY)
+# ============================================
+
+# Format kolom waktu/tanggal teks di file export Shopee ('2026-01-03 01:51' / '2026-01-03').
+# Kolom waktu menerima beberapa format yang dicoba berurutan: format Shopee dulu (cepat), lalu ISO 8601
+# untuk CSV dari tool sendiri (mis. '2025-12-31 00:58:00' hasil DataFrame.to_csv).
+FORMAT_WAKTU_SHOPEE = ('%Y-%m-%d %H:%M', 'ISO8601')
+FORMAT_TANGGAL_SHOPEE = '%Y-%m-%d'
+
+def parse_waktu(kolom, formats=FORMAT_WAKTU_SHOPEE, errors='coerce'):
+    """Kolom teks waktu sebagai datetime; setiap format di `formats` dicoba untuk nilai yang belum cocok.
+
+    errors='coerce': nilai yang tidak cocok dengan format mana pun menjadi NaT; errors='raise': ValueError.
+    """
+    if isinstance(formats, str):
+        formats = (formats,)
+    waktu = pd.to_datetime(kolom, format=formats[0], errors='coerce' if len(formats) > 1 else errors)
+    for i, fmt in enumerate(formats[1:], start=2):
+        sisa = (waktu.isna() & kolom.notna()).to_numpy()
+        if not sisa.any():
+            break
+        waktu.iloc[sisa] = pd.to_datetime(kolom[sisa], format=fmt, errors='coerce' if i < len(formats) else errors)
+    return waktu
+
+def kolom_waktu(kolom, formats=FORMAT_WAKTU_SHOPEE):
+    """Kolom waktu sebagai datetime; kolom yang sudah diparse saat file dibaca dipakai apa adanya."""
+    if pd.api.types.is_datetime64_any_dtype(kolom):
+        return kolom
+    return parse_waktu(kolom, formats, errors='raise')
+
+def get_pretty_date_range(start_date, end_date):
+    try:
+        dt_start = pd.to_datetime(start_date)
+        dt_end = pd.to_datetime(end_date)
+        
+        bulan_indo = ["Jan", "Feb", "Mar", "Apr", "Mei", "Jun", "Jul", "Agu", "Sep", "Okt", "Nov", "Des"]
+        
+        d1, m1, y1 = dt_start.day, dt_start.month, dt_start.year
+        d2, m2, y2 = dt_end.day, dt_end.month, dt_end.year
+        
+        if y1 != y2:
+            return f"{d1} {bulan_indo[m1-1]} {y1} - {d2} {bulan_indo[m2-1]} {y2}"
+        elif m1 != m2:
+            return f"{d1} {bulan_indo[m1-1]} - {d2} {bulan_indo[m2-1]} {y2}"
+        else:
+            return f"{d1} - {d2} {bulan_indo[m1-1]} {y2}"
+    except:
+        return ""
+
+def clean_and_convert_to_numeric(column):
+    """Menghapus semua karakter non-digit (kecuali titik dan minus) dan mengubah kolom menjadi numerik."""
+    if column.dtype == 'object':
+        column = column.astype(str).str.replace(r'[^\d,\-]', '', regex=True)
+        column = column.str.replace(',', '.', regex=False)
+    return pd.to_numeric(column, errors='coerce').fillna(0)
+
+def clean_order_all_numeric(column):
+    """Fungsi khusus untuk membersihkan kolom di file order-all."""
+    cleaned_column = column.astype(str).str.replace(r'\D', '', regex=True)
+    return pd.to_numeric(cleaned_column, errors='coerce').fillna(0)
+
+def clean_columns(df):
+    """Menghapus spasi di awal dan akhir dari semua nama kolom DataFrame."""
+    df.columns = df.columns.str.strip()
+    return df
+
+# Biaya proses pesanan Shopee per pesanan (Rp); dasar 'Jumlah Pesanan' di SUMMARY
+BIAYA_PROSES_PESANAN = 1250
+BIAYA_PACKING_PER_UNIT = 200
+
+# Jadwal biaya Shopee. Semua fungsi REKAP/SUMMARY menerima `fees` (sebagian kunci saja juga boleh);
+# panel what-if memakai jadwal yang sama untuk simulasi tanpa memproses ulang file.
+FEE_SCHEDULE_DEFAULT = {
+    'biaya_adm': 0.08,                                  # Biaya Adm, dasar: harga produk - voucher penjual
+    'biaya_adm_per_tahun': {2026: 0.09},                # tarif Biaya Adm khusus per tahun pesanan
+    'gratis_ongkir_xtra': 0.045,                        # Biaya Layanan Gratis Ongkir Xtra (selain Pacific)
+    'biaya_proses_pesanan': BIAYA_PROSES_PESANAN,       # Rp per pesanan, dibagi rata ke item pesanan
+    'biaya_packing_per_unit': BIAYA_PACKING_PER_UNIT,   # Rp per unit terjual (SUMMARY)
+}
+
+def fee_schedule(fees=None, **ubah):
+    """Jadwal biaya lengkap: default, ditimpa `fees` lalu `ubah`; kunci yang tidak dikenal ditolak."""
+    jadwal = dict(FEE_SCHEDULE_DEFAULT)
+    for sumber in (fees or {}, ubah):
+        for kunci, nilai in sumber.items():
+            if kunci not in FEE_SCHEDULE_DEFAULT:
+                raise ValueError(f"Komponen biaya tidak dikenal: {kunci}")
+            jadwal[kunci] = nilai
+    return jadwal
+
+def tarif_adm(tahun_pesanan, fees):
+    """Tarif Biaya Adm per baris sesuai tahun pesanan."""
+    tahun = np.asarray(tahun_pesanan)
+    tarif = np.full(tahun.shape, fees['biaya_adm'], dtype=float)
+    for tahun_khusus, tarif_khusus in fees['biaya_adm_per_tahun'].items():
+        tarif[tahun == tahun_khusus] = tarif_khusus
+    return tarif
+
+def basis_biaya_rekap(rekap_df, item_per_pesanan=None):
+    """Bagian REKAP yang tidak bergantung tarif (dasar biaya, tahun, item per pesanan, retur) untuk cache what-if."""
+    if item_per_pesanan is None:
+        item_per_pesanan = rekap_df.groupby('No. Pesanan')['No. Pesanan'].transform('size')
+    return pd.DataFrame({
+        'Basis Biaya': rekap_df['Total Harga Produk'] - rekap_df['Voucher dari Penjual Dibagi'],
+        'Tahun Pesanan': kolom_waktu(rekap_df['Waktu Pesanan Dibuat']).dt.year,
+        'Item Per Pesanan': np.asarray(item_per_pesanan),
+        'Retur': False,
+    }).reset_index(drop=True)
+
+# Tabel tier harga GROSIR per toko: (nama produk, harga satuan) -> label tier.
+# Perubahan harga grosir di Shopee cukup diedit di file ini, bukan di kode.
+HARGA_GROSIR_FILE = 'HARGA GROSIR.csv'
+HARGA_GROSIR_COLS = ['TOKO', 'NAMA PRODUK', 'HARGA', 'TIER']
+
+def normalize_nama_produk(column):
+    """Merapikan nama produk (nbsp & spasi ganda) supaya bisa dicocokkan persis."""
+    return column.astype(str).str.replace('\xa0', ' ').str.replace(r'\s+', ' ', regex=True).str.strip()
+
+def harga_satuan_int(column):
+    """Harga satuan sebagai integer rupiah; kolom teks seperti '19.500' dibersihkan dulu."""
+    if pd.api.types.is_numeric_dtype(column):
+        return column.fillna(0).round().astype('int64')
+    return clean_order_all_numeric(column).round().astype('int64')
+
+def load_price_tiers(path=HARGA_GROSIR_FILE, missing_ok=True):
+    """Membaca tabel tier harga GROSIR (kolom TOKO, NAMA PRODUK, HARGA, TIER)."""
+    try:
+        tiers = pd.read_csv(path, dtype=str)
+    except FileNotFoundError:
+        if not missing_ok:
+            raise
+        return pd.DataFrame({col: pd.Series([], dtype='int64' if col == 'HARGA' else object) for col in HARGA_GROSIR_COLS})
+    tiers.columns = [str(c).strip().upper() for c in tiers.columns]
+    missing_cols = [c for c in HARGA_GROSIR_COLS if c not in tiers.columns]
+    if missing_cols:
+        raise ValueError(f"Kolom {missing_cols} tidak ditemukan di {path}")
+    tiers = tiers.dropna(subset=HARGA_GROSIR_COLS)
+    tiers['TOKO'] = tiers['TOKO'].str.strip()
+    tiers['NAMA PRODUK'] = normalize_nama_produk(tiers['NAMA PRODUK'])
+    tiers['HARGA'] = clean_and_convert_to_numeric(tiers['HARGA']).round().astype('int64')
+    tiers['TIER'] = tiers['TIER'].str.strip()
+    return tiers[HARGA_GROSIR_COLS].drop_duplicates(['TOKO', 'NAMA PRODUK', 'HARGA']).reset_index(drop=True)
+
+def lookup_price_tier(nama_produk, harga_satuan, price_tiers, toko):
+    """Label tier GROSIR per baris (NaN jika tidak ada) lewat satu merge untuk seluruh REKAP."""
+    tiers = price_tiers.loc[price_tiers['TOKO'] == toko, ['NAMA PRODUK', 'HARGA', 'TIER']]
+    if tiers.empty:
+        return pd.Series(np.nan, index=nama_produk.index, dtype=object)
+    keys = pd.DataFrame({'NAMA PRODUK': nama_produk.to_numpy(), 'HARGA': harga_satuan.to_numpy()})
+    hasil = keys.merge(tiers, on=['NAMA PRODUK', 'HARGA'], how='left')
+    return pd.Series(hasil['TIER'].to_numpy(), index=nama_produk.index)
+
+def apply_unique(func, *columns):
+    """Memanggil func sekali per kombinasi nilai unik dari kolom-kolom, lalu memetakan hasilnya ke semua baris."""
+    frame = pd.concat(columns, axis=1, keys=range(len(columns)))
+    codes = frame.groupby(list(frame.columns), dropna=False, sort=False).ngroup().to_numpy()
+    first_rows = frame.loc[~pd.Series(codes).duplicated().to_numpy()]
+    results = np.empty(len(first_rows), dtype=object)
+    results[:] = [func(*values) for values in zip(*(first_rows[col] for col in frame.columns))]
+    return pd.Series(results[codes], index=frame.index)
+
+# Kata kunci & pola variasi (dikompilasi sekali saat import)
+VARIASI_PAPER_TYPES = ('HVS', 'QPP', 'KORAN', 'KK', 'KWARTO', 'BIGBOS', 'ART PAPER')
+VARIASI_PAPER_RE = re.compile(r'\b(' + '|'.join(re.escape(p) for p in VARIASI_PAPER_TYPES) + r')\b')
+VARIASI_SIZE_PACKAGE_RES = (
+    re.compile(r'\b(PAKET\s*\d+)\b'),
+    re.compile(r'\b((A|B)\d{1,2})\b'),
+)
+VARIASI_SPLIT_RE = re.compile(r'[\s,]+')
+VARIASI_SIZE_KEYWORDS = frozenset({'QPP', 'A5', 'B5', 'A6', 'A7', 'HVS', 'KORAN'})
+VARIASI_AKHIRAN_RE = re.compile(r'(\s*\(.*\))$')
+PAKET_ISI_RE = re.compile(r'(PAKET\s*ISI\s*\d+)')
+
+def extract_relevant_variation_part(var_str):
+    """Mengekstrak bagian variasi yang relevan untuk DAMA.ID STORE."""
+    if pd.isna(var_str):
+        return None
+    
+    var_str_clean = str(var_str).strip().upper()
+    parts = [p.strip() for p in var_str_clean.split(',')]
+    
+    for part in parts:
+        if part in VARIASI_SIZE_KEYWORDS:
+            return part
+    
+    return None
+
+def extract_paper_and_size_variation(var_str):
+    """Mengekstrak Jenis Kertas atau Ukuran/Paket dari string variasi."""
+    if pd.isna(var_str):
+        return ''
+
+    var_str_clean = str(var_str).strip().upper()
+    
+    relevant_parts_found = []
+    
+    for paper in VARIASI_PAPER_RE.findall(var_str_clean):
+        relevant_parts_found.append('KORAN' if paper == 'KK' else paper)
+            
+    for pattern in VARIASI_SIZE_PACKAGE_RES:
+        matches = pattern.findall(var_str_clean)
+        for match in matches:
+             if isinstance(match, tuple):
+                 relevant_parts_found.append(match[0].strip()) 
+             else:
+                 relevant_parts_found.append(match.strip())
+
+    unique_parts = sorted(list(set(relevant_parts_found)))
+    return ' '.join(unique_parts)
+
+# ============================================
+# INDEKS PESANAN
+# ============================================
+
+def indeks_pesanan(kunci):
+    """Indeks pesanan dari kolom 'No. Pesanan'/'Kode Pesanan', dibuat sekali lalu dipakai semua tahap.
+
+    Isi: 'kunci' (teks per baris), 'kode' (kode integer per baris), 'pesanan' (pesanan unik),
+    'jumlah' (baris per pesanan), 'item' (jumlah baris pesanan, per baris), 'awal' (penanda
+    baris pertama tiap pesanan), serta 'urutan' & 'offset' untuk mengambil baris satu pesanan.
+    """
+    kunci = pd.Series(kunci).astype(str).reset_index(drop=True)
+    kode, pesanan = pd.factorize(kunci)
+    jumlah = np.bincount(kode, minlength=len(pesanan))
+    urutan = np.argsort(kode, kind='stable')
+    offset = np.concatenate(([0], np.cumsum(jumlah)))
+    awal = np.zeros(len(kode), dtype=bool)
+    awal[urutan[offset[:-1]]] = True
+    return {
+        'kunci': kunci,
+        'kode': kode,
+        'pesanan': pd.Index(pesanan),
+        'jumlah': jumlah,
+        'item': jumlah[kode],
+        'awal': awal,
+        'urutan': urutan,
+        'offset': offset,
+    }
+
+def baris_pesanan(indeks, kode):
+    """Posisi baris (urutan asli) milik pesanan berkode `kode`."""
+    return indeks['urutan'][indeks['offset'][kode]:indeks['offset'][kode + 1]]
+
+def kode_pesanan(indeks, kunci):
+    """Kode pesanan untuk kolom kunci tabel lain (-1 jika pesanan tidak ada di indeks)."""
+    return indeks['pesanan'].get_indexer(pd.Series(kunci).astype(str))
+
+def total_per_pesanan(indeks, kunci, nilai):
+    """Total `nilai` tabel lain per pesanan indeks (0 untuk pesanan yang tidak muncul); kolom bulat tetap bulat."""
+    kode = kode_pesanan(indeks, kunci)
+    ada = kode >= 0
+    nilai = pd.to_numeric(pd.Series(nilai), errors='coerce').fillna(0)
+    total = np.bincount(kode[ada], weights=nilai.to_numpy(dtype=float)[ada], minlength=len(indeks['pesanan']))
+    return total.astype(nilai.dtype) if pd.api.types.is_integer_dtype(nilai) else total
+
+def klasifikasi_retur(order_df, indeks_order, kandidat):
+    """Memisahkan pesanan retur penuh & sebagian dari Order-all memakai indeks pesanan.
+
+    Mengembalikan (set retur penuh, set retur sebagian, dict pesanan -> {'keys', 'count'}
+    berisi (Nama Produk, Nama Variasi) item yang diretur).
+    """
+    retur = (order_df['Status Pembatalan/ Pengembalian'] == 'Permintaan Disetujui').to_numpy()
+    jumlah_retur = np.bincount(indeks_order['kode'], weights=retur, minlength=len(indeks_order['pesanan'])).astype(int)
+    nama_produk = order_df['Nama Produk'].to_numpy()
+    nama_variasi = order_df['Nama Variasi'].to_numpy()
+
+    full_return_orders = set()
+    partial_return_orders = set()
+    partial_return_items_map = {}
+    for order_id, kode in zip(kandidat, kode_pesanan(indeks_order, kandidat)):
+        if kode < 0 or jumlah_retur[kode] == 0:
+            continue
+        if jumlah_retur[kode] == indeks_order['jumlah'][kode]:
+            full_return_orders.add(order_id)
+        else:
+            partial_return_orders.add(order_id)
+            baris = baris_pesanan(indeks_order, kode)
+            baris = baris[retur[baris]]
+            partial_return_items_map[order_id] = {
+                'keys': set(zip(nama_produk[baris], nama_variasi[baris])),
+                'count': int(jumlah_retur[kode])
+            }
+    return full_return_orders, partial_return_orders, partial_return_items_map
+
+# Kolom REKAP yang di Excel hanya diisi pada baris pertama tiap pesanan. Di DataFrame nilainya
+# tetap lengkap & bertipe; baris pertama pesanan ditandai kolom KOLOM_AWAL_PESANAN.
+KOLOM_REKAP_DIKOSONGKAN = ['No. Pesanan', 'Waktu Pesanan Dibuat', 'Waktu Dana Dilepas']
+KOLOM_AWAL_PESANAN = 'Awal Pesanan'
+
+def process_rekap(order_df, income_df, seller_conv_df, backend='pandas', store_type='Human Store', fees=None, return_basis=False):
+    """Fungsi untuk memproses sheet 'REKAP' (Human Store & Raka Bookstore)."""
+    # return_basis=True: kembalikan (REKAP, basis biaya) untuk cache panel what-if
+    fees = fee_schedule(fees)
+    indeks_order = indeks_pesanan(order_df['No. Pesanan'])
+    order_df['No. Pesanan'] = indeks_order['kunci'].to_numpy()
+    order_agg = groupby_agg(order_df, ['No. Pesanan', 'Nama Produk', 'Nama Variasi'], {
+        'Jumlah': 'sum',
+        'Harga Setelah Diskon': 'first',
+        'Total Harga Produk': 'sum'
+    }, backend=backend)
+    order_agg.rename(columns={'Jumlah': 'Jumlah Terjual'}, inplace=True)
+
+    income_df['No. Pesanan'] = income_df['No. Pesanan'].astype(str)
+    
+    rekap_df = pd.merge(income_df, order_agg, on='No. Pesanan', how='left')
+    indeks_rekap = indeks_pesanan(rekap_df['No. Pesanan'])
+
+    if 'No. Pengajuan' not in rekap_df.columns:
+        rekap_df['No. Pengajuan'] = np.nan
+    rekap_df['No. Pengajuan'] = rekap_df['No. Pengajuan'].astype(str).str.strip()
+    
+    potential_return_orders = rekap_df[
+        rekap_df['No. Pengajuan'].notna() & 
+        (rekap_df['No. Pengajuan'] != 'nan') & 
+        (rekap_df['No. Pengajuan'] != '')
+    ]['No. Pesanan'].unique()
+    
+    full_return_orders, partial_return_orders, partial_return_items_map = klasifikasi_retur(
+        order_df, indeks_order, potential_return_orders)
+    
+    profil = get_store_profile(store_type)
+
+    if 'Nama Produk' in rekap_df.columns:
+        rekap_df['Nama Produk Clean Temp'] = rekap_df['Nama Produk'].astype(str).str.replace('\xa0', ' ').str.replace(r'\s+', ' ', regex=True).str.strip()
+        kondisi = rekap_df['Nama Produk Clean Temp'].isin(profil['produk_khusus'])
+    else:
+        kondisi = pd.Series([False] * len(rekap_df), index=rekap_df.index)
+    
+    if 'Nama Variasi' in rekap_df.columns:
+        new_product_names = rekap_df.loc[kondisi, 'Nama Produk'].copy()
+    
+        for idx in new_product_names.index:
+            nama_produk_asli = rekap_df.loc[idx, 'Nama Produk']
+            nama_produk_clean = rekap_df.loc[idx, 'Nama Produk Clean Temp']
+            nama_variasi_ori = rekap_df.loc[idx, 'Nama Variasi']
+    
+            if pd.notna(nama_variasi_ori):
+                var_str = str(nama_variasi_ori).strip()
+                part_to_append = ''
+    
+                if profil['produk_full_variasi_re'].search(nama_produk_clean):
+                    part_to_append = var_str
+                elif "AL QUR'AN EDISI TAHLILAN 30 Juz + Doa Tahlil | Pengganti Buku Yasin | Al Aqeel A6 Pastel HVS Edisi Tahlilan" in nama_produk_clean:
+                    if ',' in var_str:
+                        part_to_append = var_str.split(',', 1)[-1].strip()
+                    else:
+                        part_to_append = var_str
+                elif "AL-QUR'AN TERJEMAH HC AL ALEEM A5" in nama_produk_clean:
+                    if 'QPP' in var_str.upper():
+                        part_to_append = 'QPP'
+                    elif 'HVS' in var_str.upper():
+                        part_to_append = 'HVS'
+                    elif 'KORAN' in var_str.upper():
+                        part_to_append = 'KORAN'
+                        
+                elif "AL QUR'AN NON TERJEMAH Al AQEEL A5 KERTAS KORAN WAKAF" in nama_produk_clean or "AL QUR'AN A6 NON TERJEMAH HVS WARNA PASTEL" in nama_produk_clean:
+                    var_upper = var_str.upper()
+                    paket_match = PAKET_ISI_RE.search(var_upper)
+                    satuan_match = 'SATUAN' in var_upper
+                
+                    if paket_match:
+                        part_to_append = paket_match.group(1)
+                    elif satuan_match:
+                        part_to_append = 'SATUAN'
+                    else:
+                        if ',' in var_str:
+                            parts = [p.strip().upper() for p in var_str.split(',')]
+                            relevant_parts = [p for p in parts if p in VARIASI_SIZE_KEYWORDS]
+                            if relevant_parts:
+                                part_to_append = relevant_parts[0]
+                        else:
+                            part_to_append = var_str
+
+                if part_to_append:
+                    new_product_names.loc[idx] = f"{nama_produk_asli} ({part_to_append})"
+    
+        rekap_df.loc[kondisi, 'Nama Produk'] = new_product_names
+    
+    if 'Nama Produk Clean Temp' in rekap_df.columns:
+        rekap_df.drop(columns=['Nama Produk Clean Temp'], inplace=True)
+
+    rekap_df['Pengeluaran(Rp)'] = total_per_pesanan(indeks_rekap, seller_conv_df['Kode Pesanan'],
+                                                    seller_conv_df['Pengeluaran(Rp)'])[indeks_rekap['kode']]
+
+    rekap_df['Total Harga Produk'] = rekap_df.get('Total Harga Produk', 0).fillna(0)
+    
+    product_count_per_order = pd.Series(indeks_rekap['item'], index=rekap_df.index)
+    rekap_df['Total Penghasilan Dibagi'] = (rekap_df['Total Penghasilan'] / product_count_per_order).fillna(0)
+
+    rekap_df['Voucher dari Penjual'] = clean_and_convert_to_numeric(rekap_df['Voucher dari Penjual'])
+    rekap_df['Promo Gratis Ongkir dari Penjual'] = clean_and_convert_to_numeric(rekap_df['Promo Gratis Ongkir dari Penjual'])
+
+    rekap_df['Voucher dari Penjual Dibagi'] = (rekap_df['Voucher dari Penjual'] / product_count_per_order).fillna(0).abs()
+    rekap_df['Gratis Ongkir dari Penjual Dibagi'] = (rekap_df['Promo Gratis Ongkir dari Penjual'] / product_count_per_order).fillna(0).abs()
+    
+    rekap_df['Biaya Proses Pesanan Dibagi'] = fees['biaya_proses_pesanan'] / product_count_per_order
+
+    basis_biaya = rekap_df['Total Harga Produk'] - rekap_df['Voucher dari Penjual Dibagi']
+    tahun_pesanan = kolom_waktu(rekap_df['Waktu Pesanan Dibuat']).dt.year
+    
+    rekap_df['Biaya Adm 8%'] = basis_biaya * tarif_adm(tahun_pesanan, fees)
+    rekap_df['Biaya Layanan Gratis Ongkir Xtra 4,5%'] = basis_biaya * fees['gratis_ongkir_xtra']
+    rekap_df['Biaya Layanan 2%'] = 0
+    
+    order_level_costs = ['Pengeluaran(Rp)', 'Total Penghasilan']
+    is_first_item_mask = pd.Series(indeks_rekap['awal'], index=rekap_df.index)
+    
+    for col in order_level_costs:
+        if col in rekap_df.columns:
+            rekap_df[col] = rekap_df[col].fillna(0)
+            rekap_df[col] = rekap_df[col] * is_first_item_mask
+
+    cost_columns_to_abs = [
+        'Voucher dari Penjual', 'Pengeluaran(Rp)', 'Biaya Administrasi', 
+        'Biaya Layanan 2%', 'Biaya Layanan Gratis Ongkir Xtra 4,5%', 
+        'Biaya Proses Pesanan'
+    ]
+    for col in cost_columns_to_abs:
+        if col in rekap_df.columns:
+            rekap_df[col] = rekap_df[col].abs()
+
+    rekap_df['Penjualan Netto'] = (
+        rekap_df.get('Total Harga Produk', 0) -
+        rekap_df.get('Voucher dari Penjual Dibagi', 0) -
+        rekap_df.get('Pengeluaran(Rp)', 0) -
+        rekap_df.get('Biaya Adm 8%', 0) -
+        rekap_df.get('Biaya Layanan 2%', 0) -
+        rekap_df.get('Biaya Layanan Gratis Ongkir Xtra 4,5%', 0) -
+        rekap_df.get('Biaya Proses Pesanan Dibagi', 0) -
+        rekap_df.get('Gratis Ongkir dari Penjual Dibagi', 0)
+    )
+
+    rekap_df.sort_values(by='No. Pesanan', inplace=True)
+    item_per_pesanan = indeks_rekap['item'][rekap_df.index]
+    rekap_df.reset_index(drop=True, inplace=True)
+    basis_rekap = basis_biaya_rekap(rekap_df, item_per_pesanan) if return_basis else None
+
+    cols_to_zero_out = [
+        'Voucher dari Penjual Dibagi', 'Pengeluaran(Rp)', 'Biaya Adm 8%', 
+        'Biaya Layanan 2%', 'Biaya Layanan Gratis Ongkir Xtra 4,5%', 
+        'Biaya Proses Pesanan Dibagi', 'Gratis Ongkir dari Penjual Dibagi'
+    ]
+    valid_cols_to_zero = [col for col in cols_to_zero_out if col in rekap_df.columns]
+    
+    if full_return_orders:
+        kondisi_full_retur = rekap_df['No. Pesanan'].isin(full_return_orders)
+        if kondisi_full_retur.any():
+            rekap_df.loc[kondisi_full_retur, valid_cols_to_zero] = 0
+            if basis_rekap is not None:
+                basis_rekap.loc[kondisi_full_retur.to_numpy(), 'Retur'] = True
+            rekap_df.loc[kondisi_full_retur, 'Penjualan Netto'] = rekap_df.loc[kondisi_full_retur, 'Total Penghasilan Dibagi']
+
+    if partial_return_orders:
+        if 'Jumlah Pengembalian Dana ke Pembeli' not in rekap_df.columns:
+            rekap_df['Jumlah Pengembalian Dana ke Pembeli'] = 0
+        
+        rekap_df['Jumlah Pengembalian Dana ke Pembeli'] = 0
+        
+        rekap_df['__return_count__'] = rekap_df['No. Pesanan'].map(
+            lambda x: partial_return_items_map.get(x, {}).get('count', 1)
+        )
+        
+        rekap_df['Pengembalian Dana Per Item'] = (
+            rekap_df['Jumlah Pengembalian Dana ke Pembeli'] / rekap_df['__return_count__']
+        ).fillna(0)
+        
+        def is_partial_return_item(row):
+            order_id = row['No. Pesanan']
+            if order_id not in partial_return_items_map:
+                return False
+            
+            item_key = (row['Nama Produk'], row['Nama Variasi'])
+            return item_key in partial_return_items_map[order_id]['keys']
+
+        kondisi_partial_item = rekap_df.apply(is_partial_return_item, axis=1)
+        
+        if kondisi_partial_item.any():
+            rekap_df.loc[kondisi_partial_item, valid_cols_to_zero] = 0
+            if basis_rekap is not None:
+                basis_rekap.loc[kondisi_partial_item.to_numpy(), 'Retur'] = True
+            rekap_df.loc[kondisi_partial_item, 'Penjualan Netto'] = rekap_df.loc[kondisi_partial_item, 'Pengembalian Dana Per Item']
+            
+        rekap_df = rekap_df.drop(columns=['__return_count__', 'Pengembalian Dana Per Item'], errors='ignore')
+    
+    rekap_final = pd.DataFrame({
+        'No.': np.arange(1, len(rekap_df) + 1),
+        'No. Pesanan': rekap_df['No. Pesanan'],
+        'Waktu Pesanan Dibuat': rekap_df['Waktu Pesanan Dibuat'],
+        'Waktu Dana Dilepas': rekap_df['Tanggal Dana Dilepaskan'],
+        'Nama Produk': rekap_df['Nama Produk'],
+        'Jumlah Terjual': rekap_df['Jumlah Terjual'],
+        'Harga Satuan': rekap_df['Harga Setelah Diskon'],
+        'Total Harga Produk': rekap_df['Total Harga Produk'],
+        'Voucher Ditanggung Penjual': rekap_df.get('Voucher dari Penjual Dibagi', 0),
+        'Biaya Komisi AMS + PPN Shopee': rekap_df.get('Pengeluaran(Rp)', 0),
+        'Biaya Adm 8%': rekap_df.get('Biaya Adm 8%', 0),
+        'Biaya Layanan 2%': rekap_df.get('Biaya Layanan 2%', 0),
+        'Biaya Layanan Gratis Ongkir Xtra 4,5%': rekap_df.get('Biaya Layanan Gratis Ongkir Xtra 4,5%', 0),
+        'Biaya Proses Pesanan': rekap_df.get('Biaya Proses Pesanan Dibagi', 0),
+        'Gratis Ongkir dari Penjual': rekap_df.get('Gratis Ongkir dari Penjual Dibagi', 0),
+        'Total Penghasilan': rekap_df['Penjualan Netto'],
+        'Metode Pembayaran': rekap_df.get('Metode pembayaran pembeli', '')
+    })
+
+    rekap_final[KOLOM_AWAL_PESANAN] = ~rekap_final['No. Pesanan'].duplicated()
+
+    if return_basis:
+        return rekap_final.fillna(0), basis_rekap
+    return rekap_final.fillna(0)
+
+def process_rekap_pacific(order_df, income_df, seller_conv_df, backend='pandas', price_tiers=None, fees=None, return_basis=False):
+    """Fungsi untuk memproses sheet 'REKAP' untuk Pacific Bookstore."""
+    # return_basis=True: kembalikan (REKAP, basis biaya) untuk cache panel what-if
+    fees = fee_schedule(fees)
+    indeks_order = indeks_pesanan(order_df['No. Pesanan'])
+    order_df['No. Pesanan'] = indeks_order['kunci'].to_numpy()
+    order_agg = groupby_agg(order_df, ['No. Pesanan', 'Nama Produk', 'Nama Variasi'], {
+        'Jumlah': 'sum',
+        'Harga Setelah Diskon': 'first',
+        'Total Harga Produk': 'sum'
+    }, backend=backend)
+    order_agg.rename(columns={'Jumlah': 'Jumlah Terjual'}, inplace=True)
+
+    income_df['No. Pesanan'] = income_df['No. Pesanan'].astype(str)
+    
+    rekap_df = pd.merge(income_df, order_agg, on='No. Pesanan', how='left')
+    indeks_rekap = indeks_pesanan(rekap_df['No. Pesanan'])
+
+    if 'No. Pengajuan' not in rekap_df.columns:
+        rekap_df['No. Pengajuan'] = np.nan
+    rekap_df['No. Pengajuan'] = rekap_df['No. Pengajuan'].astype(str).str.strip()
+    
+    potential_return_orders = rekap_df[
+        rekap_df['No. Pengajuan'].notna() & 
+        (rekap_df['No. Pengajuan'] != 'nan') & 
+        (rekap_df['No. Pengajuan'] != '')
+    ]['No. Pesanan'].unique()
+    
+    full_return_orders, partial_return_orders, partial_return_items_map = klasifikasi_retur(
+        order_df, indeks_order, potential_return_orders)
+    
+    profil = get_store_profile('Pacific Bookstore')
+
+    if 'Nama Produk' in rekap_df.columns:
+        rekap_df['Nama Produk Clean Temp'] = rekap_df['Nama Produk'].astype(str).str.replace('\xa0', ' ').str.replace(r'\s+', ' ', regex=True).str.strip()
+        kondisi = rekap_df['Nama Produk Clean Temp'].isin(profil['produk_khusus'])
+    else:
+        kondisi = pd.Series([False] * len(rekap_df), index=rekap_df.index)
+    
+    if 'Nama Variasi' in rekap_df.columns:
+        # Tier GROSIR dari tabel harga: satu merge untuk seluruh REKAP
+        if price_tiers is None:
+            price_tiers = load_price_tiers()
+        if 'Nama Produk Clean Temp' in rekap_df.columns:
+            tier = lookup_price_tier(rekap_df['Nama Produk Clean Temp'], harga_satuan_int(rekap_df['Harga Setelah Diskon']),
+                                     price_tiers, 'Pacific Bookstore')
+            kondisi_tier = tier.notna() & rekap_df['Nama Variasi'].notna()
+        else:
+            kondisi_tier = pd.Series(False, index=rekap_df.index)
+        kondisi = kondisi & ~kondisi_tier
+
+        new_product_names = rekap_df.loc[kondisi, 'Nama Produk'].copy()
+    
+        for idx in new_product_names.index:
+            nama_produk_asli = rekap_df.loc[idx, 'Nama Produk']
+            nama_produk_clean = rekap_df.loc[idx, 'Nama Produk Clean Temp']
+            nama_variasi_ori = rekap_df.loc[idx, 'Nama Variasi']
+    
+            if pd.notna(nama_variasi_ori):
+                var_str = str(nama_variasi_ori).strip()
+                part_to_append = ''
+    
+                if profil['produk_full_variasi_re'].search(nama_produk_clean):
+                    part_to_append = var_str
+                elif "PAKET MURAH ALQURAN AL AQEEL MUSHAF NON TERJEMAHAN | SURABAYA | al quran Wakaf/Shodaqoh hadiah hampers islami" in nama_produk_clean:
+                    part_to_append = re.sub(r'\(.*?\)', '', var_str).strip()
+                elif "Alquran Edisi Tahlilan Lebih Mulia Daripada Buku Yasin Biasa | Al Aqeel A6 Kertas HVS | SURABAYA |" in nama_produk_clean:
+                    if ',' in var_str:
+                        spesifikasi = var_str.split(',', 1)[-1].strip()
+                        part_to_append = spesifikasi
+                    else:
+                        is_warna = any(w in var_str.upper() for w in profil['warna_keywords'])
+                        
+                        if not is_warna:
+                            part_to_append = var_str
+                        else:
+                            part_to_append = ''
+                
+                elif "Al Qur'an Untuk Wakaf Al Aqeel A5 Kertas Koran 18 Baris" in nama_produk_clean:
+                    var_upper = var_str.upper()
+                    paket_match = PAKET_ISI_RE.search(var_upper)
+                    satuan_match = 'SATUAN' in var_upper
+                    
+                    if paket_match:
+                        part_to_append = paket_match.group(1)
+                    elif satuan_match:
+                        part_to_append = 'SATUAN'
+                    else:
+                        if ',' in var_str:
+                            parts = [p.strip().upper() for p in var_str.split(',')]
+                            relevant_parts = [p for p in parts if p in VARIASI_SIZE_KEYWORDS]
+                            if relevant_parts:
+                                part_to_append = relevant_parts[0]
+                        else:
+                            part_to_append = var_str
+
+                if part_to_append:
+                    new_product_names.loc[idx] = f"{nama_produk_asli} ({part_to_append})"
+    
+        rekap_df.loc[kondisi, 'Nama Produk'] = new_product_names
+        rekap_df.loc[kondisi_tier, 'Nama Produk'] = (
+            rekap_df.loc[kondisi_tier, 'Nama Produk'].astype(str) + ' (' + tier[kondisi_tier] + ')'
+        )
+    
+    if 'Nama Produk Clean Temp' in rekap_df.columns:
+        rekap_df.drop(columns=['Nama Produk Clean Temp'], inplace=True)
+
+    rekap_df['Pengeluaran(Rp)'] = total_per_pesanan(indeks_rekap, seller_conv_df['Kode Pesanan'],
+                                                    seller_conv_df['Pengeluaran(Rp)'])[indeks_rekap['kode']]
+
+    rekap_df['Total Harga Produk'] = rekap_df.get('Total Harga Produk', 0).fillna(0)
+    
+    product_count_per_order = pd.Series(indeks_rekap['item'], index=rekap_df.index)
+    rekap_df['Total Penghasilan Dibagi'] = (rekap_df['Total Penghasilan'] / product_count_per_order).fillna(0)
+
+    rekap_df['Voucher dari Penjual'] = clean_and_convert_to_numeric(rekap_df['Voucher dari Penjual'])
+    rekap_df['Promo Gratis Ongkir dari Penjual'] = clean_and_convert_to_numeric(rekap_df['Promo Gratis Ongkir dari Penjual'])
+
+    rekap_df['Voucher dari Penjual Dibagi'] = (rekap_df['Voucher dari Penjual'] / product_count_per_order).fillna(0).abs()
+    rekap_df['Gratis Ongkir dari Penjual Dibagi'] = (rekap_df['Promo Gratis Ongkir dari Penjual'] / product_count_per_order).fillna(0).abs()
+    
+    rekap_df['Biaya Proses Pesanan Dibagi'] = fees['biaya_proses_pesanan'] / product_count_per_order
+
+    basis_biaya = rekap_df['Total Harga Produk'] - rekap_df['Voucher dari Penjual Dibagi']
+    tahun_pesanan = kolom_waktu(rekap_df['Waktu Pesanan Dibuat']).dt.year
+    
+    rekap_df['Biaya Adm 8%'] = basis_biaya * tarif_adm(tahun_pesanan, fees)
+    
+    rekap_df['Biaya Layanan_Clean'] = clean_and_convert_to_numeric(rekap_df.get('Biaya Layanan', 0))
+    rekap_df['Biaya Layanan 4,5%'] = (rekap_df['Biaya Layanan_Clean'] / product_count_per_order).fillna(0).abs()
+    rekap_df['Biaya Layanan Gratis Ongkir Xtra 4,5%'] = 0
+    
+    order_level_costs = ['Pengeluaran(Rp)', 'Total Penghasilan']
+    is_first_item_mask = pd.Series(indeks_rekap['awal'], index=rekap_df.index)
+    
+    for col in order_level_costs:
+        if col in rekap_df.columns:
+            rekap_df[col] = rekap_df[col].fillna(0)
+            rekap_df[col] = rekap_df[col] * is_first_item_mask
+
+    cost_columns_to_abs = [
+        'Voucher dari Penjual', 'Pengeluaran(Rp)', 'Biaya Administrasi', 
+        'Biaya Layanan 2%', 'Biaya Layanan Gratis Ongkir Xtra 4,5%', 
+        'Biaya Proses Pesanan'
+    ]
+    for col in cost_columns_to_abs:
+        if col in rekap_df.columns:
+            rekap_df[col] = rekap_df[col].abs()
+
+    rekap_df['Penjualan Netto'] = (
+        rekap_df.get('Total Harga Produk', 0) -
+        rekap_df.get('Voucher dari Penjual Dibagi', 0) -
+        rekap_df.get('Pengeluaran(Rp)', 0) -
+        rekap_df.get('Biaya Adm 8%', 0) -
+        rekap_df.get('Biaya Layanan 2%', 0) -
+        rekap_df.get('Biaya Layanan Gratis Ongkir Xtra 4,5%', 0) -
+        rekap_df.get('Biaya Proses Pesanan Dibagi', 0) -
+        rekap_df.get('Gratis Ongkir dari Penjual Dibagi', 0)
+    )
+
+    rekap_df.sort_values(by='No. Pesanan', inplace=True)
+    item_per_pesanan = indeks_rekap['item'][rekap_df.index]
+    rekap_df.reset_index(drop=True, inplace=True)
+    basis_rekap = basis_biaya_rekap(rekap_df, item_per_pesanan) if return_basis else None
+
+    cols_to_zero_out = [
+        'Voucher dari Penjual Dibagi', 'Pengeluaran(Rp)', 'Biaya Adm 8%', 
+        'Biaya Layanan 2%', 'Biaya Layanan Gratis Ongkir Xtra 4,5%', 
+        'Biaya Proses Pesanan Dibagi', 'Gratis Ongkir dari Penjual Dibagi'
+    ]
+    valid_cols_to_zero = [col for col in cols_to_zero_out if col in rekap_df.columns]
+    
+    if full_return_orders:
+        kondisi_full_retur = rekap_df['No. Pesanan'].isin(full_return_orders)
+        if kondisi_full_retur.any():
+            rekap_df.loc[kondisi_full_retur, valid_cols_to_zero] = 0
+            if basis_rekap is not None:
+                basis_rekap.loc[kondisi_full_retur.to_numpy(), 'Retur'] = True
+            rekap_df.loc[kondisi_full_retur, 'Penjualan Netto'] = rekap_df.loc[kondisi_full_retur, 'Total Penghasilan Dibagi']
+
+    if partial_return_orders:
+        if 'Jumlah Pengembalian Dana ke Pembeli' not in rekap_df.columns:
+            rekap_df['Jumlah Pengembalian Dana ke Pembeli'] = 0
+        
+        rekap_df['Jumlah Pengembalian Dana ke Pembeli'] = 0
+        
+        rekap_df['__return_count__'] = rekap_df['No. Pesanan'].map(
+            lambda x: partial_return_items_map.get(x, {}).get('count', 1)
+        )
+        
+        rekap_df['Pengembalian Dana Per Item'] = (
+            rekap_df['Jumlah Pengembalian Dana ke Pembeli'] / rekap_df['__return_count__']
+        ).fillna(0)
+        
+        def is_partial_return_item(row):
+            order_id = row['No. Pesanan']
+            if order_id not in partial_return_items_map:
+                return False
+            
+            item_key = (row['Nama Produk'], row['Nama Variasi'])
+            return item_key in partial_return_items_map[order_id]['keys']
+
+        kondisi_partial_item = rekap_df.apply(is_partial_return_item, axis=1)
+        
+        if kondisi_partial_item.any():
+            rekap_df.loc[kondisi_partial_item, valid_cols_to_zero] = 0
+            if basis_rekap is not None:
+                basis_rekap.loc[kondisi_partial_item.to_numpy(), 'Retur'] = True
+            rekap_df.loc[kondisi_partial_item, 'Penjualan Netto'] = rekap_df.loc[kondisi_partial_item, 'Pengembalian Dana Per Item']
+            
+        rekap_df = rekap_df.drop(columns=['__return_count__', 'Pengembalian Dana Per Item'], errors='ignore')
+    
+    rekap_final = pd.DataFrame({
+        'No.': np.arange(1, len(rekap_df) + 1),
+        'No. Pesanan': rekap_df['No. Pesanan'],
+        'Waktu Pesanan Dibuat': rekap_df['Waktu Pesanan Dibuat'],
+        'Waktu Dana Dilepas': rekap_df['Tanggal Dana Dilepaskan'],
+        'Nama Produk': rekap_df['Nama Produk'],
+        'Jumlah Terjual': rekap_df['Jumlah Terjual'],
+        'Harga Satuan': rekap_df['Harga Setelah Diskon'],
+        'Total Harga Produk': rekap_df['Total Harga Produk'],
+        'Voucher Ditanggung Penjual': rekap_df.get('Voucher dari Penjual Dibagi', 0),
+        'Biaya Komisi AMS + PPN Shopee': rekap_df.get('Pengeluaran(Rp)', 0),
+        'Biaya Adm 8%': rekap_df.get('Biaya Adm 8%', 0),
+        'Biaya Layanan 4,5%': rekap_df.get('Biaya Layanan 4,5%', 0),
+        'Biaya Layanan Gratis Ongkir Xtra 4,5%': rekap_df.get('Biaya Layanan Gratis Ongkir Xtra 4,5%', 0),
+        'Biaya Proses Pesanan': rekap_df.get('Biaya Proses Pesanan Dibagi', 0),
+        'Gratis Ongkir dari Penjual': rekap_df.get('Gratis Ongkir dari Penjual Dibagi', 0),
+        'Total Penghasilan': rekap_df['Penjualan Netto'],
+        'Metode Pembayaran': rekap_df.get('Metode pembayaran pembeli', '')
+    })
+
+    rekap_final[KOLOM_AWAL_PESANAN] = ~rekap_final['No. Pesanan'].duplicated()
+
+    if return_basis:
+        return rekap_final.fillna(0), basis_rekap
+    return rekap_final.fillna(0)
+
+def process_rekap_dama(order_df, income_df, seller_conv_df, backend='pandas', price_tiers=None, fees=None, return_basis=False):
+    """Fungsi untuk memproses sheet 'REKAP' untuk DAMA.ID STORE."""
+    # return_basis=True: kembalikan (REKAP, basis biaya) untuk cache panel what-if
+    fees = fee_schedule(fees)
+    if 'Nama Variasi' in order_df.columns:
+        order_df['Nama Variasi'] = order_df['Nama Variasi'].fillna('')
+    else:
+        order_df['Nama Variasi'] = ''
+    indeks_order = indeks_pesanan(order_df['No. Pesanan'])
+    order_df['No. Pesanan'] = indeks_order['kunci'].to_numpy()
+        
+    order_agg = groupby_agg(order_df, ['No. Pesanan', 'Nama Produk', 'Nama Variasi'], {
+        'Jumlah': 'sum',
+        'Harga Setelah Diskon': 'first',
+        'Total Harga Produk': 'sum'
+    }, backend=backend)
+    order_agg.rename(columns={'Jumlah': 'Jumlah Terjual'}, inplace=True)
+
+    income_df['No. Pesanan'] = income_df['No. Pesanan'].astype(str)
+    
+    rekap_df = pd.merge(income_df, order_agg, on='No. Pesanan', how='left')
+    indeks_rekap = indeks_pesanan(rekap_df['No. Pesanan'])
+
+    # Tier GROSIR dari tabel harga: satu merge untuk seluruh REKAP
+    if price_tiers is None:
+        price_tiers = load_price_tiers()
+    tier = lookup_price_tier(rekap_df['Nama Produk'], harga_satuan_int(rekap_df['Harga Setelah Diskon']),
+                             price_tiers, 'DAMA.ID STORE')
+    rekap_df.loc[tier.notna(), 'Nama Variasi'] = tier[tier.notna()]
+
+    if 'No. Pengajuan' not in rekap_df.columns:
+        rekap_df['No. Pengajuan'] = np.nan
+    rekap_df['No. Pengajuan'] = rekap_df['No. Pengajuan'].astype(str).str.strip()
+    
+    potential_return_orders = rekap_df[
+        rekap_df['No. Pengajuan'].notna() & 
+        (rekap_df['No. Pengajuan'] != 'nan') & 
+        (rekap_df['No. Pengajuan'] != '')
+    ]['No. Pesanan'].unique()
+    
+    full_return_orders, partial_return_orders, partial_return_items_map = klasifikasi_retur(
+        order_df, indeks_order, potential_return_orders)
+    
+    if not seller_conv_df.empty:
+        rekap_df['Pengeluaran(Rp)'] = total_per_pesanan(indeks_rekap, seller_conv_df['Kode Pesanan'],
+                                                        seller_conv_df['Pengeluaran(Rp)'])[indeks_rekap['kode']]
+    else:
+        rekap_df['Pengeluaran(Rp)'] = 0
+
+    rekap_df['Total Harga Produk'] = rekap_df.get('Total Harga Produk', 0).fillna(0) 
+    
+    product_count_per_order = pd.Series(indeks_rekap['item'], index=rekap_df.index)
+    rekap_df['Total Penghasilan Dibagi'] = (rekap_df['Total Penghasilan'] / product_count_per_order).fillna(0)
+
+    rekap_df['Voucher dari Penjual'] = clean_and_convert_to_numeric(rekap_df['Voucher dari Penjual'])
+    rekap_df['Promo Gratis Ongkir dari Penjual'] = clean_and_convert_to_numeric(rekap_df['Promo Gratis Ongkir dari Penjual'])
+
+    rekap_df['Voucher dari Penjual Dibagi'] = (rekap_df['Voucher dari Penjual'] / product_count_per_order).fillna(0).abs()
+    rekap_df['Gratis Ongkir dari Penjual Dibagi'] = (rekap_df['Promo Gratis Ongkir dari Penjual'] / product_count_per_order).fillna(0).abs()
+    
+    rekap_df['Biaya Proses Pesanan Dibagi'] = fees['biaya_proses_pesanan'] / product_count_per_order
+
+    rekap_df['Biaya Layanan 2%'] = 0
+
+    basis_biaya = rekap_df['Total Harga Produk'] - rekap_df['Voucher dari Penjual Dibagi']
+    tahun_pesanan = kolom_waktu(rekap_df['Waktu Pesanan Dibuat']).dt.year
+    
+    rekap_df['Biaya Adm 8%'] = basis_biaya * tarif_adm(tahun_pesanan, fees)
+    rekap_df['Biaya Layanan Gratis Ongkir Xtra 4,5%'] = basis_biaya * fees['gratis_ongkir_xtra']
+    
+    order_level_costs = ['Pengeluaran(Rp)', 'Total Penghasilan']
+    is_first_item_mask = pd.Series(indeks_rekap['awal'], index=rekap_df.index)
+    
+    for col in order_level_costs:
+        if col in rekap_df.columns:
+            rekap_df[col] = rekap_df[col].fillna(0)
+            rekap_df[col] = rekap_df[col] * is_first_item_mask
+
+    cost_columns_to_abs = [
+        'Voucher dari Penjual', 'Pengeluaran(Rp)', 'Biaya Adm 8%', 
+        'Biaya Layanan 2%', 'Biaya Layanan Gratis Ongkir Xtra 4,5%', 
+    ]
+    for col in cost_columns_to_abs:
+        if col in rekap_df.columns:
+             if pd.api.types.is_numeric_dtype(rekap_df[col]):
+                  rekap_df[col] = rekap_df[col].abs()
+
+    rekap_df['Penjualan Netto'] = (
+        rekap_df.get('Total Harga Produk', 0) -
+        rekap_df.get('Voucher dari Penjual Dibagi', 0) -
+        rekap_df.get('Pengeluaran(Rp)', 0) -
+        rekap_df.get('Biaya Adm 8%', 0) -
+        rekap_df.get('Biaya Layanan 2%', 0) -
+        rekap_df.get('Biaya Layanan Gratis Ongkir Xtra 4,5%', 0) -
+        rekap_df.get('Biaya Proses Pesanan Dibagi', 0) -
+        rekap_df.get('Gratis Ongkir dari Penjual Dibagi', 0)
+    )
+
+    rekap_df.sort_values(by='No. Pesanan', inplace=True)
+    item_per_pesanan = indeks_rekap['item'][rekap_df.index]
+    rekap_df.reset_index(drop=True, inplace=True)
+    basis_rekap = basis_biaya_rekap(rekap_df, item_per_pesanan) if return_basis else None
+
+    cols_to_zero_out = [
+        'Voucher dari Penjual Dibagi', 'Pengeluaran(Rp)', 'Biaya Adm 8%', 
+        'Biaya Layanan 2%', 'Biaya Layanan Gratis Ongkir Xtra 4,5%', 
+        'Biaya Proses Pesanan Dibagi', 'Gratis Ongkir dari Penjual Dibagi'
+    ]
+    valid_cols_to_zero = [col for col in cols_to_zero_out if col in rekap_df.columns]
+    
+    if full_return_orders:
+        kondisi_full_retur = rekap_df['No. Pesanan'].isin(full_return_orders)
+        if kondisi_full_retur.any():
+            rekap_df.loc[kondisi_full_retur, valid_cols_to_zero] = 0
+            if basis_rekap is not None:
+                basis_rekap.loc[kondisi_full_retur.to_numpy(), 'Retur'] = True
+            rekap_df.loc[kondisi_full_retur, 'Penjualan Netto'] = rekap_df.loc[kondisi_full_retur, 'Total Penghasilan Dibagi']
+
+    if partial_return_orders:
+        if 'Jumlah Pengembalian Dana ke Pembeli' not in rekap_df.columns:
+            rekap_df['Jumlah Pengembalian Dana ke Pembeli'] = 0
+        
+        rekap_df['Jumlah Pengembalian Dana ke Pembeli'] = 0
+        
+        rekap_df['__return_count__'] = rekap_df['No. Pesanan'].map(
+            lambda x: partial_return_items_map.get(x, {}).get('count', 1)
+        )
+        
+        rekap_df['Pengembalian Dana Per Item'] = (
+            rekap_df['Jumlah Pengembalian Dana ke Pembeli'] / rekap_df['__return_count__']
+        ).fillna(0)
+        
+        def is_partial_return_item(row):
+            order_id = row['No. Pesanan']
+            if order_id not in partial_return_items_map:
+                return False
+            
+            item_key = (row['Nama Produk'], row['Nama Variasi'])
+            return item_key in partial_return_items_map[order_id]['keys']
+
+        kondisi_partial_item = rekap_df.apply(is_partial_return_item, axis=1)
+        
+        if kondisi_partial_item.any():
+            rekap_df.loc[kondisi_partial_item, valid_cols_to_zero] = 0
+            if basis_rekap is not None:
+                basis_rekap.loc[kondisi_partial_item.to_numpy(), 'Retur'] = True
+            rekap_df.loc[kondisi_partial_item, 'Penjualan Netto'] = rekap_df.loc[kondisi_partial_item, 'Pengembalian Dana Per Item']
+            
+        rekap_df = rekap_df.drop(columns=['__return_count__', 'Pengembalian Dana Per Item'], errors='ignore')
+    
+    rekap_final = pd.DataFrame({
+        'No.': np.arange(1, len(rekap_df) + 1),
+        'No. Pesanan': rekap_df['No. Pesanan'],
+        'Waktu Pesanan Dibuat': rekap_df['Waktu Pesanan Dibuat'],
+        'Waktu Dana Dilepas': rekap_df['Tanggal Dana Dilepaskan'],
+        'Nama Produk': rekap_df['Nama Produk'],
+        'Nama Variasi': rekap_df['Nama Variasi'],
+        'Jumlah Terjual': rekap_df['Jumlah Terjual'],
+        'Harga Satuan': rekap_df['Harga Setelah Diskon'],
+        'Total Harga Produk': rekap_df['Total Harga Produk'],
+        'Voucher Ditanggung Penjual': rekap_df.get('Voucher dari Penjual Dibagi', 0),
+        'Biaya Komisi AMS + PPN Shopee': rekap_df.get('Pengeluaran(Rp)', 0),
+        'Biaya Adm 8%': rekap_df.get('Biaya Adm 8%', 0),
+        'Biaya Layanan 2%': rekap_df.get('Biaya Layanan 2%', 0),
+        'Biaya Layanan Gratis Ongkir Xtra 4,5%': rekap_df.get('Biaya Layanan Gratis Ongkir Xtra 4,5%', 0),
+        'Biaya Proses Pesanan': rekap_df.get('Biaya Proses Pesanan Dibagi', 0),
+        'Gratis Ongkir dari Penjual': rekap_df.get('Gratis Ongkir dari Penjual Dibagi', 0),
+        'Total Penghasilan': rekap_df['Penjualan Netto'],
+        'Metode Pembayaran': rekap_df.get('Metode pembayaran pembeli', '')
+    })
+
+    rekap_final[KOLOM_AWAL_PESANAN] = ~rekap_final['No. Pesanan'].duplicated()
+
+    if return_basis:
+        return rekap_final.fillna(0), basis_rekap
+    return rekap_final.fillna(0)
+
+# ============================================
+# KAMUS NAMA IKLAN
+# ============================================
+# Nama iklan mentah dari export Shopee -> nama produk kanonik. Nama baru ditentukan sekali dengan
+# nama_iklan_kanonik lalu disimpan ke KAMUS_IKLAN_FILE, sehingga laporan harian & rekapan mingguan
+# memakai pemetaan yang sama. Kolom NAMA PRODUK boleh diedit manual untuk menyatukan nama iklan
+# yang berbeda dari nama produknya.
+KAMUS_IKLAN_FILE = 'KAMUS NAMA IKLAN.csv'
+KAMUS_IKLAN_COLS = ['NAMA IKLAN', 'NAMA PRODUK']
+NAMA_IKLAN_AKHIRAN_RES = (re.compile(r'\s*baris\s*\[\d+\]$'), re.compile(r'\s*\[\d+\]$'))
+
+# Kamus yang sudah dibaca per file: path absolut -> (waktu ubah & ukuran file, dict)
+_KAMUS_IKLAN = {'lock': threading.Lock(), 'kamus': {}}
+
+def nama_iklan_kanonik(nama):
+    """Nama produk kanonik dari satu nama iklan: akhiran 'baris [n]' lalu '[n]' dibuang."""
+    if not isinstance(nama, str):
+        return str(nama)
+    nama = nama.strip()
+    for pola in NAMA_IKLAN_AKHIRAN_RES:
+        nama = pola.sub('', nama).strip()
+    return nama
+
+def load_kamus_iklan(path=KAMUS_IKLAN_FILE, missing_ok=True):
+    """Membaca kamus nama iklan (kolom NAMA IKLAN, NAMA PRODUK) sebagai dict."""
+    try:
+        kamus = pd.read_csv(path, dtype=str, keep_default_na=False)
+    except FileNotFoundError:
+        if not missing_ok:
+            raise
+        return {}
+    kamus.columns = [str(c).strip().upper() for c in kamus.columns]
+    missing_cols = [c for c in KAMUS_IKLAN_COLS if c not in kamus.columns]
+    if missing_cols:
+        raise ValueError(f"Kolom {missing_cols} tidak ditemukan di {path}")
+    kamus['NAMA PRODUK'] = kamus['NAMA PRODUK'].str.strip()
+    # NAMA PRODUK yang dikosongkan ditentukan ulang; baris terakhir menang jika nama iklan tercatat dua kali
+    kamus = kamus[(kamus['NAMA IKLAN'] != '') & (kamus['NAMA PRODUK'] != '')]
+    return dict(zip(kamus['NAMA IKLAN'], kamus['NAMA PRODUK']))
+
+# Tanpa fcntl, file bersama hanya bisa dikunci antar thread proses ini
+_KUNCI_FILE_THREAD = threading.Lock()
+
+@contextmanager
+def _kunci_file(path):
+    """Lock eksklusif antar proses & thread untuk `path` selama blok berjalan, lewat file '.<nama>.lock' di sebelahnya."""
+    if fcntl is None:
+        with _KUNCI_FILE_THREAD:
+            yield
+        return
+    path_lock = os.path.join(os.path.dirname(path) or '.', f".{os.path.basename(path)}.lock")
+    with open(path_lock, 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+def _tulis_csv_atomik(df, path):
+    """Menulis CSV ke file sementara unik di folder yang sama lalu rename, supaya file tidak pernah setengah jadi."""
+    fd, path_tmp = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.tmp', dir=os.path.dirname(path) or '.')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            df.to_csv(f, index=False)
+        os.chmod(path_tmp, os.stat(path).st_mode & 0o777 if os.path.exists(path) else 0o644)
+        os.replace(path_tmp, path)
+    except BaseException:
+        if os.path.exists(path_tmp):
+            os.unlink(path_tmp)
+        raise
+
+def simpan_kamus_iklan(kamus, path=KAMUS_IKLAN_FILE):
+    """Menambahkan nama iklan di `kamus` yang belum tercatat ke file kamus; mengembalikan isi file terbaru.
+
+    Watch bisa menjalankan beberapa proses sekaligus, jadi selama file dikunci kamus di disk dibaca ulang
+    dan digabung; entri yang sudah ada di file (termasuk editan manual) tidak ditimpa.
+    """
+    with _kunci_file(path):
+        di_file = load_kamus_iklan(path)
+        baru = {nama: produk for nama, produk in kamus.items() if nama not in di_file}
+        if not baru:
+            return di_file
+        kamus = {**di_file, **baru}
+        df = pd.DataFrame({'NAMA IKLAN': list(kamus.keys()), 'NAMA PRODUK': list(kamus.values())}, columns=KAMUS_IKLAN_COLS)
+        _tulis_csv_atomik(df, path)
+    return kamus
+
+def _tanda_kamus(path):
+    try:
+        info = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return info.st_mtime_ns, info.st_size
+
+def petakan_nama_iklan(nama_iklan, kamus_iklan=None):
+    """Nama produk kanonik untuk Series nama iklan, lewat satu kali map ke kamus.
+
+    kamus_iklan: path file kamus (None = KAMUS_IKLAN_FILE). Nama yang belum ada ditentukan dengan
+    nama_iklan_kanonik lalu ditambahkan ke file; nilai yang bukan teks menjadi NaN.
+    """
+    path = os.path.abspath(kamus_iklan or KAMUS_IKLAN_FILE)
+    unik = [nama for nama in pd.unique(nama_iklan.dropna()) if isinstance(nama, str)]
+    with _KAMUS_IKLAN['lock']:
+        tanda = _tanda_kamus(path)
+        tanda_cache, kamus = _KAMUS_IKLAN['kamus'].get(path, (None, None))
+        if kamus is None or tanda_cache != tanda:
+            kamus = load_kamus_iklan(path)
+        baru = {nama: nama_iklan_kanonik(nama) for nama in unik if nama not in kamus}
+        if baru:
+            # Dict baru (bukan diubah di tempat), supaya pemanggil lain yang sedang map tidak terganggu
+            try:
+                kamus = simpan_kamus_iklan(baru, path)
+                tanda = _tanda_kamus(path)
+            except OSError as e:
+                kamus = {**kamus, **baru}
+                peringatan(f"⚠️ Gagal menyimpan {os.path.basename(path)}: {e}")
+        _KAMUS_IKLAN['kamus'][path] = (tanda, kamus)
+    return nama_iklan.map(kamus)
+
+def kelompok_iklan(nama_iklan, daftar_produk):
+    """Produk pertama di daftar_produk yang termuat di tiap nama iklan (huruf besar/kecil diabaikan), NaN jika tidak ada.
+
+    Ditentukan sekali per nama unik lalu dipetakan ke semua baris.
+    """
+    daftar = [(produk, produk.upper()) for produk in daftar_produk]
+    kelompok = {}
+    for nama in pd.unique(nama_iklan.dropna()):
+        if isinstance(nama, str):
+            nama_upper = nama.upper()
+            kelompok[nama] = next((produk for produk, produk_upper in daftar if produk_upper in nama_upper), np.nan)
+    return nama_iklan.map(kelompok)
+
+KOLOM_IKLAN_AGG = {
+    'Dilihat': 'sum',
+    'Jumlah Klik': 'sum',
+    'Biaya': 'sum',
+    'Produk Terjual': 'sum',
+    'Omzet Penjualan': 'sum'
+}
+
+def process_iklan(iklan_df, backend='pandas', kamus_iklan=None):
+    """Fungsi untuk memproses dan membuat sheet 'IKLAN'."""
+    # kamus_iklan: path kamus nama iklan (None = KAMUS_IKLAN_FILE)
+    iklan_df['Nama Iklan Clean'] = petakan_nama_iklan(iklan_df['Nama Iklan'], kamus_iklan)
+    
+    iklan_agg = groupby_agg(iklan_df, ['Nama Iklan Clean'], KOLOM_IKLAN_AGG, backend=backend)
+    iklan_agg.rename(columns={'Nama Iklan Clean': 'Nama Iklan'}, inplace=True)
+    return tambah_total_iklan(iklan_agg)
+
+def gabung_iklan_final(partial_iklan, backend='pandas'):
+    """Menggabungkan sheet IKLAN parsial (per file) menjadi satu sheet IKLAN."""
+    gabungan = pd.concat([df[df['Nama Iklan'] != 'TOTAL'] for df in partial_iklan], ignore_index=True)
+    return tambah_total_iklan(groupby_agg(gabungan, ['Nama Iklan'], KOLOM_IKLAN_AGG, backend=backend))
+
+def tambah_total_iklan(iklan_agg):
+    """Menambahkan baris TOTAL di bawah agregat iklan per nama."""
+    total_row = pd.DataFrame({
+        'Nama Iklan': ['TOTAL'],
+        'Dilihat': [iklan_agg['Dilihat'].sum()],
+        'Jumlah Klik': [iklan_agg['Jumlah Klik'].sum()],
+        'Biaya': [iklan_agg['Biaya'].sum()],
+        'Produk Terjual': [iklan_agg['Produk Terjual'].sum()],
+        'Omzet Penjualan': [iklan_agg['Omzet Penjualan'].sum()]
+    })
+    
+    iklan_final = pd.concat([iklan_agg, total_row], ignore_index=True)
+    return iklan_final
+
+# Token umum yang tidak membedakan judul katalog (tidak dipakai untuk blocking)
+KATALOG_TOKEN_STOPWORDS = {
+    'AL', 'QURAN', 'ALQURAN', 'QUR', 'AN', 'PAKET', 'ISI', 'SATUAN', 'SET',
+    'DAN', 'DI', 'DENGAN', 'UNTUK', 'YANG', 'MURAH',
+}
+
+# Kolom judul yang di-index per jenis katalog
+KATALOG_INDEX_COL = {
+    'fuzzy': 'JUDUL_NORM',
+    'dama': 'NAMA PRODUK',
+}
+
+def tokens_informatif(text):
+    """Token ternormalisasi yang cukup informatif untuk blocking (AQEEL, FIKRAH, A5, HVS, ...)."""
+    tokens = re.findall(r'[A-Z0-9]+', str(text).upper())
+    return {t for t in tokens if len(t) > 1 and not t.isdigit() and t not in KATALOG_TOKEN_STOPWORDS}
+
+def build_katalog_index(katalog_df, kind='fuzzy'):
+    """Membangun inverted index token -> posisi baris katalog (HARGA ONLINE / KATALOG_DAMA)."""
+    index = {}
+    for pos, title in enumerate(katalog_df[KATALOG_INDEX_COL[kind]].astype(str)):
+        for token in tokens_informatif(title):
+            index.setdefault(token, []).append(pos)
+    return index
+
+def block_katalog(query, katalog_df, index):
+    """Baris katalog yang berbagi token informatif dengan query; tanpa token bersama = katalog penuh."""
+    rows = set()
+    for token in tokens_informatif(query):
+        rows.update(index.get(token, ()))
+    if not rows:
+        return katalog_df
+    return katalog_df.iloc[sorted(rows)]
+
+def _hasil_match(harga, aturan, skor, kandidat, top_k, terpilih=None):
+    """Menyusun hasil pencocokan: harga, aturan penentu, skor terbaik & top-k kandidat (yang terpilih di urutan pertama)."""
+    kandidat_top = []
+    if top_k:
+        urutan = sorted(kandidat, key=lambda pos: (pos != terpilih, -kandidat[pos][0]))
+        kandidat_top = [kandidat[pos] for pos in urutan[:top_k]]
+    return {'harga': harga, 'aturan': aturan, 'skor': skor, 'kandidat': kandidat_top}
+
+# Pola ukuran & jenis kertas untuk pencocokan katalog (dikompilasi sekali saat import)
+HARGA_KARAKTER_ASING_RE = re.compile(r'[^A-Z0-9\s×xX\-]')
+HARGA_UKURAN_RES = tuple(re.compile(pat) for pat in [
+    r'\bA[0-9]\b', r'\bB[0-9]\b', r'\b\d{1,3}\s*[x×X]\s*\d{1,3}\b', r'\b\d{1,3}\s*CM\b'
+])
+HARGA_JENIS_KERTAS_MAP = {
+    'HVS': 'HVS', 'QPP': 'QPP', 'KORAN': 'KORAN', 'KK': 'KORAN',
+    'GLOSSY':'GLOSSY','DUPLEX':'DUPLEX','ART':'ART','COVER':'COVER',
+    'MATT':'MATT','MATTE':'MATTE','CTP':'CTP','BOOK PAPER':'BOOK PAPER',
+    'ART PAPER': 'ART PAPER', 'ART PAPER': 'Art Paper'
+}
+
+def bersihkan_nama_fuzzy(search_name):
+    """Nama produk huruf besar tanpa karakter asing, dipakai untuk skor & blocking HARGA ONLINE."""
+    s_clean = HARGA_KARAKTER_ASING_RE.sub(' ', search_name.upper())
+    return re.sub(r'\s+', ' ', s_clean).strip()
+
+def get_harga_beli_fuzzy(nama_produk, katalog_df, score_threshold_primary=80, score_threshold_fallback=75, index=None):
+    """Mencari harga beli dari katalog."""
+    return get_harga_beli_fuzzy_detail(nama_produk, katalog_df, score_threshold_primary,
+                                       score_threshold_fallback, index=index)['harga']
+
+def get_harga_beli_fuzzy_detail(nama_produk, katalog_df, score_threshold_primary=80, score_threshold_fallback=75, index=None, top_k=0):
+    """Seperti get_harga_beli_fuzzy, plus aturan penentu (strict/fallback/none) & top-k kandidat dari scan yang sama."""
+    kandidat = {}
+    try:
+        search_name = str(nama_produk).strip()
+        if not search_name:
+            return _hasil_match(0, 'none', 0, kandidat, top_k)
+
+        s_clean = bersihkan_nama_fuzzy(search_name)
+
+        ukuran_found = None
+        for pat in HARGA_UKURAN_RES:
+            m = pat.search(s_clean)
+            if m:
+                ukuran_found = m.group(0).replace(' ', '').upper()
+                break
+
+        
+        jenis_found = None
+        s_clean_words = set(s_clean.split())
+        
+        for token_to_find, jenis in HARGA_JENIS_KERTAS_MAP.items():
+            if token_to_find in s_clean_words:
+                jenis_found = jenis
+                break
+
+        # Blocking: hanya judul yang berbagi token informatif dengan nama produk
+        if index is None:
+            index = build_katalog_index(katalog_df, 'fuzzy')
+        katalog_blok = block_katalog(s_clean, katalog_df, index)
+
+        candidates = katalog_blok
+        if ukuran_found:
+            candidates = candidates[candidates['UKURAN_NORM'].str.contains(re.escape(ukuran_found), na=False)]
+        if jenis_found and not candidates.empty:
+            candidates = candidates[candidates['JENIS_KERTAS_NORM'].str.contains(jenis_found, na=False)]
+
+        if candidates.empty:
+            candidates = katalog_blok
+
+        # Skor di bawah ambang terendah tidak pernah menentukan hasil, jadi dipotong lewat score_cutoff
+        # (kecuali saat audit, supaya kandidat top-k tetap punya skor asli)
+        min_threshold = 0 if top_k else min(score_threshold_primary, score_threshold_fallback)
+
+        def scan(rows, best_score, best_price, best_title, best_pos):
+            prices = rows['KATALOG_HARGA_NUM'] if 'KATALOG_HARGA_NUM' in rows.columns else pd.Series(0, index=rows.index)
+            for pos, title, price in zip(rows.index, rows['JUDUL_NORM'].astype(str), prices):
+                cutoff = min_threshold if top_k else max(min_threshold, best_score)
+                score = rapidfuzz.fuzz.token_set_ratio(s_clean, title, score_cutoff=cutoff)
+                if score < cutoff:
+                    continue
+                if top_k:
+                    kandidat[pos] = (score, title, price)
+                if score > best_score or (score == best_score and len(title) > len(best_title)):
+                    best_score, best_price, best_title, best_pos = score, price, title, pos
+            return best_score, best_price, best_title, best_pos
+
+        best_score, best_price, best_title, best_pos = scan(candidates, 0, 0, "", None)
+
+        if best_score >= score_threshold_primary and best_price > 0:
+            return _hasil_match(float(best_price), 'strict', best_score, kandidat, top_k, best_pos)
+
+        best_score2, best_price2, best_title, best_pos = scan(katalog_blok, best_score, best_price, best_title, best_pos)
+
+        if best_score2 >= score_threshold_fallback and best_price2 > 0:
+            return _hasil_match(float(best_price2), 'fallback', best_score2, kandidat, top_k, best_pos)
+
+        return _hasil_match(0, 'none', best_score2, kandidat, top_k)
+    except Exception as e:
+        return _hasil_match(0, f'error: {e}', 0, kandidat, top_k)
+
+def calculate_eksemplar(nama_produk, jumlah_terjual):
+    """Menghitung jumlah eksemplar berdasarkan 'PAKET ISI X' atau 'SATUAN'."""
+    try:
+        nama_produk_upper = str(nama_produk).upper()
+        
+        paket_match = re.search(r'PAKET\s*ISI\s*(\d+)', nama_produk_upper)
+        satuan_match = 'SATUAN' in nama_produk_upper
+        paket_khusus = re.search(r'PAKET WAKAF MURAH 50 PCS', nama_produk_upper)
+        
+        faktor = 1
+        
+        if paket_match:
+            faktor = int(paket_match.group(1))
+        elif satuan_match:
+            faktor = 1
+        elif paket_khusus:
+            faktor = 50
+            
+        return jumlah_terjual * faktor
+    except Exception:
+        return jumlah_terjual
+
+def get_eksemplar_multiplier(nama_produk):
+    if pd.isna(nama_produk): return 1
+    nama_produk = str(nama_produk).upper()
+        
+    match = re.search(r'(?:PAKET|ISI)\s*(?:ISI\s*)?(\d+)', nama_produk)
+    if match:
+        return int(match.group(1))
+    
+    if 'SATUAN' in nama_produk:
+        return 1
+    return 1
+    
+def aggregate_rekap_summary(rekap_df, store_type, backend='pandas'):
+    """Agregasi REKAP per Nama Produk & Harga Satuan (tahap awal sheet 'SUMMARY')."""
+    rekap_copy = rekap_df.copy()
+
+    kondisi_retur_summary = rekap_copy['Total Penghasilan'] <= 0
+    
+    rekap_copy.loc[kondisi_retur_summary, 'Jumlah Terjual'] = 0
+    rekap_copy.loc[kondisi_retur_summary, 'Total Harga Produk'] = 0
+
+    biaya_layanan_col = 'Biaya Layanan 4,5%' if store_type == 'Pacific Bookstore' else 'Biaya Layanan 2%'
+    return groupby_agg(rekap_copy, ['Nama Produk', 'Harga Satuan'], {
+        'Jumlah Terjual': 'sum', 
+        'Total Harga Produk': 'sum',
+        'Voucher Ditanggung Penjual': 'sum', 'Biaya Komisi AMS + PPN Shopee': 'sum',
+        'Biaya Adm 8%': 'sum', biaya_layanan_col: 'sum',
+        'Biaya Layanan Gratis Ongkir Xtra 4,5%': 'sum', 'Biaya Proses Pesanan': 'sum',
+        'Total Penghasilan': 'sum'
+    }, backend=backend)
+
+def baris_summary_kosong(columns, nama_produk, **nilai):
+    """Satu baris summary tambahan (semua kolom 0) untuk ditampung dulu di buffer."""
+    row = dict.fromkeys(columns, 0)
+    row['Nama Produk'] = nama_produk
+    row.update(nilai)
+    return row
+
+def gabung_baris_summary(summary_df, rows):
+    """Menggabungkan semua baris dari buffer ke summary dengan satu kali concat."""
+    if not rows:
+        return summary_df
+    return pd.concat([summary_df, pd.DataFrame(rows, columns=summary_df.columns)], ignore_index=True)
+
+def _bersihkan_spasi(nama):
+    return re.sub(r'\s+', ' ', str(nama)).strip()
+
+def alokasi_iklan_paket(summary_df, iklan_data, force_config, multiplier_func):
+    """Biaya iklan produk paket dibagi ke semua variasinya (mult * biaya / denom / jumlah baris bernama sama)."""
+    nama_clean = summary_df['Nama Produk'].astype(str).str.replace(r'\s+', ' ', regex=True).str.strip()
+    buffer = []
+    alokasi = []  # (produk_base, total biaya, denom, jumlah baris yang sudah ada saat produk ini diproses)
+
+    # Tiap iklan milik produk paket pertama yang namanya termuat di nama iklan
+    kelompok = kelompok_iklan(iklan_data['Nama Iklan'], force_config)
+    for produk_base, config in force_config.items():
+        matching_ads = iklan_data[kelompok == produk_base]
+        if matching_ads.empty:
+            continue
+        for var in config['variasi']:
+            nama_lengkap_search = f"{produk_base} ({var})".replace('  ', ' ').strip()
+            pola = re.escape(nama_lengkap_search)
+            exists = (nama_clean.str.contains(pola, case=False, na=False).any()
+                      or any(re.search(pola, _bersihkan_spasi(row['Nama Produk']), re.IGNORECASE) for row in buffer))
+            if not exists:
+                buffer.append(baris_summary_kosong(summary_df.columns, f"{produk_base} ({var})"))
+        alokasi.append((produk_base, matching_ads['Biaya'].sum(), config['denom'], len(summary_df) + len(buffer)))
+    iklan_data = iklan_data[kelompok.isna()]
+
+    summary_df = gabung_baris_summary(summary_df, buffer)
+    if alokasi:
+        nama = summary_df['Nama Produk']
+        count_same = nama.map(nama.value_counts(dropna=False)).to_numpy()
+        posisi = np.arange(len(summary_df))
+        for produk_base, total_biaya_iklan, denom, batas in alokasi:
+            mask = (nama.str.contains(produk_base, case=False, na=False, regex=False).to_numpy()
+                    & (posisi < batas))
+            mult = nama[mask].map(multiplier_func).to_numpy(dtype=float)
+            summary_df.loc[mask, 'Iklan Klik'] = (mult * total_biaya_iklan) / denom / count_same[mask]
+    return summary_df, iklan_data
+
+def alokasi_iklan_biasa(summary_df, iklan_data, produk_iklan_biasa):
+    """Biaya iklan produk biasa dibagi rata ke baris summary yang cocok; tanpa baris cocok jadi baris iklan saja."""
+    buffer = []
+    produk_iklan_biasa = list(dict.fromkeys(produk_iklan_biasa))
+    kelompok = kelompok_iklan(iklan_data['Nama Iklan'], produk_iklan_biasa)
+    for p_biasa in produk_iklan_biasa:
+        matching_ads = iklan_data[kelompok == p_biasa]
+        if matching_ads.empty:
+            continue
+        total_biaya = matching_ads['Biaya'].sum()
+        mask_summary = summary_df['Nama Produk'].str.contains(p_biasa, case=False, na=False, regex=False)
+        p_upper = p_biasa.upper()
+        buffer_cocok = [row for row in buffer if p_upper in row['Nama Produk'].upper()]
+        num_rows = mask_summary.sum() + len(buffer_cocok)
+        if num_rows > 0:
+            summary_df.loc[mask_summary, 'Iklan Klik'] = total_biaya / num_rows
+            for row in buffer_cocok:
+                row['Iklan Klik'] = total_biaya / num_rows
+        else:
+            buffer.append(baris_summary_kosong(summary_df.columns, p_biasa, **{'Iklan Klik': total_biaya}))
+    return gabung_baris_summary(summary_df, buffer), iklan_data[kelompok.isna()]
+
+# ============================================
+# METRIK SUMMARY (KPI TURUNAN, OPERASI ARRAY)
+# ============================================
+
+def bagi_aman(pembilang, penyebut):
+    """Pembagian per elemen; hasilnya 0 bila penyebut 0."""
+    pembilang, penyebut = np.broadcast_arrays(np.asarray(pembilang, dtype=float), np.asarray(penyebut, dtype=float))
+    hasil = np.zeros(pembilang.shape)
+    np.divide(pembilang, penyebut, out=hasil, where=penyebut != 0)
+    return hasil
+
+def hitung_metrik_summary(df, kolom_ekspedisi, jumlah_hari=7, biaya_proses_pesanan=BIAYA_PROSES_PESANAN, kolom_penjualan='Total Harga Produk'):
+    """Margin, Persentase, Jumlah Pesanan, Penjualan Per Hari & Jumlah buku per pesanan untuk semua baris sekaligus."""
+    penjualan = df[kolom_penjualan].to_numpy(dtype=float)
+    margin = (df['Penjualan Netto'] - df['Iklan Klik'] - df['Biaya Packing'] -
+              df[kolom_ekspedisi] - df['Total Pembelian']).to_numpy(dtype=float)
+    jumlah_pesanan = bagi_aman(df['Biaya Proses Pesanan'], biaya_proses_pesanan)
+    return pd.DataFrame({
+        'Margin': margin,
+        'Persentase': bagi_aman(margin, penjualan),
+        'Jumlah Pesanan': jumlah_pesanan,
+        'Penjualan Per Hari': np.round(bagi_aman(penjualan, jumlah_hari), 1),
+        'Jumlah buku per pesanan': np.round(bagi_aman(df['Jumlah Eksemplar'], jumlah_pesanan), 1),
+    }, index=df.index)
+
+def isi_metrik_total(total_row, jumlah_hari=7, biaya_proses_pesanan=BIAYA_PROSES_PESANAN):
+    """KPI baris 'Total' dihitung ulang dari jumlah kolom (bukan dijumlah per baris)."""
+    metrik = hitung_metrik_summary(total_row, 'Biaya Ekspedisi', jumlah_hari, biaya_proses_pesanan, kolom_penjualan='Total Penjualan')
+    for col in metrik.columns:
+        total_row[col] = metrik[col]
+    return total_row
+
+def process_summary(rekap_df, iklan_final_df, katalog_df, harga_custom_tlj_df, store_type, jumlah_hari=7, summary_agg=None, backend='pandas', match_workers=1, audit_top_k=0, fees=None, match_cache=None, match_override=None):
+    """Fungsi untuk memproses sheet 'SUMMARY'."""
+    # summary_agg: agregat gabungan dari mode rekapan periode (rekap_df boleh None)
+    # audit_top_k > 0: kembalikan (summary, DataFrame 'MATCH AUDIT')
+    # match_cache: dict hasil pencocokan harga beli sendiri (None = cache versi katalog, lihat katalog_terversi)
+    # match_override: tabel override harga beli (None = baca MATCH_OVERRIDE_FILE)
+    fees = fee_schedule(fees)
+    biaya_layanan_col = 'Biaya Layanan 4,5%' if store_type == 'Pacific Bookstore' else 'Biaya Layanan 2%'
+    if summary_agg is None:
+        summary_agg = aggregate_rekap_summary(rekap_df, store_type, backend=backend)
+    summary_df = summary_agg[summary_agg['Total Penghasilan'] != 0].copy()
+
+    summary_df['Iklan Klik'] = 0.0
+    profil = get_store_profile(store_type)
+
+    iklan_data = iklan_final_df[iklan_final_df['Nama Iklan'] != 'TOTAL'][['Nama Iklan', 'Biaya']].copy()
+
+    # Baris variasi paket & baris iklan saja ditampung dulu, lalu digabung sekali per tahap
+    summary_df, iklan_data = alokasi_iklan_paket(summary_df, iklan_data, profil['force_config'], get_eksemplar_multiplier)
+    summary_df, iklan_data = alokasi_iklan_biasa(summary_df, iklan_data, profil['produk_iklan_biasa'])
+    
+    summary_df = pd.merge(summary_df, iklan_data, left_on='Nama Produk', right_on='Nama Iklan', how='left')
+    
+    summary_df['Iklan Klik'] = summary_df['Iklan Klik'] + summary_df['Biaya'].fillna(0)
+    summary_df.drop(columns=['Nama Iklan', 'Biaya'], inplace=True, errors='ignore')
+    
+    iklan_only_names = set(iklan_data['Nama Iklan']) - set(summary_df['Nama Produk'])
+    if iklan_only_names:
+        iklan_only_df = iklan_data[iklan_data['Nama Iklan'].isin(iklan_only_names)].copy()
+        iklan_only_df.rename(columns={'Nama Iklan': 'Nama Produk', 'Biaya': 'Iklan Klik'}, inplace=True)
+        summary_df = pd.concat([summary_df, iklan_only_df], ignore_index=True)
+    
+    summary_df.fillna(0, inplace=True)
+
+    if store_type in ['Pacific Bookstore']:
+        summary_df['Penjualan Netto'] = (
+            summary_df['Total Harga Produk'] - summary_df['Voucher Ditanggung Penjual'] -
+            summary_df['Biaya Komisi AMS + PPN Shopee'] - summary_df['Biaya Adm 8%'] -
+            summary_df['Biaya Layanan 4,5%'] - summary_df['Biaya Layanan Gratis Ongkir Xtra 4,5%'] -
+            summary_df['Biaya Proses Pesanan']
+        )
+    else:
+        summary_df['Penjualan Netto'] = summary_df['Total Penghasilan']
+        
+    summary_df['Biaya Packing'] = summary_df['Jumlah Terjual'] * fees['biaya_packing_per_unit']
+
+    summary_df['Jumlah Eksemplar'] = summary_df.apply(
+        lambda row: calculate_eksemplar(row['Nama Produk'], row['Jumlah Terjual']), 
+        axis=1
+    )
+
+    if store_type in ['Pacific Bookstore']:
+        summary_df['Biaya Kirim ke Sby'] = 0
+        biaya_ekspedisi_final = summary_df['Biaya Kirim ke Sby']
+    else:
+        summary_df['Biaya Ekspedisi'] = 0
+        biaya_ekspedisi_final = summary_df['Biaya Ekspedisi']
+
+    if match_override is None:
+        match_override = load_match_override()
+    summary_df['Harga Beli'], match_detail = match_harga_beli(summary_df['Nama Produk'], katalog_df, kind='fuzzy',
+                                                              workers=match_workers, top_k=audit_top_k,
+                                                              cache=match_cache,
+                                                              override=match_override_toko(match_override, store_type))
+
+    summary_df['temp_lookup_key'] = summary_df['Nama Produk'].astype(str).str.replace(' (', ' ', regex=False).str.replace(')', '', regex=False).str.strip()
+    
+    summary_df = pd.merge(
+        summary_df,
+        harga_custom_tlj_df[['LOOKUP_KEY', 'HARGA CUSTOM TLJ']],
+        left_on='temp_lookup_key',
+        right_on='LOOKUP_KEY',
+        how='left'
+    )
+    summary_df.rename(columns={'HARGA CUSTOM TLJ': 'Harga Custom TLJ'}, inplace=True)
+    summary_df['Harga Custom TLJ'] = summary_df['Harga Custom TLJ'].fillna(0)
+    summary_df.drop(columns=['LOOKUP_KEY', 'temp_lookup_key'], inplace=True, errors='ignore')
+
+    kondisi_custom = summary_df['Nama Produk'].str.contains(profil['produk_custom_re'], na=False)
+    
+    summary_df['Total Pembelian'] = np.where(
+        kondisi_custom,
+        (summary_df['Jumlah Terjual'] * summary_df['Harga Beli']) + (summary_df['Jumlah Terjual'] * summary_df['Harga Custom TLJ']),
+        summary_df['Jumlah Terjual'] * summary_df['Harga Beli']
+    )
+    
+    metrik = hitung_metrik_summary(summary_df, biaya_ekspedisi_final.name, jumlah_hari, fees['biaya_proses_pesanan'])
+    summary_df[metrik.columns] = metrik
+    
+    summary_final_data = {
+        'No': np.arange(1, len(summary_df) + 1), 'Nama Produk': summary_df['Nama Produk'],
+        'Jumlah Terjual': summary_df['Jumlah Terjual'], 'Jumlah Eksemplar': summary_df['Jumlah Eksemplar'], 
+        'Jumlah Pesanan': summary_df['Jumlah Pesanan'], 'Harga Satuan': summary_df['Harga Satuan'],
+        'Total Penjualan': summary_df['Total Harga Produk'], 'Voucher Ditanggung Penjual': summary_df['Voucher Ditanggung Penjual'],
+        'Biaya Komisi AMS + PPN Shopee': summary_df['Biaya Komisi AMS + PPN Shopee'], 'Biaya Adm 8%': summary_df['Biaya Adm 8%'],
+        biaya_layanan_col: summary_df[biaya_layanan_col], 'Biaya Layanan Gratis Ongkir Xtra 4,5%': summary_df['Biaya Layanan Gratis Ongkir Xtra 4,5%'],
+        'Biaya Proses Pesanan': summary_df['Biaya Proses Pesanan'],
+        'Penjualan Netto': summary_df['Penjualan Netto'], 'Iklan Klik': summary_df['Iklan Klik'], 'Biaya Packing': summary_df['Biaya Packing'],
+    }
+    if store_type in ['Pacific Bookstore']:
+        summary_final_data['Biaya Ekspedisi'] = biaya_ekspedisi_final
+    else:
+        summary_final_data['Biaya Ekspedisi'] = biaya_ekspedisi_final
+    summary_final_data.update({
+        'Harga Beli': summary_df['Harga Beli'], 'Harga Custom TLJ': summary_df['Harga Custom TLJ'],
+        'Total Pembelian': summary_df['Total Pembelian'], 'Margin': summary_df['Margin'],
+        'Persentase': summary_df['Persentase'],
+        'Penjualan Per Hari': summary_df['Penjualan Per Hari'], 'Jumlah buku per pesanan': summary_df['Jumlah buku per pesanan']
+    })
+    summary_final = pd.DataFrame(summary_final_data)
+
+    if profil['mapping_singkatan']:
+        summary_final['Nama Produk'] = summary_final['Nama Produk'].apply(singkat_nama_produk, profil=profil)
+        
+    summary_final = summary_final.sort_values(by='Nama Produk', ascending=True).reset_index(drop=True)
+    summary_final['No'] = range(1, len(summary_final) + 1)
+    
+    total_row = pd.DataFrame(summary_final.sum(numeric_only=True)).T
+    total_row['Nama Produk'] = 'Total'
+    total_row = isi_metrik_total(total_row, jumlah_hari, fees['biaya_proses_pesanan'])
+    for col in ['Harga Satuan', 'Harga Beli', 'No', 'Harga Custom TLJ']:
+        if col in total_row.columns: total_row[col] = None
+    summary_with_total = pd.concat([summary_final, total_row], ignore_index=True)
+    
+    if audit_top_k:
+        return summary_with_total, build_match_audit(match_detail, audit_top_k)
+    return summary_with_total
+
+DAMA_COLOR_KEYWORDS = frozenset({
+    'merah', 'biru', 'hijau', 'kuning', 'hitam', 'putih', 'ungu', 'coklat', 'cokelat',
+    'abu', 'pink', 'gold', 'silver', 'cream', 'navy', 'maroon', 'random',
+    'army', 'olive', 'mocca', 'dusty', 'sage'
+})
+DAMA_KEEP_COLOR_KEYWORDS = ('PIRING', 'BAJU', 'MOBIL')
+
+def format_variation_dama(variation, product_name):
+    """Format variasi untuk DAMA.ID STORE SUMMARY."""
+    if pd.isna(variation):
+        return ''
+
+    var_str = str(variation).strip()
+    if var_str == '0':
+        return ''
+
+    product_name_upper = str(product_name).upper()
+
+    color_keywords = DAMA_COLOR_KEYWORDS
+    keep_keywords = VARIASI_PAPER_TYPES
+    keep_patterns = VARIASI_SIZE_PACKAGE_RES
+
+    keep_color = any(keyword in product_name_upper for keyword in DAMA_KEEP_COLOR_KEYWORDS)
+
+    parts = VARIASI_SPLIT_RE.split(var_str)
+    final_parts = []
+
+    for part in parts:
+        part_upper = part.upper()
+        part_lower = part.lower()
+
+        if not part or part == '0':
+            continue
+
+        is_color = part_lower in color_keywords
+
+        if not is_color or (is_color and keep_color):
+            is_kept_keyword = part_upper in keep_keywords
+            is_kept_pattern = any(pattern.fullmatch(part_upper) for pattern in keep_patterns)
+
+            if not is_color or keep_color or is_kept_keyword or is_kept_pattern:
+                 final_parts.append('KORAN' if part_upper == 'KK' else part)
+
+    unique_parts_ordered = list(dict.fromkeys(final_parts))
+
+    return ' '.join(unique_parts_ordered)
+
+# Kata kunci & pola variasi untuk pencocokan katalog DAMA (dikompilasi sekali saat import)
+DAMA_UKURAN_RE = re.compile(r'\b((A|B)\d{1,2})\b')
+DAMA_PAKET_RE = re.compile(r'\b(PAKET\s*\d+)\b')
+DAMA_PAPER_KEYWORDS = frozenset({'HVS', 'QPP', 'KORAN', 'KK', 'KWARTO', 'BIGBOS', 'ART PAPER'})
+DAMA_COLOR_KEYWORDS_SET = frozenset({'MERAH', 'BIRU', 'HIJAU', 'KUNING', 'HITAM', 'PUTIH', 'UNGU', 'COKLAT', 'COKELAT',
+                      'ABU', 'PINK', 'GOLD', 'SILVER', 'CREAM', 'NAVY', 'MAROON', 'RANDOM',
+                      'ARMY', 'OLIVE', 'MOCCA', 'DUSTY', 'SAGE'})
+DAMA_HIJAB_KEYWORDS = frozenset({'PASHMINA', 'HIJAB', 'PASMINA'})
+
+def pisah_nama_variasi_dama(summary_product_name):
+    """(nama dasar huruf besar, bagian variasi) dari nama SUMMARY DAMA 'Nama (Variasi)'."""
+    base_name = summary_product_name.strip()
+    variasi_part = ''
+    match = re.match(r'^(.*?)\s*\((.*?)\)$', summary_product_name.strip())
+    if match:
+        base_name = match.group(1).strip()
+        variasi_part = match.group(2).strip().upper()
+    return re.sub(r'\s+', ' ', base_name.upper()).strip(), variasi_part
+
+def get_harga_beli_dama(summary_product_name, katalog_dama_df, score_threshold_primary=80, score_threshold_fallback=75, index=None):
+    """Mencari harga beli dari KATALOG_DAMA."""
+    return get_harga_beli_dama_detail(summary_product_name, katalog_dama_df, score_threshold_primary,
+                                      score_threshold_fallback, index=index)['harga']
+
+def get_harga_beli_dama_detail(summary_product_name, katalog_dama_df, score_threshold_primary=80, score_threshold_fallback=75, index=None, top_k=0):
+    """Seperti get_harga_beli_dama, plus aturan penentu (strict/fallback/none) & top-k kandidat dari scan yang sama."""
+    kandidat = {}
+    try:
+        if pd.isna(summary_product_name) or not summary_product_name.strip():
+            return _hasil_match(0, 'none', 0, kandidat, top_k)
+
+        base_name_upper_clean, variasi_part = pisah_nama_variasi_dama(summary_product_name)
+
+        ukuran_in_var = ''
+        jenis_in_var = ''
+        paket_in_var = ''
+
+        size_match = DAMA_UKURAN_RE.search(variasi_part)
+        if size_match: ukuran_in_var = size_match.group(1)
+
+        variasi_words = set(re.split(r'\s+', variasi_part))
+        for paper in DAMA_PAPER_KEYWORDS:
+            if paper in variasi_words:
+                jenis_in_var = 'KORAN' if paper == 'KK' else paper
+                break
+
+        package_match = DAMA_PAKET_RE.search(variasi_part)
+        if package_match: 
+            paket_in_var = re.sub(r'\s+', ' ', package_match.group(1)).strip()
+        
+        warna_in_var = ''
+        found_colors = variasi_words.intersection(DAMA_COLOR_KEYWORDS_SET)
+        if found_colors:
+            warna_in_var = list(found_colors)[0]
+        
+        match_warna_required = any(keyword in base_name_upper_clean for keyword in DAMA_HIJAB_KEYWORDS)
+
+        best_strict_score = -1
+        best_strict_price = 0
+        best_strict_pos = None
+        
+        best_fallback_score = -1
+        best_fallback_price = 0
+        best_fallback_pos = None
+
+        # Blocking: hanya produk katalog yang berbagi token informatif dengan nama produk
+        if index is None:
+            index = build_katalog_index(katalog_dama_df, 'dama')
+        katalog_blok = block_katalog(base_name_upper_clean, katalog_dama_df, index)
+
+        # Nama katalog berulang per varian, jadi skor tiap nama cukup dihitung sekali
+        # (tanpa score_cutoff saat audit, supaya kandidat top-k tetap punya skor asli)
+        min_threshold = 0 if top_k else min(score_threshold_primary, score_threshold_fallback)
+        name_scores = {}
+
+        for pos, katalog_name, katalog_jenis, katalog_ukuran, katalog_paket, katalog_warna, katalog_harga in zip(
+                katalog_blok.index, katalog_blok['NAMA PRODUK'], katalog_blok['JENIS AL QUR\'AN'], katalog_blok['UKURAN'],
+                katalog_blok['PAKET'], katalog_blok['WARNA'], katalog_blok['HARGA']):
+            if katalog_name not in name_scores:
+                name_scores[katalog_name] = rapidfuzz.fuzz.token_set_ratio(base_name_upper_clean, katalog_name,
+                                                                 score_cutoff=min_threshold)
+            name_score = name_scores[katalog_name]
+
+            if top_k:
+                varian = ' '.join(v for v in [katalog_jenis, katalog_ukuran, katalog_paket, katalog_warna] if v)
+                kandidat[pos] = (name_score, f"{katalog_name} | {varian}" if varian else katalog_name, katalog_harga)
+
+            if name_score >= score_threshold_primary:
+                match_ok = True
+
+                if jenis_in_var and katalog_jenis != jenis_in_var:
+                    match_ok = False
+                if ukuran_in_var and katalog_ukuran != ukuran_in_var:
+                    match_ok = False
+                
+                if paket_in_var != katalog_paket:
+                    match_ok = False
+
+                if match_warna_required:
+                    if katalog_warna != warna_in_var:
+                        match_ok = False
+
+                if match_ok:
+                    if name_score > best_strict_score:
+                        best_strict_score = name_score
+                        best_strict_price = katalog_harga
+                        best_strict_pos = pos
+
+            if name_score >= score_threshold_fallback:
+                if name_score > best_fallback_score:
+                    best_fallback_score = name_score
+                    best_fallback_price = katalog_harga
+                    best_fallback_pos = pos
+
+        if best_strict_score != -1:
+            return _hasil_match(best_strict_price, 'strict', best_strict_score, kandidat, top_k, best_strict_pos)
+        
+        if best_fallback_score != -1:
+            return _hasil_match(best_fallback_price, 'fallback', best_fallback_score, kandidat, top_k, best_fallback_pos)
+
+        return _hasil_match(0, 'none', max(name_scores.values(), default=0), kandidat, top_k)
+    except Exception as e:
+        return _hasil_match(0, f'error: {e}', 0, kandidat, top_k)
+
+# Pencocokan harga beli per nama unik, bisa dibagi ke beberapa proses
+MATCH_PARALLEL_MIN_NAMES = 200
+
+# Jumlah kandidat katalog per nama di sheet 'MATCH AUDIT'
+MATCH_AUDIT_TOP_K = 3
+
+_MATCH_FUNCS = {
+    'fuzzy': get_harga_beli_fuzzy_detail,
+    'dama': get_harga_beli_dama_detail,
+}
+
+# Hanya kolom ini yang dikirim ke worker
+_MATCH_KATALOG_COLS = {
+    'fuzzy': ['JUDUL_NORM', 'JENIS_KERTAS_NORM', 'UKURAN_NORM', 'KATALOG_HARGA_NUM'],
+    'dama': ['NAMA PRODUK', "JENIS AL QUR'AN", 'UKURAN', 'PAKET', 'WARNA', 'HARGA'],
+}
+
+_worker_katalog = {}
+
+def default_match_workers():
+    """Jumlah worker default untuk pencocokan paralel (semua core CPU yang boleh dipakai proses ini)."""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+def konteks_proses_worker():
+    """Context multiprocessing untuk process pool: 'forkserver' (atau 'spawn' jika tidak tersedia), bukan 'fork'.
+
+    Server Streamlit multi-thread; fork dari proses seperti itu bisa membuat worker deadlock pada lock
+    yang sedang dipegang thread lain (logging, allocator). Worker cukup meng-import modul ini (tanpa
+    Streamlit): forkserver memuatnya sekali (bersama modul __main__, supaya tidak diulang per worker),
+    lalu setiap worker di-fork dari proses server yang bersih.
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        konteks = multiprocessing.get_context('forkserver')
+        konteks.set_forkserver_preload(list(dict.fromkeys(['__main__', __name__])))
+        return konteks
+    return multiprocessing.get_context('spawn')
+
+def _init_match_worker(kind, katalog, index):
+    """Initializer worker: katalog & index dikirim sekali per proses, bukan per nama."""
+    _worker_katalog[kind] = (katalog, index)
+
+def _match_chunk(kind, names, top_k):
+    """Mencocokkan satu potongan nama di dalam worker."""
+    func = _MATCH_FUNCS[kind]
+    katalog, index = _worker_katalog[kind]
+    return [(name, func(name, katalog, index=index, top_k=top_k)) for name in names]
+
+# ============================================
+# VERSI KATALOG (pencocokan inkremental)
+# ============================================
+
+# Snapshot terakhir per jenis katalog: kolom pencocokan, hash isi per baris, inverted index
+# & cache hasil pencocokan. Saat katalog diedit, hanya baris yang berubah yang di-index ulang
+# dan hanya hasil nama yang bisa terpengaruh yang dibuang dari cache.
+_VERSI_KATALOG = {'lock': threading.Lock(), 'snapshot': {}}
+
+def token_blok_nama(nama, kind):
+    """Token informatif yang dipakai get_harga_beli_*_detail untuk blocking nama ini (None jika tidak diketahui)."""
+    try:
+        if kind == 'fuzzy':
+            search_name = str(nama).strip()
+            return tokens_informatif(bersihkan_nama_fuzzy(search_name)) if search_name else None
+        if pd.isna(nama) or not nama.strip():
+            return None
+        return tokens_informatif(pisah_nama_variasi_dama(nama)[0])
+    except Exception:
+        return None
+
+def _diff_katalog(hash_lama, hash_baru):
+    """Memasangkan baris lama & baru yang isinya sama (baris kembar dipasangkan sesuai urutan).
+
+    Mengembalikan (posisi baru tiap baris lama atau -1, posisi lama tiap baris baru atau -1).
+    """
+    lama = pd.DataFrame({'hash': hash_lama, 'pos_lama': np.arange(len(hash_lama))})
+    baru = pd.DataFrame({'hash': hash_baru, 'pos_baru': np.arange(len(hash_baru))})
+    lama['ke'] = lama.groupby('hash').cumcount()
+    baru['ke'] = baru.groupby('hash').cumcount()
+    sama = lama.merge(baru, on=['hash', 'ke'])
+    ke_baru = np.full(len(hash_lama), -1)
+    ke_baru[sama['pos_lama'].to_numpy()] = sama['pos_baru'].to_numpy()
+    ke_lama = np.full(len(hash_baru), -1)
+    ke_lama[sama['pos_baru'].to_numpy()] = sama['pos_lama'].to_numpy()
+    return ke_baru, ke_lama
+
+def _perbarui_index_katalog(snapshot, katalog_baru, kind, ke_baru, ke_lama):
+    """Inverted index katalog baru dari index lama: hanya token baris yang berubah yang disentuh."""
+    kolom = KATALOG_INDEX_COL[kind]
+    dihapus = np.flatnonzero(ke_baru < 0)
+    ditambah = np.flatnonzero(ke_lama < 0)
+    judul_lama = snapshot['katalog'][kolom].astype(str).to_numpy()
+    judul_baru = katalog_baru[kolom].astype(str).to_numpy()
+
+    geser = not (len(ke_baru) == len(ke_lama) and np.array_equal(ke_baru[ke_baru >= 0], np.flatnonzero(ke_baru >= 0)))
+    if geser:
+        # Posisi baris yang tetap ikut bergeser karena ada sisipan/hapusan
+        index = {}
+        for token, posisi in snapshot['index'].items():
+            baru = ke_baru[posisi]
+            baru = baru[baru >= 0]
+            if len(baru):
+                index[token] = baru.tolist()
+    else:
+        index = dict(snapshot['index'])
+        for pos in dihapus:
+            for token in tokens_informatif(judul_lama[pos]):
+                index[token] = [p for p in index[token] if p != pos]
+                if not index[token]:
+                    del index[token]
+
+    token_berubah = set()
+    for pos in dihapus:
+        token_berubah |= tokens_informatif(judul_lama[pos])
+    for pos in ditambah:
+        tokens = tokens_informatif(judul_baru[pos])
+        token_berubah |= tokens
+        for token in tokens:
+            index[token] = sorted(index.get(token, []) + [int(pos)])
+    return index, token_berubah
+
+def katalog_terversi(katalog_df, kind):
+    """Snapshot katalog untuk pencocokan; dibuat ulang secara inkremental jika isi katalog berubah.
+
+    Hasil pencocokan satu nama hanya bergantung pada baris katalog yang berbagi token informatif
+    dengannya (lihat block_katalog), jadi cache nama lain tetap berlaku setelah katalog diedit.
+    Jika urutan baris yang tidak berubah ikut teracak, index & cache dibangun ulang penuh.
+    """
+    cols = [c for c in _MATCH_KATALOG_COLS[kind] if c in katalog_df.columns]
+    katalog_slim = katalog_df[cols].reset_index(drop=True)
+    hash_baru = pd.util.hash_pandas_object(katalog_slim, index=False).to_numpy()
+
+    with _VERSI_KATALOG['lock']:
+        snapshot = _VERSI_KATALOG['snapshot'].get(kind)
+        if snapshot is not None and snapshot['kolom'] == cols and np.array_equal(snapshot['hash'], hash_baru):
+            return snapshot
+
+        urutan_tetap = False
+        if snapshot is not None and snapshot['kolom'] == cols:
+            ke_baru, ke_lama = _diff_katalog(snapshot['hash'], hash_baru)
+            urutan_tetap = bool(np.all(np.diff(ke_lama[ke_lama >= 0]) > 0))
+
+        if not urutan_tetap:
+            snapshot = {'kolom': cols, 'katalog': katalog_slim, 'hash': hash_baru,
+                        'index': build_katalog_index(katalog_slim, kind), 'cache': {},
+                        'versi': snapshot['versi'] + 1 if snapshot else 1}
+        else:
+            index, token_berubah = _perbarui_index_katalog(snapshot, katalog_slim, kind, ke_baru, ke_lama)
+            index_lama = snapshot['index']
+
+            def masih_berlaku(name):
+                # Blok kosong = seluruh katalog dipindai, jadi ikut terpengaruh
+                tokens = token_blok_nama(name, kind)
+                return (bool(tokens) and not (tokens & token_berubah)
+                        and any(t in index_lama for t in tokens) and any(t in index for t in tokens))
+
+            cache = {key: detail for key, detail in snapshot['cache'].items() if masih_berlaku(key[2])}
+            snapshot = {'kolom': cols, 'katalog': katalog_slim, 'hash': hash_baru, 'index': index,
+                        'cache': cache, 'versi': snapshot['versi'] + 1}
+        _VERSI_KATALOG['snapshot'][kind] = snapshot
+        return snapshot
+
+# Tabel override harga beli per toko: nama produk SUMMARY (sudah termasuk variasi) -> harga beli.
+# Nama yang ada di sini tidak lagi dicocokkan ke katalog; diisi dari UI setelah MATCH AUDIT diperiksa.
+MATCH_OVERRIDE_FILE = 'OVERRIDE HARGA BELI.csv'
+MATCH_OVERRIDE_COLS = ['TOKO', 'NAMA PRODUK', 'HARGA BELI', 'KATALOG']
+
+def load_match_override(path=MATCH_OVERRIDE_FILE, missing_ok=True):
+    """Membaca tabel override harga beli (kolom TOKO, NAMA PRODUK, HARGA BELI, KATALOG opsional)."""
+    try:
+        override = pd.read_csv(path, dtype=str)
+    except FileNotFoundError:
+        if not missing_ok:
+            raise
+        return pd.DataFrame({col: pd.Series([], dtype='int64' if col == 'HARGA BELI' else object) for col in MATCH_OVERRIDE_COLS})
+    override.columns = [str(c).strip().upper() for c in override.columns]
+    if 'KATALOG' not in override.columns:
+        override['KATALOG'] = ''
+    missing_cols = [c for c in MATCH_OVERRIDE_COLS if c not in override.columns]
+    if missing_cols:
+        raise ValueError(f"Kolom {missing_cols} tidak ditemukan di {path}")
+    override = override.dropna(subset=['TOKO', 'NAMA PRODUK', 'HARGA BELI'])
+    override['TOKO'] = override['TOKO'].str.strip()
+    override['NAMA PRODUK'] = normalize_nama_produk(override['NAMA PRODUK'])
+    override['HARGA BELI'] = clean_and_convert_to_numeric(override['HARGA BELI']).round().astype('int64')
+    override['KATALOG'] = override['KATALOG'].fillna('').str.strip()
+    # Baris terakhir menang jika satu produk tercatat lebih dari sekali
+    return override[MATCH_OVERRIDE_COLS].drop_duplicates(['TOKO', 'NAMA PRODUK'], keep='last').reset_index(drop=True)
+
+def match_override_toko(override_df, toko):
+    """Dict nama produk ternormalisasi -> (harga beli, judul katalog) untuk satu toko."""
+    if override_df is None or override_df.empty:
+        return {}
+    baris = override_df[override_df['TOKO'] == toko]
+    return {nama: (int(harga), katalog)
+            for nama, harga, katalog in zip(baris['NAMA PRODUK'], baris['HARGA BELI'], baris['KATALOG'])}
+
+def simpan_match_override(toko, nama_produk, harga_beli, katalog='', path=MATCH_OVERRIDE_FILE):
+    """Menambah/mengganti satu baris override lalu menulis ulang file; mengembalikan tabel terbaru.
+
+    Beberapa sesi bisa menyimpan bersamaan, jadi file dibaca ulang & ditulis selama dikunci (seperti kamus iklan).
+    """
+    baru = pd.DataFrame({
+        'TOKO': [toko],
+        'NAMA PRODUK': normalize_nama_produk(pd.Series([nama_produk])),
+        'HARGA BELI': [int(round(harga_beli))],
+        'KATALOG': [katalog or ''],
+    })
+    with _kunci_file(path):
+        override = load_match_override(path)
+        override = override[~((override['TOKO'] == toko) & (override['NAMA PRODUK'] == baru['NAMA PRODUK'].iloc[0]))]
+        override = pd.concat([override, baru], ignore_index=True)
+        _tulis_csv_atomik(override, path)
+    return override
+
+def match_harga_beli(names, katalog_df, kind='fuzzy', workers=1, min_parallel=None, top_k=0, cache=None, override=None):
+    """Mencari harga beli untuk Series nama produk; setiap nama unik dicocokkan sekali.
+
+    Dengan workers > 1 dan nama unik >= min_parallel, nama dibagi ke process pool.
+    Hasil tiap nama tidak bergantung pada urutan, jadi sama persis dengan mode serial.
+    `cache` (dict, untuk satu katalog yang sama) menyimpan hasil antar pemanggilan; tanpa `cache`
+    dipakai cache versi katalog (lihat katalog_terversi) yang berlaku untuk semua sesi di proses ini
+    selama katalog tidak berubah; cache ini tidak dibagi ke proses lain (worker pool, watch).
+    Hanya nama yang belum ada di cache yang dicocokkan.
+    `override` (dict dari match_override_toko) dicek lebih dulu: nama yang ada di sana
+    langsung memakai harga override tanpa pencocokan katalog.
+    Mengembalikan (Series harga, dict nama -> detail pencocokan untuk audit).
+    """
+    if min_parallel is None:
+        min_parallel = MATCH_PARALLEL_MIN_NAMES
+    func = _MATCH_FUNCS[kind]
+    all_names = list(pd.unique(names))
+    versi = katalog_terversi(katalog_df, kind)
+    katalog_slim, index = versi['katalog'], versi['index']
+    if cache is None:
+        cache = versi['cache']
+    override_map = {}
+    if override:
+        kunci = normalize_nama_produk(pd.Series(all_names, dtype=object))
+        for name, key in zip(all_names, kunci):
+            if key in override:
+                harga, katalog = override[key]
+                override_map[name] = _hasil_match(harga, 'override', 100.0, {0: (100.0, katalog or key, harga)}, top_k, 0)
+    unique_names = [name for name in all_names if name not in override_map and (kind, top_k, name) not in cache]
+
+    use_parallel = workers > 1 and len(unique_names) >= min_parallel
+
+    if not use_parallel:
+        detail_map = {name: func(name, katalog_slim, index=index, top_k=top_k) for name in unique_names}
+    else:
+        n_chunks = min(len(unique_names), workers * 4)
+        chunks = [unique_names[i::n_chunks] for i in range(n_chunks)]
+        detail_map = {}
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=konteks_proses_worker(),
+                                 initializer=_init_match_worker,
+                                 initargs=(kind, katalog_slim, index)) as executor:
+            for part in executor.map(_match_chunk, [kind] * n_chunks, chunks, [top_k] * n_chunks):
+                detail_map.update(part)
+
+    # Cache versi katalog dibaca & disaring katalog_terversi di thread lain, jadi diisi di bawah lock yang sama
+    with _VERSI_KATALOG['lock']:
+        cache.update({(kind, top_k, name): detail for name, detail in detail_map.items()})
+    detail_map = {name: override_map[name] if name in override_map else cache[(kind, top_k, name)] for name in all_names}
+
+    def harga(name):
+        if name not in detail_map:
+            detail_map[name] = func(name, katalog_slim, index=index, top_k=top_k)
+        return detail_map[name]['harga']
+
+    return names.map(harga), detail_map
+
+def build_match_audit(detail_map, top_k=3):
+    """Menyusun sheet 'MATCH AUDIT': harga beli, aturan penentu & top-k kandidat per nama produk."""
+    rows = []
+    for name, detail in detail_map.items():
+        row = {
+            'Nama Produk': name,
+            'Harga Beli': detail['harga'],
+            'Aturan': detail['aturan'],
+            'Skor Terbaik': round(detail['skor'], 1),
+        }
+        for i in range(top_k):
+            skor, judul, harga = detail['kandidat'][i] if i < len(detail['kandidat']) else (None, None, None)
+            row[f'Kandidat {i + 1}'] = judul
+            row[f'Skor {i + 1}'] = round(skor, 1) if skor is not None else None
+            row[f'Harga {i + 1}'] = harga
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+def get_eksemplar_multiplier_dama(nama_produk):
+    if pd.isna(nama_produk): return 1
+    nama_produk = str(nama_produk).upper()
+    if 'BIGBOS' in nama_produk:
+        return 1
+    match = re.search(r'(?:PAKET\s*ISI|PAKET|ISI)\s*(\d+)', nama_produk)
+    if match:
+        return int(match.group(1))
+    if 'SATUAN' in nama_produk:
+        return 1
+    return 1
+    
+def aggregate_rekap_summary_dama(rekap_df, backend='pandas'):
+    """Agregasi REKAP DAMA.ID STORE per Nama Produk (+variasi) & Harga Satuan."""
+    rekap_copy = rekap_df.copy()
+
+    kondisi_retur_summary = rekap_copy['Total Penghasilan'] <= 0
+    
+    rekap_copy.loc[kondisi_retur_summary, 'Jumlah Terjual'] = 0
+    rekap_copy.loc[kondisi_retur_summary, 'Total Harga Produk'] = 0
+
+    rekap_copy['Nama Produk Original'] = rekap_copy['Nama Produk']
+    if 'Nama Variasi' in rekap_copy.columns:
+        # Variasi diformat sekali per pasangan (variasi, produk) unik
+        rekap_copy['Formatted Variation'] = apply_unique(
+            format_variation_dama, rekap_copy['Nama Variasi'], rekap_copy['Nama Produk Original']
+        )
+        nama_original = rekap_copy['Nama Produk Original']
+        rekap_copy['Nama Produk Display'] = nama_original.where(
+            rekap_copy['Formatted Variation'] == '',
+            nama_original.astype(str) + ' (' + rekap_copy['Formatted Variation'] + ')'
+        )
+    else:
+         rekap_copy['Nama Produk Display'] = rekap_copy['Nama Produk Original']
+         rekap_copy['Formatted Variation'] = ''
+
+    grouping_key_list = ['Nama Produk Display', 'Harga Satuan']
+    
+    agg_dict = {
+        'Nama Produk Original': 'first',
+        'Nama Produk Display': 'first',
+        'Jumlah Terjual': 'sum', 
+        'Total Harga Produk': 'sum',
+        'Voucher Ditanggung Penjual': 'sum', 'Biaya Komisi AMS + PPN Shopee': 'sum',
+        'Biaya Adm 8%': 'sum', 'Biaya Layanan 2%': 'sum',
+        'Biaya Layanan Gratis Ongkir Xtra 4,5%': 'sum', 'Biaya Proses Pesanan': 'sum',
+        'Total Penghasilan': 'sum'
+    }
+    
+    summary_df = groupby_agg(rekap_copy, grouping_key_list, agg_dict, backend=backend)
+    summary_df.rename(columns={'Nama Produk Display': 'Nama Produk'}, inplace=True)
+    return summary_df
+
+def merge_summary_aggregates(partial_aggs, backend='pandas'):
+    """Menggabungkan agregat SUMMARY parsial (per file/minggu) menjadi satu agregat."""
+    partial_aggs = [df for df in partial_aggs if df is not None and not df.empty]
+    if not partial_aggs:
+        return None
+    gabungan = pd.concat(partial_aggs, ignore_index=True)
+    agg_dict = {col: 'sum' for col in gabungan.columns if col not in ('Nama Produk', 'Harga Satuan')}
+    if 'Nama Produk Original' in agg_dict:
+        agg_dict['Nama Produk Original'] = 'first'
+    return groupby_agg(gabungan, ['Nama Produk', 'Harga Satuan'], agg_dict, backend=backend)
+
+def process_summary_dama(rekap_df, iklan_final_df, katalog_dama_df, harga_custom_tlj_df, jumlah_hari=7, summary_agg=None, backend='pandas', match_workers=1, audit_top_k=0, fees=None, match_cache=None, match_override=None):
+    """Fungsi untuk memproses sheet 'SUMMARY' untuk DAMA.ID STORE."""
+    fees = fee_schedule(fees)
+    if summary_agg is None:
+        summary_agg = aggregate_rekap_summary_dama(rekap_df, backend=backend)
+    summary_df = summary_agg[summary_agg['Total Penghasilan'] != 0].copy()
+
+    summary_df['Iklan Klik'] = 0.0
+    profil = get_store_profile('DAMA.ID STORE')
+    iklan_data = iklan_final_df[iklan_final_df['Nama Iklan'] != 'TOTAL'][['Nama Iklan', 'Biaya']].copy()
+    
+    summary_df, iklan_data = alokasi_iklan_paket(summary_df, iklan_data, profil['force_config'], get_eksemplar_multiplier_dama)
+    if not iklan_data.empty:
+        summary_df, iklan_data = alokasi_iklan_biasa(summary_df, iklan_data, profil['produk_iklan_biasa'])
+                
+    summary_df = pd.merge(summary_df, iklan_data, left_on='Nama Produk Original', right_on='Nama Iklan', how='left')
+    summary_df['Iklan Klik'] = summary_df['Iklan Klik'] + summary_df['Biaya'].fillna(0)
+    summary_df.drop(columns=['Nama Iklan', 'Biaya'], inplace=True, errors='ignore')
+
+    iklan_only_names = set(iklan_data['Nama Iklan']) - set(summary_df['Nama Produk Original'])
+    if iklan_only_names:
+        iklan_only_df = iklan_data[iklan_data['Nama Iklan'].isin(iklan_only_names)].copy()
+        iklan_only_df.rename(columns={'Nama Iklan': 'Nama Produk', 'Biaya': 'Iklan Klik'}, inplace=True)
+        iklan_only_df['Nama Produk Original'] = iklan_only_df['Nama Produk']
+        summary_df = pd.concat([summary_df, iklan_only_df], ignore_index=True)
+    summary_df.fillna(0, inplace=True)
+
+    summary_df['Penjualan Netto'] = (
+        summary_df['Total Harga Produk'] - summary_df['Voucher Ditanggung Penjual'] -
+        summary_df['Biaya Komisi AMS + PPN Shopee'] - summary_df['Biaya Adm 8%'] -
+        summary_df['Biaya Layanan 2%'] - summary_df['Biaya Layanan Gratis Ongkir Xtra 4,5%'] -
+        summary_df['Biaya Proses Pesanan']
+    )
+    summary_df['Biaya Packing'] = summary_df['Jumlah Terjual'] * fees['biaya_packing_per_unit']
+
+    summary_df['Jumlah Eksemplar'] = summary_df.apply(
+        lambda row: row['Jumlah Terjual'] * get_eksemplar_multiplier_dama(row['Nama Produk']),
+        axis=1
+    )
+    
+    kondisi_hijab = summary_df['Nama Produk Original'].str.upper().str.contains(profil['produk_tanpa_eksemplar_re'], na=False)
+    summary_df.loc[kondisi_hijab, 'Jumlah Eksemplar'] = 0
+    
+    summary_df['Biaya Ekspedisi'] = 0
+    biaya_ekspedisi_final = summary_df['Biaya Ekspedisi']
+
+    if match_override is None:
+        match_override = load_match_override()
+    summary_df['Harga Beli'], match_detail = match_harga_beli(summary_df['Nama Produk'], katalog_dama_df, kind='dama',
+                                                              workers=match_workers, top_k=audit_top_k,
+                                                              cache=match_cache,
+                                                              override=match_override_toko(match_override, 'DAMA.ID STORE'))
+
+    summary_df = pd.merge(
+        summary_df,
+        harga_custom_tlj_df[['LOOKUP_KEY', 'HARGA CUSTOM TLJ']],
+        left_on='Nama Produk',
+        right_on='LOOKUP_KEY', how='left'
+    )
+    summary_df.rename(columns={'HARGA CUSTOM TLJ': 'Harga Custom TLJ'}, inplace=True)
+    summary_df['Harga Custom TLJ'] = summary_df['Harga Custom TLJ'].fillna(0)
+    summary_df.drop(columns=['LOOKUP_KEY'], inplace=True, errors='ignore')
+
+    kondisi_custom = summary_df['Nama Produk Original'].str.contains(profil['produk_custom_re'], na=False)
+    summary_df['Total Pembelian'] = np.where(
+        kondisi_custom,
+        (summary_df['Jumlah Terjual'] * summary_df['Harga Beli']) + (summary_df['Jumlah Terjual'] * summary_df['Harga Custom TLJ']),
+        summary_df['Jumlah Terjual'] * summary_df['Harga Beli']
+    )
+
+    metrik = hitung_metrik_summary(summary_df, 'Biaya Ekspedisi', jumlah_hari, fees['biaya_proses_pesanan'])
+    summary_df[metrik.columns] = metrik
+
+    summary_final_data = {
+        'No': np.arange(1, len(summary_df) + 1),
+        'Nama Produk': summary_df['Nama Produk'],
+        'Jumlah Terjual': summary_df['Jumlah Terjual'], 'Jumlah Eksemplar': summary_df['Jumlah Eksemplar'], 
+        'Jumlah Pesanan': summary_df['Jumlah Pesanan'], 'Harga Satuan': summary_df['Harga Satuan'],
+        'Total Penjualan': summary_df['Total Harga Produk'], 'Voucher Ditanggung Penjual': summary_df['Voucher Ditanggung Penjual'],
+        'Biaya Komisi AMS + PPN Shopee': summary_df['Biaya Komisi AMS + PPN Shopee'], 'Biaya Adm 8%': summary_df['Biaya Adm 8%'],
+        'Biaya Layanan 2%': summary_df['Biaya Layanan 2%'], 'Biaya Layanan Gratis Ongkir Xtra 4,5%': summary_df['Biaya Layanan Gratis Ongkir Xtra 4,5%'],
+        'Biaya Proses Pesanan': summary_df['Biaya Proses Pesanan'],
+        'Penjualan Netto': summary_df['Penjualan Netto'], 'Iklan Klik': summary_df['Iklan Klik'], 'Biaya Packing': summary_df['Biaya Packing'],
+        'Biaya Ekspedisi': biaya_ekspedisi_final,
+        'Harga Beli': summary_df['Harga Beli'], 'Harga Custom TLJ': summary_df['Harga Custom TLJ'],
+        'Total Pembelian': summary_df['Total Pembelian'], 'Margin': summary_df['Margin'],
+        'Persentase': summary_df['Persentase'],
+        'Penjualan Per Hari': summary_df['Penjualan Per Hari'], 'Jumlah buku per pesanan': summary_df['Jumlah buku per pesanan']
+    }
+    summary_final = pd.DataFrame(summary_final_data)
+
+    summary_final['Nama Produk'] = summary_final['Nama Produk'].apply(singkat_nama_produk, profil=profil)
+    
+    summary_final['Nama Produk'] = summary_final['Nama Produk'].astype(str)
+    
+    summary_final = summary_final.sort_values(by='Nama Produk', ascending=True).reset_index(drop=True)
+    summary_final['No'] = range(1, len(summary_final) + 1)
+
+    if 'Nama Produk Original' in summary_final.columns:
+         summary_final = summary_final.drop(columns=['Nama Produk Original'])
+
+    total_row = pd.DataFrame(summary_final.sum(numeric_only=True)).T
+    total_row['Nama Produk'] = 'Total'
+    total_row = isi_metrik_total(total_row, jumlah_hari, fees['biaya_proses_pesanan'])
+    for col in ['Harga Satuan', 'Harga Beli', 'No', 'Harga Custom TLJ']:
+        if col in total_row.columns: total_row[col] = None
+    summary_with_total = pd.concat([summary_final, total_row], ignore_index=True)
+
+    if audit_top_k:
+        return summary_with_total, build_match_audit(match_detail, audit_top_k)
+    return summary_with_total
+
+
+# ============================================
+# FUNGSI-FUNGSI REKAPAN (MINGGUAN & PERIODE)
+# ============================================
+
+KOLOM_ORDER_REKAP = [
+    'No. Pesanan', 'Nama Produk', 'Nama Variasi', 'Jumlah', 'Harga Setelah Diskon',
+    'Total Harga Produk', 'Status Pembatalan/ Pengembalian'
+]
+
+def clean_rekap_inputs(order_all_df, income_dilepas_df, iklan_produk_df, seller_conversion_df):
+    """Membersihkan kolom-kolom angka pada file input rekapan (in-place)."""
+    cols_to_clean_order = ['Harga Setelah Diskon', 'Total Harga Produk']
+    for col in cols_to_clean_order:
+        if order_all_df is not None and col in order_all_df.columns:
+            order_all_df[col] = clean_order_all_numeric(order_all_df[col])
+
+    other_financial_data_to_clean = [
+        (income_dilepas_df, ['Voucher dari Penjual', 'Biaya Administrasi', 'Biaya Proses Pesanan', 'Total Penghasilan']),
+        (iklan_produk_df, ['Biaya', 'Omzet Penjualan']),
+        (seller_conversion_df, ['Pengeluaran(Rp)'])
+    ]
+
+    for df, cols in other_financial_data_to_clean:
+        if df is None:
+            continue
+        for col in cols:
+            if col in df.columns:
+                df[col] = clean_and_convert_to_numeric(df[col])
+
+# ============================================
+# SKEMA FILE EXPORT SHOPEE
+# ============================================
+
+# Skema per jenis file export: argumen baca (sheet & dtype), kolom wajib, dan kolom waktu
+# beserta format yang diterima (dicoba berurutan, lihat parse_waktu). Kolom waktu diparse sekali saat file dibaca; proses berikutnya
+# memakai hasilnya. Kunci pesanan dibaca sebagai teks. File yang kolomnya kurang langsung
+# ditolak sebelum diproses.
+SKEMA_EXPORT_SHOPEE = {
+    'order_all': {
+        'label': 'Order-all',
+        'baca': dict(dtype={'No. Pesanan': str, 'Harga Setelah Diskon': str, 'Total Harga Produk': str}),
+        'wajib': KOLOM_ORDER_REKAP,
+        'waktu': {'Waktu Pesanan Dibuat': FORMAT_WAKTU_SHOPEE},
+    },
+    'order_all_harian': {
+        'label': 'Order-all',
+        'baca': dict(dtype={'No. Pesanan': str, 'Total Harga Produk': str, 'Jumlah': str, 'Harga Satuan': str}),
+        'wajib': ['No. Pesanan', 'Waktu Pesanan Dibuat', 'Nama Produk', 'Nama Variasi', 'Jumlah', 'Total Harga Produk'],
+        'waktu': {'Waktu Pesanan Dibuat': FORMAT_WAKTU_SHOPEE},
+    },
+    'income': {
+        'label': 'Income dilepas',
+        'baca': dict(sheet_name='Income', dtype={'No. Pesanan': str}),
+        'wajib': ['No. Pesanan', 'Waktu Pesanan Dibuat', 'Tanggal Dana Dilepaskan', 'Voucher dari Penjual',
+                  'Promo Gratis Ongkir dari Penjual', 'Total Penghasilan'],
+        'waktu': {'Waktu Pesanan Dibuat': FORMAT_WAKTU_SHOPEE},
+    },
+    'iklan': {
+        'label': 'Iklan produk',
+        'baca': {},
+        'wajib': ['Nama Iklan', 'Dilihat', 'Jumlah Klik', 'Biaya', 'Produk Terjual', 'Omzet Penjualan'],
+    },
+    'seller_conversion': {
+        'label': 'Seller conversion',
+        'baca': dict(dtype={'Kode Pesanan': str}),
+        'wajib': ['Kode Pesanan', 'Pengeluaran(Rp)'],
+    },
+    'seller_conversion_harian': {
+        'label': 'Seller conversion',
+        'baca': dict(dtype={'Kode Pesanan': str, 'Pengeluaran(Rp)': str}),
+        'wajib': ['Kode Pesanan', 'Pengeluaran(Rp)'],
+    },
+    'hourly': {
+        'label': 'Hourly performance',
+        'baca': dict(sheet_name='Hourly_Performance'),
+        'wajib': [],
+    },
+}
+
+def terapkan_skema(df, jenis):
+    """Validasi kolom wajib & parse kolom waktu sesuai skema; ValueError berisi pesan yang jelas jika tidak cocok."""
+    skema = SKEMA_EXPORT_SHOPEE[jenis]
+    df = clean_columns(df)
+    kurang = [col for col in skema['wajib'] if col not in df.columns]
+    if kurang:
+        raise ValueError(f"Bukan file {skema['label']} yang valid, kolom tidak ditemukan: {', '.join(kurang)}")
+    for col, formats in skema.get('waktu', {}).items():
+        if col not in df.columns or pd.api.types.is_datetime64_any_dtype(df[col]):
+            continue
+        waktu = parse_waktu(df[col], formats)
+        gagal = waktu.isna() & df[col].notna() & (df[col].astype(str).str.strip() != '')
+        if gagal.any():
+            baris = df.index.get_loc(gagal.idxmax()) + 2
+            raise ValueError(f"Kolom '{col}' di file {skema['label']} tidak sesuai format {' / '.join(formats)} "
+                             f"(baris {baris}: '{df.loc[gagal, col].iloc[0]}')")
+        df[col] = waktu
+    return df
+
+# Argumen pd.read_excel untuk blok tanggal di sheet 'Summary' file income dilepas
+BACA_INCOME_SUMMARY = dict(sheet_name='Summary', header=None, nrows=10, usecols="B")
+
+def tanggal_income_summary(df_date_raw):
+    """Tanggal awal & akhir dari blok 'Summary' income dilepas (NaT/None jika tidak terbaca)."""
+    try:
+        tgl_awal, tgl_akhir = df_date_raw.iloc[6, 0], df_date_raw.iloc[7, 0]
+    except:
+        return None, None
+    return (pd.to_datetime(tgl_awal, format=FORMAT_TANGGAL_SHOPEE, errors='coerce'),
+            pd.to_datetime(tgl_akhir, format=FORMAT_TANGGAL_SHOPEE, errors='coerce'))
+
+def read_income_date_range(file_income):
+    """Mengambil tanggal awal & akhir dari sheet 'Summary' file income dilepas."""
+    try:
+        df_date_raw = baca_tabel_input(file_income, **BACA_INCOME_SUMMARY)
+    except:
+        return None, None
+    return tanggal_income_summary(df_date_raw)
+
+def _data_file(file):
+    """Isi file upload/BytesIO/file terbuka sebagai bytes (bisa dikirim ke worker); path dikirim apa adanya."""
+    if hasattr(file, 'getvalue'):
+        return file.getvalue()
+    if hasattr(file, 'read'):
+        posisi = file.tell()
+        data = file.read()
+        file.seek(posisi)
+        return data
+    return file
+
+def _ukuran_file(file):
+    """Ukuran file input dalam byte (upload, BytesIO, file terbuka atau path)."""
+    if hasattr(file, 'size'):
+        return file.size
+    if hasattr(file, 'getbuffer'):
+        return file.getbuffer().nbytes
+    if isinstance(file, (str, os.PathLike)):
+        return os.path.getsize(file)
+    posisi = file.tell()
+    ukuran = file.seek(0, os.SEEK_END)
+    file.seek(posisi)
+    return ukuran
+
+def _nama_file(file):
+    if getattr(file, 'name', None):
+        return file.name
+    return os.path.basename(file) if isinstance(file, (str, os.PathLike)) else 'file'
+
+# Pool ingesti baru dipakai jika file kedua terbesar minimal sebesar ini (lihat baca_excel_paralel)
+INGEST_PARALEL_MIN_BYTES = 512 * 1024
+
+# File input yang diterima: export asli (xlsx), CSV, CSV gzip, atau zip berisi export (csv/csv.gz/xlsx)
+EKSTENSI_INPUT = ['xlsx', 'csv', 'csv.gz', 'zip']
+
+def jenis_file_input(data, nama=''):
+    """'xlsx', 'csv', 'csv.gz' atau 'zip' dari tanda tangan isi file (nama file hanya untuk CSV polos)."""
+    if isinstance(data, bytes):
+        awal = data[:4]
+    else:
+        with open(data, 'rb') as f:
+            awal = f.read(4)
+    if awal.startswith(b'\x1f\x8b'):
+        return 'csv.gz'
+    if awal.startswith(b'PK'):
+        with zipfile.ZipFile(io.BytesIO(data) if isinstance(data, bytes) else data) as arsip:
+            return 'xlsx' if '[Content_Types].xml' in arsip.namelist() else 'zip'
+    return 'csv' if str(nama).lower().endswith('.csv') else 'xlsx'
+
+def _indeks_kolom_excel(usecols):
+    """Huruf kolom gaya pd.read_excel ('B', 'A:C,E') -> daftar indeks kolom untuk pd.read_csv."""
+    def indeks(huruf):
+        nilai = 0
+        for ch in huruf.strip().upper():
+            nilai = nilai * 26 + ord(ch) - ord('A') + 1
+        return nilai - 1
+    hasil = []
+    for bagian in usecols.split(','):
+        awal, _, akhir = bagian.partition(':')
+        hasil.extend(range(indeks(awal), indeks(akhir or awal) + 1))
+    return hasil
+
+def _baca_csv_pyarrow(isi, dtype, usecols):
+    # Tipe kolom ditebak dari blok pertama; kolom tanggal dibaca sebagai teks seperti sel teks xlsx
+    pa = importlib.import_module('pyarrow')
+    pacsv = importlib.import_module('pyarrow.csv')
+    skema = pacsv.open_csv(io.BytesIO(isi)).schema
+    teks = {f.name: pa.string() for f in skema if dtype.get(f.name) is str or pa.types.is_temporal(f.type)}
+    kolom = [f.name for f in skema if usecols(f.name)] if usecols else None
+    opsi = pacsv.ConvertOptions(column_types=teks, include_columns=kolom, strings_can_be_null=True)
+    # Sel kosong di kolom teks jadi NaN (bukan None), sama seperti pd.read_excel/pd.read_csv
+    return pacsv.read_csv(io.BytesIO(isi), convert_options=opsi).to_pandas().fillna(np.nan)
+
+def baca_csv(isi, **kwargs):
+    """Membaca satu tabel CSV (bytes) dengan argumen gaya pd.read_excel (dtype, header, nrows, usecols).
+
+    Dengan pyarrow terpasang, tabel data dibaca multi-thread; selain itu (atau jika pyarrow gagal)
+    memakai pd.read_csv. Kedua jalur sama-sama membiarkan kolom tanggal sebagai teks.
+    """
+    kwargs.pop('sheet_name', None)
+    usecols = kwargs.get('usecols')
+    if isinstance(usecols, str):
+        kwargs['usecols'] = usecols = _indeks_kolom_excel(usecols)
+    if importlib.util.find_spec('pyarrow') is not None and set(kwargs) <= {'dtype', 'usecols'} \
+            and (usecols is None or callable(usecols)):
+        try:
+            return _baca_csv_pyarrow(isi, kwargs.get('dtype') or {}, usecols)
+        except importlib.import_module('pyarrow').ArrowException as e:
+            logger.info("pyarrow gagal membaca CSV (%s), memakai pd.read_csv", e)
+    return pd.read_csv(io.BytesIO(isi), **kwargs)
+
+def _nama_tabel(nama_file):
+    """Nama sheet untuk satu file CSV: nama file tanpa folder & ekstensi .csv/.csv.gz."""
+    nama = os.path.basename(str(nama_file))
+    for akhiran in ('.gz', '.csv'):
+        if nama.lower().endswith(akhiran):
+            nama = nama[:-len(akhiran)]
+    return nama
+
+def _pilih_tabel(tabel, kwargs):
+    """Tabel CSV untuk satu permintaan sheet.
+
+    Nama sheet dicocokkan ke nama file di dalam zip (mis. 'Income.csv' & 'Summary.csv');
+    file CSV tunggal dipakai untuk sheet data apa pun, tetapi tidak untuk blok mentah (header=None).
+    """
+    sheet = kwargs.get('sheet_name', 0)
+    if isinstance(sheet, str):
+        for nama, muat in tabel.items():
+            if nama.strip().lower() == sheet.strip().lower():
+                return muat()
+    elif isinstance(sheet, int) and sheet < len(tabel):
+        return list(tabel.values())[sheet]()
+    if len(tabel) == 1 and kwargs.get('header', 0) is not None:
+        return next(iter(tabel.values()))()
+    raise ValueError(f"Sheet '{sheet}' tidak ditemukan (isi: {', '.join(tabel)})")
+
+def buka_file_input(data, nama=''):
+    """Membuka satu file input sekali; mengembalikan (parse(**argumen pd.read_excel) -> DataFrame, tutup()).
+
+    Zip dibaca langsung dari memori tanpa diekstrak ke disk: satu xlsx di dalamnya diperlakukan
+    sebagai workbook, file csv/csv.gz di dalamnya sebagai sheet bernama sesuai nama filenya.
+    """
+    jenis = jenis_file_input(data, nama)
+    if jenis == 'xlsx':
+        excel = pd.ExcelFile(io.BytesIO(data) if isinstance(data, bytes) else data)
+        return excel.parse, excel.close
+
+    def parse_csv(tabel):
+        return lambda **kwargs: baca_csv(_pilih_tabel(tabel, kwargs), **kwargs)
+
+    if jenis in ('csv', 'csv.gz'):
+        if not isinstance(data, bytes):
+            with open(data, 'rb') as f:
+                data = f.read()
+        isi = gzip.decompress(data) if jenis == 'csv.gz' else data
+        return parse_csv({_nama_tabel(nama): lambda: isi}), lambda: None
+
+    arsip = zipfile.ZipFile(io.BytesIO(data) if isinstance(data, bytes) else data)
+    anggota = [info for info in arsip.infolist()
+               if not info.is_dir() and '__MACOSX' not in info.filename
+               and not os.path.basename(info.filename).startswith(('.', '~$'))]
+    xlsx = [info for info in anggota if info.filename.lower().endswith('.xlsx')]
+    csv = [info for info in anggota if info.filename.lower().endswith(('.csv', '.csv.gz'))]
+    if len(xlsx) == 1 and not csv:
+        with arsip:
+            excel = pd.ExcelFile(io.BytesIO(arsip.read(xlsx[0])))
+        return excel.parse, excel.close
+    if not csv:
+        arsip.close()
+        raise ValueError("Zip harus berisi file .csv/.csv.gz atau tepat satu file .xlsx")
+
+    def muat(info):
+        with arsip.open(info) as f:
+            isi = f.read()
+        return gzip.decompress(isi) if info.filename.lower().endswith('.gz') else isi
+
+    return parse_csv({_nama_tabel(info.filename): (lambda info=info: muat(info)) for info in csv}), arsip.close
+
+def baca_tabel_input(file, **kwargs):
+    """Seperti pd.read_excel untuk satu sheet, tetapi juga menerima csv, csv.gz & zip."""
+    parse, tutup = buka_file_input(_data_file(file), _nama_file(file))
+    try:
+        return parse(**kwargs)
+    finally:
+        tutup()
+
+def _parse_excel(data, bacaan, nama_file=''):
+    """Worker ingesti: buka satu file input sekali lalu parse (dan validasi skema) setiap sheet yang diminta."""
+    hasil, gagal = {}, {}
+    try:
+        parse, tutup = buka_file_input(data, nama_file)
+    except Exception as e:
+        return hasil, {nama: f"{type(e).__name__}: {e}" for nama in bacaan}
+    try:
+        for nama, kwargs in bacaan.items():
+            try:
+                if isinstance(kwargs, str):
+                    hasil[nama] = terapkan_skema(parse(**SKEMA_EXPORT_SHOPEE[kwargs]['baca']), kwargs)
+                else:
+                    hasil[nama] = parse(**kwargs)
+            except Exception as e:
+                gagal[nama] = f"{type(e).__name__}: {e}"
+    finally:
+        tutup()
+    return hasil, gagal
+
+def baca_excel_paralel(tugas, workers=1):
+    """Membaca banyak file input (xlsx, csv, csv.gz atau zip) sekaligus.
+
+    `tugas`: dict nama -> (file, argumen pd.read_excel atau nama skema di SKEMA_EXPORT_SHOPEE);
+    file None dilewati. Sheet bernama skema divalidasi & kolom waktunya diparse di worker. Beberapa nama boleh
+    menunjuk file yang sama (mis. sheet 'Income' & 'Summary'): workbook-nya hanya dibuka sekali.
+    File berbeda diparse paralel di process pool jika workers > 1 dan file kedua terbesar minimal
+    INGEST_PARALEL_MIN_BYTES: waktu total paralel kira-kira waktu file terbesar ditambah biaya start worker,
+    jadi pool hanya untung jika file lain cukup besar untuk menutup biaya itu.
+    Mengembalikan (dict nama -> DataFrame, dict nama -> pesan error).
+    """
+    per_file = {}
+    for nama, (file, kwargs) in tugas.items():
+        if file is not None:
+            per_file.setdefault(id(file), (file, {}))[1][nama] = kwargs
+    grup = list(per_file.values())
+
+    ukuran = sorted((_ukuran_file(file) for file, _ in grup), reverse=True)
+    use_parallel = workers > 1 and len(grup) > 1 and ukuran[1] >= INGEST_PARALEL_MIN_BYTES
+    if not use_parallel:
+        hasil = [_parse_excel(_data_file(file), bacaan, _nama_file(file)) for file, bacaan in grup]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(grup)),
+                                 mp_context=konteks_proses_worker()) as executor:
+            hasil = list(executor.map(_parse_excel, [_data_file(file) for file, _ in grup], [bacaan for _, bacaan in grup],
+                                      [_nama_file(file) for file, _ in grup]))
+
+    frames, errors = {}, {}
+    for (file, _), (frame_file, gagal_file) in zip(grup, hasil):
+        frames.update(frame_file)
+        errors.update({nama: f"{_nama_file(file)}: {pesan}" for nama, pesan in gagal_file.items()})
+    return frames, errors
+
+def cek_gagal_baca(errors, opsional=()):
+    """Melempar ValueError berisi laporan per file jika ada file wajib yang gagal dibaca."""
+    if any(nama not in opsional for nama in errors):
+        raise ValueError("Gagal membaca file input:\n" + "\n".join(f"- {nama}: {pesan}" for nama, pesan in errors.items()))
+
+def hitung_jumlah_hari(start_date, end_date, default=7):
+    """Menghitung jumlah hari (inklusif) dari rentang tanggal."""
+    try:
+        jumlah = (pd.to_datetime(end_date).normalize() - pd.to_datetime(start_date).normalize()).days + 1
+        return jumlah if jumlah > 0 else default
+    except:
+        return default
+
+def process_rekap_toko(store_type, order_df, income_df, seller_conv_df, backend='pandas', price_tiers=None, fees=None, return_basis=False):
+    """Memilih fungsi 'REKAP' sesuai toko."""
+    if store_type == "Pacific Bookstore":
+        return process_rekap_pacific(order_df, income_df, seller_conv_df, backend=backend, price_tiers=price_tiers,
+                                     fees=fees, return_basis=return_basis)
+    if store_type == "DAMA.ID STORE":
+        return process_rekap_dama(order_df, income_df, seller_conv_df, backend=backend, price_tiers=price_tiers,
+                                  fees=fees, return_basis=return_basis)
+    return process_rekap(order_df, income_df, seller_conv_df, backend=backend, store_type=store_type,
+                         fees=fees, return_basis=return_basis)
+
+def hitung_ulang_rekap(rekap_df, basis, store_type, fees=None):
+    """Menghitung ulang biaya bertarif & 'Total Penghasilan' REKAP dari basis cache tanpa membaca ulang file."""
+    # Baris retur tetap (biaya nol & netto = refund), sama seperti hasil process_rekap_*
+    fees = fee_schedule(fees)
+    rekap = rekap_df.copy()
+    aktif = ~basis['Retur'].to_numpy()
+    basis_biaya = basis['Basis Biaya'].to_numpy()
+
+    biaya_adm = basis_biaya * tarif_adm(basis['Tahun Pesanan'], fees)
+    if store_type == "DAMA.ID STORE":
+        biaya_adm = np.abs(biaya_adm)
+    if store_type == "Pacific Bookstore":
+        biaya_xtra = np.zeros(len(rekap))
+    else:
+        biaya_xtra = np.abs(basis_biaya * fees['gratis_ongkir_xtra'])
+    biaya_proses = fees['biaya_proses_pesanan'] / basis['Item Per Pesanan'].to_numpy()
+
+    rekap.loc[aktif, 'Biaya Adm 8%'] = biaya_adm[aktif]
+    rekap.loc[aktif, 'Biaya Layanan Gratis Ongkir Xtra 4,5%'] = biaya_xtra[aktif]
+    rekap.loc[aktif, 'Biaya Proses Pesanan'] = biaya_proses[aktif]
+    netto = (
+        rekap['Total Harga Produk'] -
+        rekap['Voucher Ditanggung Penjual'] -
+        rekap['Biaya Komisi AMS + PPN Shopee'] -
+        rekap['Biaya Adm 8%'] -
+        rekap.get('Biaya Layanan 2%', 0) -
+        rekap['Biaya Layanan Gratis Ongkir Xtra 4,5%'] -
+        rekap['Biaya Proses Pesanan'] -
+        rekap['Gratis Ongkir dari Penjual']
+    )
+    rekap.loc[aktif, 'Total Penghasilan'] = netto[aktif]
+    return rekap
+
+def aggregate_rekap_toko(store_type, rekap_df, backend='pandas'):
+    """Memilih fungsi agregasi SUMMARY sesuai toko."""
+    if store_type == "DAMA.ID STORE":
+        return aggregate_rekap_summary_dama(rekap_df, backend=backend)
+    return aggregate_rekap_summary(rekap_df, store_type, backend=backend)
+
+def process_summary_toko(store_type, rekap_df, iklan_final_df, katalog_df, katalog_dama_df, harga_custom_tlj_df, jumlah_hari=7, summary_agg=None, backend='pandas', match_workers=1, audit_top_k=0, fees=None, match_cache=None, match_override=None):
+    """Memilih fungsi 'SUMMARY' sesuai toko."""
+    if store_type == "DAMA.ID STORE":
+        return process_summary_dama(rekap_df, iklan_final_df, katalog_dama_df, harga_custom_tlj_df,
+                                    jumlah_hari=jumlah_hari, summary_agg=summary_agg, backend=backend,
+                                    match_workers=match_workers, audit_top_k=audit_top_k,
+                                    fees=fees, match_cache=match_cache, match_override=match_override)
+    return process_summary(rekap_df, iklan_final_df, katalog_df, harga_custom_tlj_df, store_type=store_type,
+                           jumlah_hari=jumlah_hari, summary_agg=summary_agg, backend=backend,
+                           match_workers=match_workers, audit_top_k=audit_top_k,
+                           fees=fees, match_cache=match_cache, match_override=match_override)
+
+def load_katalog_harga_online(path='HARGA ONLINE.xlsx'):
+    """Membaca katalog 'HARGA ONLINE' beserta kolom normalisasi untuk pencocokan harga beli."""
+    katalog_df = pd.read_excel(path)
+    katalog_df.columns = [str(c).strip().upper() for c in katalog_df.columns]
+    for col in ["JUDUL AL QUR'AN", "JENIS KERTAS", "UKURAN", "KATALOG HARGA"]:
+        if col not in katalog_df.columns:
+            katalog_df[col] = ""
+    katalog_df['JUDUL_NORM'] = katalog_df["JUDUL AL QUR'AN"].astype(str).str.upper().str.replace(r'[^A-Z0-9\s]', ' ', regex=True)
+    katalog_df['JENIS_KERTAS_NORM'] = katalog_df['JENIS KERTAS'].astype(str).str.upper().str.replace(r'[^A-Z0-9\s]', ' ', regex=True)
+    katalog_df['UKURAN_NORM'] = katalog_df['UKURAN'].astype(str).str.upper().str.replace(r'\s+', '', regex=True)
+    katalog_df['KATALOG_HARGA_NUM'] = pd.to_numeric(katalog_df['KATALOG HARGA'].astype(str).str.replace(r'[^0-9\.]', '', regex=True), errors='coerce').fillna(0)
+    return katalog_df
+
+def load_harga_custom_tlj(path='Harga Custom TLJ.xlsx'):
+    """Membaca tabel 'Harga Custom TLJ' (kunci lookup: nama produk + variasi)."""
+    harga_custom_tlj_df = pd.read_excel(path)
+    harga_custom_tlj_df.columns = [str(c).strip().upper() for c in harga_custom_tlj_df.columns]
+    required_cols = ['NAMA PRODUK', 'VARIASI', 'HARGA CUSTOM TLJ']
+    if not all(col in harga_custom_tlj_df.columns for col in required_cols):
+        raise ValueError(f"File '{os.path.basename(str(path))}' harus memiliki kolom: {', '.join(required_cols)}")
+    harga_custom_tlj_df['LOOKUP_KEY'] = harga_custom_tlj_df['NAMA PRODUK'].astype(str).str.strip() + ' ' + harga_custom_tlj_df['VARIASI'].astype(str).str.strip()
+    harga_custom_tlj_df['HARGA CUSTOM TLJ'] = pd.to_numeric(harga_custom_tlj_df['HARGA CUSTOM TLJ'], errors='coerce').fillna(0)
+    return harga_custom_tlj_df
+
+def load_katalog_dama(path='KATALOG_DAMA.xlsx'):
+    """Membaca katalog DAMA (teks dinormalisasi huruf besar, harga numerik)."""
+    katalog_dama_df = pd.read_excel(path)
+    katalog_dama_df.columns = [str(c).strip().upper() for c in katalog_dama_df.columns]
+    required_dama_cols = ['NAMA PRODUK', 'JENIS AL QUR\'AN', 'WARNA', 'UKURAN', 'PAKET', 'HARGA']
+    if not all(col in katalog_dama_df.columns for col in required_dama_cols):
+        raise ValueError(f"File '{os.path.basename(str(path))}' harus memiliki kolom: {', '.join(required_dama_cols)}")
+    katalog_dama_df['HARGA'] = pd.to_numeric(katalog_dama_df['HARGA'], errors='coerce').fillna(0)
+    for col in ['NAMA PRODUK', 'JENIS AL QUR\'AN', 'WARNA', 'UKURAN', 'PAKET']:
+        katalog_dama_df[col] = katalog_dama_df[col].fillna('').astype(str).str.strip().str.upper()
+        katalog_dama_df[col] = katalog_dama_df[col].str.replace(r'\s+', ' ', regex=True)
+    return katalog_dama_df
+
+def nama_file_rekap_mingguan(store_type, date_range_str):
+    suffix_tgl = f" {date_range_str}" if date_range_str else ""
+    return f"Rekapanku_Shopee_{store_type}_{suffix_tgl}.xlsx"
+
+def process_rekap_mingguan(store_type, file_order, file_income, file_iklan, file_seller,
+                           katalog_df, katalog_dama_df, harga_custom_tlj_df, backend='pandas', match_workers=1,
+                           audit_top_k=0, price_tiers=None, workbook_ringkas=False, ingest_workers=1,
+                           match_override=None, kamus_iklan=None):
+    """Rekapan mingguan dari satu set file (Order-all, Income, Iklan, Seller conversion opsional).
+
+    Mengembalikan dict berisi sheet-sheet workbook beserta hasil antara (REKAP, basis biaya,
+    IKLAN, SUMMARY) yang dipakai panel what-if.
+    """
+    # Baca data (file-file input diparse bersamaan; income cukup dibuka sekali untuk 2 sheet)
+    frames, errors = baca_excel_paralel({
+        'Order-all': (file_order, 'order_all'),
+        'Income': (file_income, 'income'),
+        'Income (Summary)': (file_income, BACA_INCOME_SUMMARY),
+        'Iklan': (file_iklan, 'iklan'),
+        'Seller conversion': (file_seller or None, 'seller_conversion'),
+    }, workers=ingest_workers)
+    cek_gagal_baca(errors, opsional=['Income (Summary)'])
+    order_all_df = frames['Order-all']
+    income_dilepas_df = frames['Income']
+    iklan_produk_df = frames['Iklan']
+
+    if file_seller:
+        seller_conversion_df = frames['Seller conversion']
+    else:
+        seller_conversion_df = pd.DataFrame(columns=['Kode Pesanan', 'Pengeluaran(Rp)'])
+
+    # Bersihkan data
+    clean_rekap_inputs(order_all_df, income_dilepas_df, iklan_produk_df, seller_conversion_df)
+
+    # Ambil tanggal
+    tgl_awal, tgl_akhir = tanggal_income_summary(frames.get('Income (Summary)'))
+    date_range_str = get_pretty_date_range(tgl_awal, tgl_akhir)
+
+    # Proses berdasarkan toko
+    rekap_processed, rekap_basis = process_rekap_toko(store_type, order_all_df, income_dilepas_df, seller_conversion_df,
+                                                      backend=backend, price_tiers=price_tiers, return_basis=True)
+    iklan_processed = process_iklan(iklan_produk_df, backend=backend, kamus_iklan=kamus_iklan)
+    summary_processed = process_summary_toko(store_type, rekap_processed, iklan_processed,
+                                             katalog_df, katalog_dama_df, harga_custom_tlj_df, backend=backend,
+                                             match_workers=match_workers, audit_top_k=audit_top_k,
+                                             match_override=match_override)
+    match_audit_df = None
+    if audit_top_k:
+        summary_processed, match_audit_df = summary_processed
+
+    # Sheet-sheet workbook
+    sheets = {
+        'SUMMARY': summary_processed,
+        'REKAP': rekap_processed,
+        'IKLAN': iklan_processed,
+        'sheet order-all': order_all_df,
+        'sheet income dilepas': income_dilepas_df,
+        'sheet biaya iklan': iklan_produk_df,
+        'sheet seller conversion': seller_conversion_df
+    }
+    if workbook_ringkas:
+        del sheets['sheet order-all'], sheets['sheet income dilepas']
+    if match_audit_df is not None:
+        sheets['MATCH AUDIT'] = match_audit_df
+    return {
+        'sheets': sheets,
+        'rekap': rekap_processed,
+        'basis': rekap_basis,
+        'iklan': iklan_processed,
+        'summary': summary_processed,
+        'match_audit': match_audit_df,
+        'date_range_str': date_range_str,
+    }
+
+def _kunci_baru(db, tabel, kunci, potongan=None):
+    """Kunci (No. Pesanan) yang belum tercatat di tabel SQLite; kunci baru langsung dicatat dengan nomor potongannya."""
+    db.execute('DELETE FROM cek')
+    db.executemany('INSERT OR IGNORE INTO cek (kunci) VALUES (?)', ((k,) for k in kunci))
+    baru = {k for (k,) in db.execute(f'SELECT kunci FROM cek WHERE kunci NOT IN (SELECT kunci FROM {tabel})')}
+    db.executemany(f'INSERT INTO {tabel} (kunci, potongan) VALUES (?, ?)', ((k, potongan) for k in baru))
+    return baru
+
+def _peta_potongan(db, kunci):
+    """Dict No. Pesanan -> nomor potongan Income, hanya untuk kunci yang ada di Income."""
+    db.execute('DELETE FROM cek')
+    db.executemany('INSERT OR IGNORE INTO cek (kunci) VALUES (?)', ((k,) for k in kunci))
+    return dict(db.execute('SELECT cek.kunci, income.potongan FROM cek JOIN income ON income.kunci = cek.kunci'))
+
+def process_rekap_periode(store_type, order_files, income_files, iklan_files, seller_files,
+                          katalog_df, katalog_dama_df, harga_custom_tlj_df, backend='pandas', match_workers=1,
+                          audit_top_k=0, price_tiers=None, fees=None, match_override=None, kamus_iklan=None):
+    """Rekapan bulanan/kuartalan dari banyak file Order-all & Income.
+
+    Tiap file Income (tanpa pesanan yang sudah ada di file sebelumnya) menjadi satu potongan.
+    Baris Order-all & Seller conversion dibagi ke potongan Income pesanannya lalu disimpan
+    sementara di disk, dan daftar pesanan yang sudah terlihat disimpan di SQLite sementara.
+    Yang ada di memori hanya satu file input atau satu potongan, ditambah agregat SUMMARY & IKLAN.
+    Dari Order-all hanya kolom yang dipakai REKAP yang dibaca.
+    """
+    with tempfile.TemporaryDirectory(prefix='rekap_periode_') as folder:
+        db = sqlite3.connect(os.path.join(folder, 'pesanan.db'))
+        try:
+            for tabel in ['cek', 'income', 'order_all', 'seller']:
+                db.execute(f'CREATE TABLE {tabel} (kunci TEXT PRIMARY KEY, potongan INTEGER)')
+            return _process_rekap_periode(db, folder, store_type, order_files, income_files, iklan_files, seller_files,
+                                          katalog_df, katalog_dama_df, harga_custom_tlj_df, backend, match_workers,
+                                          audit_top_k, price_tiers, fees, match_override, kamus_iklan)
+        finally:
+            db.close()
+
+def _process_rekap_periode(db, folder, store_type, order_files, income_files, iklan_files, seller_files,
+                           katalog_df, katalog_dama_df, harga_custom_tlj_df, backend, match_workers,
+                           audit_top_k, price_tiers, fees, match_override, kamus_iklan):
+    # 1. Income per file -> potongan (pesanan yang sudah ada di file sebelumnya dilewati)
+    jumlah_potongan = 0
+    tgl_awal_list, tgl_akhir_list = [], []
+    for file_income in income_files:
+        income_df = terapkan_skema(baca_tabel_input(file_income, **SKEMA_EXPORT_SHOPEE['income']['baca']), 'income')
+        income_df['No. Pesanan'] = income_df['No. Pesanan'].astype(str)
+        baru = _kunci_baru(db, 'income', income_df['No. Pesanan'].unique(), jumlah_potongan)
+        income_df = income_df[income_df['No. Pesanan'].isin(baru)].copy()
+        if income_df.empty:
+            continue
+        clean_rekap_inputs(None, income_df, None, None)
+
+        tgl_awal, tgl_akhir = read_income_date_range(file_income)
+        if pd.isna(tgl_awal) or pd.isna(tgl_akhir):
+            waktu = income_df['Waktu Pesanan Dibuat']
+            tgl_awal, tgl_akhir = waktu.min(), waktu.max()
+        tgl_awal_list.append(pd.to_datetime(tgl_awal, errors='coerce'))
+        tgl_akhir_list.append(pd.to_datetime(tgl_akhir, errors='coerce'))
+
+        income_df.to_pickle(os.path.join(folder, f'income_{jumlah_potongan}.pkl'))
+        jumlah_potongan += 1
+        del income_df
+    if jumlah_potongan == 0:
+        raise ValueError("Tidak ada data income yang bisa diproses.")
+
+    # 2. Order-all & Seller conversion per file, dibagi ke potongan Income
+    berkas = {('order_all', p): [] for p in range(jumlah_potongan)}
+    berkas.update({('seller', p): [] for p in range(jumlah_potongan)})
+    kosong = {'seller': pd.DataFrame(columns=['Kode Pesanan', 'Pengeluaran(Rp)'])}
+
+    def simpan_per_potongan(jenis, nomor_file, df, kolom):
+        baru = _kunci_baru(db, jenis, df[kolom].unique())
+        df = df[df[kolom].isin(baru)]
+        kosong.setdefault(jenis, df.iloc[0:0])
+        potongan = df[kolom].map(_peta_potongan(db, baru))
+        for p, bagian in df.groupby(potongan, sort=False):
+            path = os.path.join(folder, f'{jenis}_{int(p)}_{nomor_file}.pkl')
+            bagian.to_pickle(path)
+            berkas[(jenis, int(p))].append(path)
+
+    for nomor_file, file_order in enumerate(order_files):
+        df = baca_tabel_input(file_order, **SKEMA_EXPORT_SHOPEE['order_all']['baca'],
+                              usecols=lambda c: str(c).strip() in KOLOM_ORDER_REKAP)
+        df = terapkan_skema(df, 'order_all')
+        df['No. Pesanan'] = df['No. Pesanan'].astype(str)
+        clean_rekap_inputs(df, None, None, None)
+        simpan_per_potongan('order_all', nomor_file, df, 'No. Pesanan')
+        del df
+
+    for nomor_file, file_seller in enumerate(seller_files or []):
+        df = terapkan_skema(baca_tabel_input(file_seller), 'seller_conversion')
+        df['Kode Pesanan'] = df['Kode Pesanan'].astype(str)
+        clean_rekap_inputs(None, None, None, df)
+        simpan_per_potongan('seller', nomor_file, df, 'Kode Pesanan')
+        del df
+
+    # 3. Iklan diringkas per file, lalu ringkasan digabung
+    partial_iklan = []
+    for file_iklan in iklan_files:
+        df = terapkan_skema(baca_tabel_input(file_iklan), 'iklan')
+        clean_rekap_inputs(None, None, df, None)
+        partial_iklan.append(process_iklan(df, backend=backend, kamus_iklan=kamus_iklan))
+        del df
+    iklan_final_df = gabung_iklan_final(partial_iklan, backend=backend)
+
+    def baca_potongan(jenis, p):
+        paths = berkas[(jenis, p)]
+        if not paths:
+            return kosong.get(jenis, pd.DataFrame()).copy()
+        return pd.concat([pd.read_pickle(path) for path in paths], ignore_index=True)
+
+    # 4. REKAP per potongan -> langsung diringkas ke agregat SUMMARY lalu dibuang
+    summary_agg = None
+    jumlah_baris_rekap = 0
+    for p in range(jumlah_potongan):
+        income_df = pd.read_pickle(os.path.join(folder, f'income_{p}.pkl'))
+        rekap_chunk = process_rekap_toko(store_type, baca_potongan('order_all', p), income_df, baca_potongan('seller', p),
+                                         backend=backend, price_tiers=price_tiers, fees=fees)
+        jumlah_baris_rekap += len(rekap_chunk)
+        summary_agg = merge_summary_aggregates([summary_agg, aggregate_rekap_toko(store_type, rekap_chunk, backend=backend)],
+                                               backend=backend)
+        del rekap_chunk, income_df
+
+    if summary_agg is None:
+        raise ValueError("Tidak ada data income yang bisa diproses.")
+
+    tgl_awal_all = min((t for t in tgl_awal_list if pd.notna(t)), default=None)
+    tgl_akhir_all = max((t for t in tgl_akhir_list if pd.notna(t)), default=None)
+    jumlah_hari = hitung_jumlah_hari(tgl_awal_all, tgl_akhir_all)
+    date_range_str = get_pretty_date_range(tgl_awal_all, tgl_akhir_all)
+
+    summary_processed = process_summary_toko(store_type, None, iklan_final_df, katalog_df, katalog_dama_df,
+                                             harga_custom_tlj_df, jumlah_hari=jumlah_hari, summary_agg=summary_agg,
+                                             backend=backend, match_workers=match_workers, audit_top_k=audit_top_k,
+                                             fees=fees, match_override=match_override)
+    match_audit = None
+    if audit_top_k:
+        summary_processed, match_audit = summary_processed
+    return {
+        'summary': summary_processed,
+        'match_audit': match_audit,
+        'iklan': iklan_final_df,
+        'jumlah_hari': jumlah_hari,
+        'date_range_str': date_range_str,
+        'jumlah_file_income': jumlah_potongan,
+        'jumlah_baris_rekap': jumlah_baris_rekap,
+    }
+
+def rekap_untuk_excel(rekap_df):
+    """Tampilan REKAP di Excel: kolom pesanan hanya diisi di baris pertama tiap pesanan, tipe kolom tetap."""
+    if KOLOM_AWAL_PESANAN not in rekap_df.columns:
+        return rekap_df
+    awal = rekap_df[KOLOM_AWAL_PESANAN].to_numpy()
+    tampil = rekap_df.drop(columns=KOLOM_AWAL_PESANAN)
+    for col in KOLOM_REKAP_DIKOSONGKAN:
+        # Sel kosong (NaN/NaT) tidak ditulis ke workbook
+        tampil[col] = tampil[col].where(awal)
+    return tampil
+
+def saring_tabel(df, kata):
+    """Baris yang salah satu kolom teksnya memuat `kata` (huruf besar/kecil tidak dibedakan)."""
+    kata = str(kata).strip()
+    teks = df.select_dtypes(include='object')
+    if not kata or teks.empty:
+        return df if not kata else df.iloc[0:0]
+    cocok = np.zeros(len(df), dtype=bool)
+    for col in teks.columns:
+        cocok |= teks[col].astype(str).str.contains(kata, case=False, regex=False).to_numpy()
+    return df[cocok]
+
+def lebar_kolom(kolom):
+    """Panjang teks terpanjang di kolom; kolom angka & tanggal cukup dilihat dari nilai min dan maks."""
+    isi = kolom.dropna()
+    if isi.empty:
+        return 0
+    if pd.api.types.is_numeric_dtype(isi) or pd.api.types.is_datetime64_any_dtype(isi):
+        return max(len(str(isi.min())), len(str(isi.max())))
+    return int(isi.astype(str).str.len().max())
+
+def _tulis_kolom_per_run(worksheet, col_num, start_row, nilai_list, lewati):
+    """write_column untuk setiap deret nilai berurutan yang tidak ditandai `lewati` (array bool per baris)."""
+    batas = np.flatnonzero(np.diff(np.concatenate(([1], lewati, [1])).astype(np.int8)))
+    for awal, akhir in zip(batas[::2], batas[1::2]):
+        worksheet.write_column(start_row + int(awal), col_num, nilai_list[awal:akhir])
+
+def tulis_isi_tabel(worksheet, df, start_row, waktu_format, tanggal_format):
+    """Menulis isi DataFrame per kolom dengan writer xlsxwriter sesuai tipe kolom; sel kosong dilewati.
+
+    Setara df.to_excel(header=False, index=False) tanpa overhead format per sel dari pandas. Deret nilai
+    angka/teks ditulis sekaligus dengan write_column; hanya inf dan tanggal yang ditulis per sel.
+    """
+    for col_num, col in enumerate(df.columns):
+        kolom = df[col]
+        if pd.api.types.is_datetime64_any_dtype(kolom):
+            for row_num, nilai in enumerate(kolom, start=start_row):
+                if nilai is not pd.NaT:
+                    worksheet.write_datetime(row_num, col_num, nilai.to_pydatetime(), waktu_format)
+        elif pd.api.types.is_bool_dtype(kolom):
+            worksheet.write_column(start_row, col_num, kolom.tolist())
+        elif pd.api.types.is_numeric_dtype(kolom):
+            nilai_list = kolom.tolist()
+            kosong = kolom.isna().to_numpy()
+            tak_hingga = np.isinf(kolom.to_numpy(dtype=float, na_value=np.nan))
+            for row_num in np.flatnonzero(tak_hingga):
+                worksheet.write_string(start_row + int(row_num), col_num, 'inf' if nilai_list[row_num] > 0 else '-inf')
+            _tulis_kolom_per_run(worksheet, col_num, start_row, nilai_list, kosong | tak_hingga)
+        else:
+            nilai_list = kolom.tolist()
+            kosong = kolom.isna().to_numpy()
+            tanggal = np.fromiter((isinstance(nilai, date) for nilai in nilai_list), dtype=bool, count=len(nilai_list))
+            for row_num in np.flatnonzero(tanggal & ~kosong):
+                nilai = nilai_list[row_num]
+                worksheet.write_datetime(start_row + int(row_num), col_num, nilai,
+                                         waktu_format if isinstance(nilai, datetime) else tanggal_format)
+            _tulis_kolom_per_run(worksheet, col_num, start_row, nilai_list, kosong | tanggal)
+
+def ukur_lebar_kolom(kolom, ribuan=False):
+    """lebar_kolom; ribuan=True mengukur angka dengan pemisah ribuan seperti tampilan format #,##0."""
+    if not ribuan:
+        return lebar_kolom(kolom)
+    isi = pd.to_numeric(kolom, errors='coerce').dropna()
+    if isi.empty:
+        return 0
+    return max(len(f"{isi.min():,}"), len(f"{isi.max():,}"))
+
+def tulis_tata_letak(worksheet, blok_list, lebar_min=10, lebar_max=50):
+    """Menulis blok-blok tabel ke satu worksheet, lalu memasang lebar kolom sekali di akhir.
+
+    Tiap blok adalah dict:
+      'nama'     : nama blok, dipakai blok lain untuk posisi relatif
+      'baris'    : baris awal, atau 'di_bawah': (nama_blok, jarak) = mulai `jarak` baris di bawah blok tsb
+      'kolom'    : kolom awal
+      'lebar'    : jumlah kolom blok (lebar judul gabungan)
+      'ribuan'   : offset kolom yang lebarnya diukur dengan pemisah ribuan (opsional)
+      'bagian'   : ditulis berurutan dari atas ke bawah, masing-masing salah satu dari
+          ('judul', teks, format, tinggi)         sel gabungan selebar blok, tidak ikut diukur
+          ('baris', nilai_list, format[, ukur])   satu baris seragam format (write_row)
+          ('sel', sel_list[, ukur])                satu baris campuran; sel = None (dilewati),
+                                                   (nilai, format) atau (nilai, format, jumlah kolom gabungan)
+          ('tabel', df, format_list)               DataFrame per kolom (write_column); format boleh
+                                                   berupa list per baris
+    Lebar kolom = teks terpanjang (min `lebar_min`, maks `lebar_max`, +2 karakter), dihitung sekali
+    per kolom tabel. Mengembalikan dict nama blok -> baris kosong pertama di bawahnya.
+    """
+    akhir = {}
+    lebar = {}
+
+    def ukur(col, panjang):
+        if panjang > lebar.get(col, 0):
+            lebar[col] = panjang
+
+    for blok in blok_list:
+        if 'di_bawah' in blok:
+            nama_atas, jarak = blok['di_bawah']
+            row = akhir[nama_atas] + jarak
+        else:
+            row = blok['baris']
+        col0 = blok['kolom']
+        ribuan = set(blok.get('ribuan', ()))
+
+        def ukur_sel(offset, nilai):
+            teks = f"{nilai:,}" if offset in ribuan and isinstance(nilai, (int, float, np.number)) else str(nilai)
+            ukur(col0 + offset, len(teks))
+
+        for bagian in blok['bagian']:
+            jenis = bagian[0]
+            if jenis == 'judul':
+                _, teks, fmt, tinggi = bagian
+                worksheet.merge_range(row, col0, row + tinggi - 1, col0 + blok['lebar'] - 1, teks, fmt)
+                row += tinggi
+            elif jenis == 'baris':
+                nilai_list, fmt = bagian[1], bagian[2]
+                worksheet.write_row(row, col0, nilai_list, fmt)
+                if len(bagian) < 4 or bagian[3]:
+                    for offset, nilai in enumerate(nilai_list):
+                        ukur_sel(offset, nilai)
+                row += 1
+            elif jenis == 'sel':
+                offset = 0
+                for sel in bagian[1]:
+                    if sel is None:
+                        offset += 1
+                        continue
+                    nilai, fmt = sel[0], sel[1]
+                    gabung = sel[2] if len(sel) > 2 else 1
+                    if gabung > 1:
+                        worksheet.merge_range(row, col0 + offset, row, col0 + offset + gabung - 1, nilai, fmt)
+                    else:
+                        worksheet.write(row, col0 + offset, nilai, fmt)
+                    if len(bagian) < 3 or bagian[2]:
+                        ukur_sel(offset, nilai)
+                    offset += gabung
+                row += 1
+            elif jenis == 'tabel':
+                _, df, format_list = bagian
+                for offset, (col, fmt) in enumerate(zip(df.columns, format_list)):
+                    nilai = df[col].tolist()
+                    if isinstance(fmt, list):
+                        for i, (v, f) in enumerate(zip(nilai, fmt)):
+                            worksheet.write(row + i, col0 + offset, v, f)
+                    else:
+                        worksheet.write_column(row, col0 + offset, nilai, fmt)
+                    ukur(col0 + offset, ukur_lebar_kolom(df[col], offset in ribuan))
+                row += len(df)
+        akhir[blok['nama']] = row
+
+    for col, panjang in lebar.items():
+        worksheet.set_column(col, col, max(lebar_min, min(panjang + 2, lebar_max)))
+    return akhir
+
+def build_rekap_workbook(sheets, store_choice, date_range_str):
+    """Menulis sheet-sheet rekapan ke workbook Excel (BytesIO)."""
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+        workbook = writer.book
+        
+        # Kolom waktu bertipe datetime ditampilkan dengan format yang sama seperti file Shopee
+        waktu_format = workbook.add_format({'num_format': 'yyyy-mm-dd hh:mm'})
+        tanggal_format = workbook.add_format({'num_format': 'yyyy-mm-dd'})
+        title_format = workbook.add_format({'bold': True, 'fg_color': '#4472C4', 'font_color': 'white', 'align': 'left', 'valign': 'vcenter', 'font_size': 14})
+        header_format = workbook.add_format({'bold': True, 'fg_color': '#DDEBF7', 'border': 1, 'align': 'center', 'valign': 'vcenter'})
+        cell_border_format = workbook.add_format({'border': 1})
+        percent_format = workbook.add_format({'num_format': '0.00%'})
+        one_decimal_format = workbook.add_format({'num_format': '0.0'})
+        total_fmt = workbook.add_format({'bold': True, 'fg_color': '#FFFF00', 'border': 1})
+        total_fmt_percent = workbook.add_format({'bold': True, 'fg_color': '#FFFF00', 'num_format': '0.00%', 'border': 1})
+        total_fmt_decimal = workbook.add_format({'bold': True, 'fg_color': '#FFFF00', 'num_format': '0.0', 'border': 1})
+
+        for sheet_name, df in sheets.items():
+            if sheet_name == 'REKAP':
+                df = rekap_untuk_excel(df)
+            start_row_data = 3 if sheet_name in ['SUMMARY', 'REKAP', 'IKLAN'] else 1
+            
+            worksheet = workbook.add_worksheet(sheet_name)
+            tulis_isi_tabel(worksheet, df, start_row_data, waktu_format, tanggal_format)
+            
+            start_row_header = 0
+            if sheet_name in ['SUMMARY', 'REKAP', 'IKLAN']:
+                suffix_tgl = f" {date_range_str}" if date_range_str else ""
+                judul_sheet = f"{sheet_name} {store_choice.upper()} SHOPEE {suffix_tgl}"
+                worksheet.merge_range(0, 0, 1, len(df.columns) - 1, judul_sheet, title_format)
+                start_row_header = 2
+            
+            for col_num, value in enumerate(df.columns.values):
+                worksheet.write(start_row_header, col_num, value, header_format)
+
+            if sheet_name in ['SUMMARY', 'REKAP', 'IKLAN']:
+                worksheet.conditional_format(start_row_data, 0, start_row_data + len(df) - 1, len(df.columns) - 1, 
+                                             {'type': 'no_blanks', 'format': cell_border_format})
+
+            # Format angka per kolom (dipasang bersama lebar kolom di bawah), bukan per sel
+            kolom_format = {}
+            if sheet_name == 'SUMMARY':
+                persen_col = df.columns.get_loc('Persentase')
+                penjualan_hari_col = df.columns.get_loc('Penjualan Per Hari')
+                buku_pesanan_col = df.columns.get_loc('Jumlah buku per pesanan')
+                kolom_format = {persen_col: percent_format, penjualan_hari_col: one_decimal_format,
+                                buku_pesanan_col: one_decimal_format}
+                
+                last_row = len(df) + start_row_header
+                for col_num in range(len(df.columns)):
+                    cell_value = df.iloc[-1, col_num]
+                    current_fmt = total_fmt
+                    if col_num == persen_col:
+                        current_fmt = total_fmt_percent
+                    elif col_num in [penjualan_hari_col, buku_pesanan_col]:
+                        current_fmt = total_fmt_decimal
+                    
+                    if pd.notna(cell_value):
+                        worksheet.write(last_row, col_num, cell_value, current_fmt)
+                    else:
+                        worksheet.write_blank(last_row, col_num, None, current_fmt)
+
+            if sheet_name == 'IKLAN':
+                last_row_idx = len(df) - 1
+                if not df.empty and df.iloc[last_row_idx]['Nama Iklan'] == 'TOTAL':
+                    for col_num in range(len(df.columns)):
+                        cell_value = df.iloc[last_row_idx, col_num]
+                        worksheet.write(start_row_data + last_row_idx, col_num, cell_value, total_fmt)
+            
+            for i, col in enumerate(df.columns):
+                column_len = max(lebar_kolom(df[col]), len(str(col)))
+                worksheet.set_column(i, i, column_len + 2, kolom_format.get(i))
+
+    output.seek(0)
+    return output
+
+
+# ============================================
+# EKSPOR DATA ANALITIK (PARQUET / CSV + MANIFEST)
+# ============================================
+
+def available_export_formats():
+    """Daftar format data analitik yang bisa dipakai di environment ini."""
+    tersedia = ['csv.gz']
+    try:
+        import pyarrow  # noqa: F401
+        tersedia.insert(0, 'parquet')
+    except ImportError:
+        pass
+    return tersedia
+
+def tabel_bertipe(df):
+    """Salinan tabel dengan satu tipe per kolom (angka, tanggal, boolean atau teks)."""
+    hasil = df.copy()
+    hasil.columns = [str(c) for c in hasil.columns]
+    for col in hasil.columns:
+        if hasil[col].dtype != object:
+            continue
+        jenis = pd.api.types.infer_dtype(hasil[col], skipna=True)
+        if jenis in ('integer', 'floating', 'mixed-integer-float', 'decimal'):
+            hasil[col] = pd.to_numeric(hasil[col], errors='coerce')
+        elif jenis in ('datetime', 'datetime64', 'date'):
+            hasil[col] = pd.to_datetime(hasil[col], errors='coerce')
+        elif jenis == 'boolean':
+            hasil[col] = hasil[col].astype('boolean')
+        else:
+            hasil[col] = hasil[col].astype('string')
+            # Kolom waktu dari Shopee berupa teks 'YYYY-MM-DD HH:MM'; dipakai bila semua nilai terbaca
+            if col.startswith(('Waktu', 'Tanggal')):
+                waktu = pd.to_datetime(hasil[col], errors='coerce')
+                if waktu.notna().sum() == hasil[col].notna().sum():
+                    hasil[col] = waktu
+    return hasil
+
+def _nama_file_tabel(nama_tabel):
+    return re.sub(r'[^a-z0-9]+', '_', nama_tabel.lower()).strip('_')
+
+def build_data_export(tables, store_choice, date_range_str, fmt='parquet'):
+    """Zip berisi tabel bertipe (Parquet atau CSV gzip) dan 'manifest.json' berisi skema tiap tabel."""
+    if fmt not in ('parquet', 'csv.gz'):
+        raise ValueError(f"Format ekspor tidak dikenal: {fmt}")
+    manifest = {
+        'toko': store_choice,
+        'periode': date_range_str or '',
+        'dibuat': datetime.now().isoformat(timespec='seconds'),
+        'format': fmt,
+        'tabel': [],
+    }
+    output = io.BytesIO()
+    # Parquet & gzip sudah terkompresi, jadi disimpan apa adanya di dalam zip
+    with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_STORED) as zf:
+        for nama_tabel, df in tables.items():
+            if nama_tabel == 'REKAP':
+                df = df.drop(columns=KOLOM_AWAL_PESANAN, errors='ignore')
+            df = tabel_bertipe(df)
+            nama_file = f"{_nama_file_tabel(nama_tabel)}.{fmt}"
+            buffer = io.BytesIO()
+            if fmt == 'parquet':
+                df.to_parquet(buffer, index=False)
+            else:
+                df.to_csv(buffer, index=False, compression={'method': 'gzip', 'mtime': 0})
+            zf.writestr(nama_file, buffer.getvalue())
+            manifest['tabel'].append({
+                'nama': nama_tabel,
+                'file': nama_file,
+                'baris': len(df),
+                'kolom': [{'nama': col, 'tipe': str(tipe)} for col, tipe in df.dtypes.items()],
+            })
+        zf.writestr('manifest.json', json.dumps(manifest, ensure_ascii=False, indent=2),
+                    compress_type=zipfile.ZIP_DEFLATED)
+    output.seek(0)
+    return output
+
+
+# ============================================
+# FUNGSI-FUNGSI IKLAN HARIAN (DARI IKLANKU.PY)
+# ============================================
+
+def extract_time_hour(dt):
+    """Ekstrak jam dari datetime."""
+    try:
+        return dt.hour
+    except:
+        return 0
+
+def extract_eksemplar(variasi_text):
+    """Ekstrak jumlah eksemplar dari teks variasi."""
+    if not isinstance(variasi_text, str):
+        return 1
+    
+    v = variasi_text.strip().upper()
+    
+    match = re.search(r'(?:PAKET|ISI)\s*(?:ISI\s*)?(\d+)', v)
+    
+    if match:
+        return int(match.group(1))
+    
+    return 1
+
+def clean_variasi(text, product_name=""):
+    """Membersihkan variasi untuk Shopee."""
+    if not isinstance(text, str) or pd.isna(text) or text == '':
+        return ''
+
+    is_paket_wakaf = PRODUK_PAKET_WAKAF_50 in str(product_name)
+    
+    if is_paket_wakaf:
+        part = text.split(',')[0].strip().upper()
+        return part.replace('AL AQEEL', '').strip()
+   
+    if ',' in text:
+        parts = text.split(',')
+        return parts[-1].strip().upper()
+    return text.strip().upper()
+
+def process_data_iklan_harian(toko, file_order, file_iklan, file_seller, file_hourly=None, return_tables=False, ingest_workers=1,
+                              kamus_iklan=None):
+    # return_tables=True: kembalikan juga tabel per jam & rincian pesanan untuk ekspor data analitik
+    # ingest_workers > 1: keempat file input diparse bersamaan
+    # kamus_iklan: path kamus nama iklan (None = KAMUS_IKLAN_FILE), sama dengan rekapan mingguan
+    # 1. LOAD DATA
+    frames, errors = baca_excel_paralel({
+        'Order-all': (file_order, 'order_all_harian'),
+        'Iklan': (file_iklan, 'iklan'),
+        'Seller conversion': (file_seller, 'seller_conversion_harian'),
+        'Hourly': (file_hourly, 'hourly'),
+    }, workers=ingest_workers)
+    cek_gagal_baca(errors, opsional=['Hourly'])
+    df_order = frames['Order-all']
+    df_iklan = frames['Iklan']
+    
+    # Cek apakah file_seller ada isinya (Optional)
+    if file_seller is not None:
+        df_seller = frames['Seller conversion']
+    else:
+        # Jika tidak ada, buat DataFrame kosong dengan kolom minimal agar tidak error saat merge
+        df_seller = pd.DataFrame(columns=['Kode Pesanan', 'Pengeluaran(Rp)'])
+
+    df_seller_export = df_seller.copy()
+
+    df_hourly = None
+    if 'Hourly' in errors:
+        peringatan(f"⚠️ Gagal membaca file hourly: {errors['Hourly']}")
+    elif file_hourly is not None:
+        try:
+            # ✅ PERBAIKAN: Sheet 'Hourly_Performance' sudah dibaca di atas, skip header row jika perlu
+            df_hourly = frames['Hourly']
+            
+            # ✅ PERBAIKAN: Hapus baris pertama jika itu adalah header duplikat (seperti di file contoh)
+            if df_hourly.iloc[0].astype(str).str.contains('Jam WIB|Lihat|Klik').any():
+                df_hourly = df_hourly.iloc[1:].reset_index(drop=True)
+            
+            # Bersihkan nama kolom
+            df_hourly.columns = df_hourly.columns.str.strip()
+            
+            # Pastikan kolom yang dibutuhkan ada
+            if 'Jam WIB' in df_hourly.columns and 'Lihat' in df_hourly.columns and 'Klik' in df_hourly.columns:
+                # ✅ PERBAIKAN: Konversi Jam WIB - handle format "00:00" atau integer
+                def parse_jam_wib(val):
+                    if pd.isna(val):
+                        return np.nan
+                    val_str = str(val).strip()
+                    # Jika format "00:00", ambil jamnya saja
+                    if ':' in val_str:
+                        return int(val_str.split(':')[0])
+                    # Jika sudah integer/float
+                    return int(float(val_str))
+                
+                df_hourly['Jam WIB'] = df_hourly['Jam WIB'].apply(parse_jam_wib)
+                df_hourly = df_hourly.dropna(subset=['Jam WIB'])
+                df_hourly['Jam WIB'] = df_hourly['Jam WIB'].astype(int)
+                
+                # ✅ PERBAIKAN: Konversi Lihat dan Klik ke numerik dengan lebih robust
+                for col in ['Lihat', 'Klik']:
+                    df_hourly[col] = pd.to_numeric(df_hourly[col], errors='coerce').fillna(0).astype(int)
+                
+            else:
+                peringatan("⚠️ Sheet 'Hourly_Performance' tidak memiliki kolom 'Jam WIB', 'Lihat', atau 'Klik'")
+                df_hourly = None
+        except Exception as e:
+            peringatan(f"⚠️ Gagal membaca file hourly: {e}")
+            logger.debug("Detail error file hourly", exc_info=True)
+            df_hourly = None
+
+
+    # 2. PRE-PROCESS ORDER-ALL
+    # Filter Status Pesanan != Batal dan Belum Bayar
+    if 'Status Pesanan' in df_order.columns:
+        status_filter = ['Batal', 'Belum Bayar']
+        df_order = df_order[~df_order['Status Pesanan'].isin(status_filter)].copy()
+    
+    # Kolom waktu sudah diparse sesuai skema saat file dibaca
+    df_order['Jam'] = df_order['Waktu Pesanan Dibuat'].dt.hour
+    # Ambil tanggal untuk header laporan
+    report_date = df_order['Waktu Pesanan Dibuat'].dt.strftime('%A, %d-%m-%Y').iloc[0] if not df_order.empty else "TANGGAL TIDAK DIKETAHUI"
+
+    df_order_export = df_order.copy()
+    # Order-all
+    for col in ['Total Harga Produk', 'Jumlah', 'Harga Satuan']:
+        if col in df_order.columns:
+            df_order[col] = (
+                df_order[col]
+                .astype(str)
+                .str.replace('Rp', '', regex=False)
+                .str.replace('.', '', regex=False)
+                .str.replace(',', '.', regex=False)
+            )
+            df_order[col] = pd.to_numeric(df_order[col], errors='coerce').fillna(0)
+    
+    # Seller conversion
+    if 'Pengeluaran(Rp)' in df_seller.columns:
+        df_seller['Pengeluaran(Rp)'] = (
+            df_seller['Pengeluaran(Rp)']
+            .astype(str)
+            .str.replace('Rp', '', regex=False)
+            .str.replace('.', '', regex=False)
+            .str.replace(',', '.', regex=False)
+        )
+        df_seller['Pengeluaran(Rp)'] = pd.to_numeric(df_seller['Pengeluaran(Rp)'], errors='coerce').fillna(0)
+
+    # --- HITUNG EKSEMPLAR PER BARIS (GLOBAL) ---
+    # 1. Bersihkan Variasi
+    # df_order['Variasi_Clean'] = df_order['Nama Variasi'].apply(clean_variasi)
+    # # 2. Hitung Total Eksemplar (Eksemplar per unit * Jumlah qty)
+    # # Pastikan Jumlah sudah angka (float/int) dari proses clean sebelumnya
+    # df_order['Eksemplar_Total'] = df_order.apply(
+    #     lambda row: extract_eksemplar(row['Variasi_Clean']) * row['Jumlah'], axis=1
+    # )
+    # 1. Update variasi_clean dengan mengirimkan nama produk
+    df_order['Variasi_Clean'] = apply_unique(clean_variasi, df_order['Nama Variasi'], df_order['Nama Produk'])
+    
+    # 2. Update eksemplar dengan pengali 50 khusus paket wakaf
+    def hitung_eksemplar_custom(row):
+        base_eksemplar = extract_eksemplar(row['Variasi_Clean'])
+        if PRODUK_PAKET_WAKAF_50 in str(row['Nama Produk']):
+            return (base_eksemplar * 50) * row['Jumlah']
+        return base_eksemplar * row['Jumlah']
+    
+    df_order['Eksemplar_Total'] = df_order.apply(hitung_eksemplar_custom, axis=1)
+
+    # 3. PRE-PROCESS IKLAN (Sheet 'Iklan klik')
+    df_iklan.columns = df_iklan.columns.str.strip()
+    df_iklan_export = df_iklan.copy()
+    
+    # Nama Iklan -> nama produk kanonik (kamus nama iklan)
+    if 'Nama Iklan' in df_iklan.columns:
+        # Hapus Duplikat Nama Iklan mentah; iklan berbeda yang dipetakan ke produk yang sama tetap dihitung semua
+        df_iklan = df_iklan.drop_duplicates(subset=['Nama Iklan']).copy()
+        df_iklan['Nama Iklan'] = petakan_nama_iklan(df_iklan['Nama Iklan'], kamus_iklan)
+    
+    # Konversi kolom numerik di iklan
+    cols_to_num = ['Dilihat', 'Jumlah Klik', 'Omzet Penjualan', 'Biaya']
+    for col in cols_to_num:
+        if col in df_iklan.columns:
+            # Hapus simbol mata uang atau pemisah ribuan jika ada
+            df_iklan[col] = df_iklan[col].astype(str).str.replace('Rp', '', regex=False).str.strip().str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+            df_iklan[col] = pd.to_numeric(df_iklan[col], errors='coerce').fillna(0)
+
+    # 4. KATEGORISASI DATA (AFFILIATE, IKLAN, ORGANIK) & HIGHLIGHTING
+    # Setup list untuk tracking
+    list_iklan_names = df_iklan['Nama Iklan'].dropna().unique() if 'Nama Iklan' in df_iklan.columns else []
+
+    # Indeks pesanan Order-all: dipakai untuk penanda affiliate & komisi per jam
+    indeks_order = indeks_pesanan(df_order['No. Pesanan'])
+    pesanan_affiliate = np.zeros(len(indeks_order['pesanan']), dtype=bool)
+    if 'Kode Pesanan' in df_seller.columns:
+        kode_seller = kode_pesanan(indeks_order, df_seller['Kode Pesanan'])
+        pesanan_affiliate[kode_seller[kode_seller >= 0]] = True
+
+    # Buat kolom helper di df_order
+    df_order['is_affiliate'] = pesanan_affiliate[indeks_order['kode']]
+    df_order['is_iklan_product'] = apply_unique(nama_iklan_kanonik, df_order['Nama Produk']).isin(list_iklan_names).to_numpy()
+    
+    # Prioritas: Affiliate > Iklan (match product) > Organik
+    # Namun prompt meminta: "Order all yg termasuk seller conversion (Affiliate)" dan "Diluar Seller Conversion dan Diluar Nama Iklan (Organik)"
+    # Maka Sisanya (Diluar Seller tapi ADA di Nama Iklan) adalah Pesanan Iklan.
+    
+    df_affiliate = df_order[df_order['is_affiliate']].copy()
+    df_organic = df_order[(~df_order['is_affiliate']) & (~df_order['is_iklan_product'])].copy()
+    df_ads_orders = df_order[(~df_order['is_affiliate']) & (df_order['is_iklan_product'])].copy()
+
+    # --- MEMBUAT DATA UNTUK LAPORAN ---
+
+    # A. TABEL PESANAN IKLAN (Jam 0-23)
+    # Prompt: "diambil dari order all dilihat di rentang jam... sum No Pesanan... Kuantitas... Omzet"
+    # Menggunakan df_ads_orders (Pesanan yg berasal dari produk yg diiklanin)
+    
+    # --- AGGREGATION FUNCTIONS ---
+
+    # A. TABEL PESANAN IKLAN (Fixed 24 Jam)
+    hours_fixed = pd.DataFrame({'Jam': range(24)})
+    
+    # def agg_fixed_hours(df_source):
+    #     if df_source.empty:
+    #         return pd.DataFrame({'Jam': range(24), 'PESANAN': 0, 'KUANTITAS': 0, 'OMZET PENJUALAN': 0, 'JUMLAH EKSEMPLAR': 0})
+    #     grp_pesanan = df_source.groupby('Jam')['No. Pesanan'].nunique().reset_index(name='PESANAN')
+    #     grp_metrics = df_source.groupby('Jam')[['Jumlah', 'Total Harga Produk', 'Eksemplar_Total']].sum().reset_index()
+    #     grp_metrics.rename(columns={'Jumlah': 'KUANTITAS', 'Total Harga Produk': 'OMZET PENJUALAN', 'Eksemplar_Total': 'JUMLAH EKSEMPLAR'}, inplace=True)
+    #     merged = hours_fixed.merge(grp_pesanan, on='Jam', how='left').merge(grp_metrics, on='Jam', how='left')
+    #     return merged.fillna(0)
+    def agg_fixed_hours(df_source):
+        if df_source.empty:
+            # Tambahkan kolom LIHAT dan KLIK
+            return pd.DataFrame({
+                'Jam': range(24), 
+                'PESANAN': 0, 
+                'KUANTITAS': 0, 
+                'OMZET PENJUALAN': 0, 
+                'JUMLAH EKSEMPLAR': 0,
+                'LIHAT': 0,
+                'KLIK': 0
+            })
+        
+        grp_pesanan = df_source.groupby('Jam')['No. Pesanan'].nunique().reset_index(name='PESANAN')
+        grp_metrics = df_source.groupby('Jam')[['Jumlah', 'Total Harga Produk', 'Eksemplar_Total']].sum().reset_index()
+        grp_metrics.rename(columns={'Jumlah': 'KUANTITAS', 'Total Harga Produk': 'OMZET PENJUALAN', 'Eksemplar_Total': 'JUMLAH EKSEMPLAR'}, inplace=True)
+        
+        merged = hours_fixed.merge(grp_pesanan, on='Jam', how='left').merge(grp_metrics, on='Jam', how='left')
+        
+        # ============================================================
+        # TAMBAHAN: MERGE DENGAN DATA HOURLY (VIEWS & CLICKS)
+        # ============================================================
+        if df_hourly is not None and not df_hourly.empty:
+            # ✅ DEBUG: Tampilkan data sebelum merge
+            logger.debug("📊 Data hourly sebelum merge:\n%s", df_hourly[['Jam WIB', 'Lihat', 'Klik']].head())
+            logger.debug("📊 Data merged sebelum merge:\n%s", merged[['Jam']].head())
+            
+            # ✅ PERBAIKAN: Pastikan tipe data sama untuk merge
+            df_hourly_merge = df_hourly[['Jam WIB', 'Lihat', 'Klik']].copy()
+            df_hourly_merge = df_hourly_merge.rename(columns={'Jam WIB': 'Jam', 'Lihat': 'LIHAT', 'Klik': 'KLIK'})
+            
+            # ✅ PERBAIKAN: Merge dengan left join
+            merged = merged.merge(df_hourly_merge, on='Jam', how='left')
+            
+            # ✅ DEBUG: Tampilkan hasil merge
+            logger.debug("📊 Data setelah merge:\n%s", merged[['Jam', 'LIHAT', 'KLIK']].head())
+        else:
+            merged['LIHAT'] = 0
+            merged['KLIK'] = 0
+            
+        # ✅ PERBAIKAN: Fill NaN dengan 0 untuk kolom LIHAT dan KLIK
+        merged['LIHAT'] = merged['LIHAT'].fillna(0).astype(int)
+        merged['KLIK'] = merged['KLIK'].fillna(0).astype(int)
+        
+        # ✅ DEBUG: Tampilkan hasil akhir
+        logger.debug("📊 Hasil akhir Tabel 1 (sample):\n%s", merged[['Jam', 'LIHAT', 'KLIK', 'PESANAN']].head())
+        
+        return merged.fillna(0)
+
+    logger.debug("DEBUG Jam dari df_ads_orders:\n%s", df_ads_orders[['Jam']].drop_duplicates().sort_values('Jam').head(10))
+    logger.debug("Tipe data Jam: %s", df_ads_orders['Jam'].dtype)
+    
+    tbl_iklan_data = agg_fixed_hours(df_ads_orders)
+
+    # B. TABEL DINAMIS (AFFILIATE & ORGANIK)
+    def agg_dynamic_hours(df_source, context=""):
+        # PERBAIKAN: Definisikan kolom wajib agar tidak Error saat data kosong
+        expected_cols = ['Jam', 'PESANAN', 'KUANTITAS', 'OMZET PENJUALAN', 'JUMLAH EKSEMPLAR']
+        
+        if df_source.empty:
+            # Kembalikan DataFrame kosong TAPI dengan nama kolom yang sudah disiapkan
+            return pd.DataFrame(columns=expected_cols) 
+        
+        grp_pesanan = df_source.groupby('Jam')['No. Pesanan'].nunique().reset_index(name='PESANAN')
+        grp_metrics = df_source.groupby('Jam')[['Jumlah', 'Total Harga Produk', 'Eksemplar_Total']].sum().reset_index()
+        grp_metrics.rename(columns={'Jumlah': 'KUANTITAS', 'Total Harga Produk': 'OMZET PENJUALAN', 'Eksemplar_Total': 'JUMLAH EKSEMPLAR'}, inplace=True)
+        
+        merged = grp_pesanan.merge(grp_metrics, on='Jam', how='left').fillna(0)
+        merged = merged.sort_values('Jam')
+        return merged
+        
+    # Note: Jika user ingin SEMUA pesanan masuk sini, ganti df_ads_orders dengan df_order. 
+    # Tapi berdasarkan logika tabel Organik, harusnya ini dipisah. Saya gunakan df_ads_orders.
+
+    # C. TABEL RINCIAN IKLAN KLIK
+    total_dilihat = df_iklan['Dilihat'].sum()
+    total_klik = df_iklan['Jumlah Klik'].sum()
+    # Prompt: "Presentase Klik... dari 'Total Iklan Klik' dibagi 'Total Jumlah Klik'". 
+    # Asumsi typo user: maksudnya Klik / Dilihat (CTR) atau Dilihat/Klik. 
+    # Saya gunakan (Klik / Dilihat) * 100 karena %
+    persentase_klik = (total_klik / total_dilihat) if total_dilihat > 0 else 0
+    
+    penjualan_iklan = tbl_iklan_data['OMZET PENJUALAN'].sum()
+
+    # Hitung Biaya Iklan Spesifik
+    # A5 Koran (Kapital di prompt berarti cek spesifik string atau case sensitive? Prompt: "tapi yang kapital")
+    # Interpretasi: Mengandung "A5 Koran" DAN (Original String mengandung substring kapital atau case sensitive match)
+    # Saya akan filter case sensitive untuk "A5 Koran" vs lower.
+    
+    # Helper filter contains
+    def get_omzet_contains(query, case_sensitive=False):
+        if case_sensitive:
+            mask = df_iklan['Nama Iklan'].str.contains(query, case=True, regex=False)
+        else:
+            mask = df_iklan['Nama Iklan'].str.contains(query, case=False, regex=False)
+        return df_iklan[mask]['Biaya'].sum()
+        
+    def get_biaya_regex(pattern):
+        if 'Biaya' not in df_iklan.columns:
+            return 0
+        # pattern sudah dikompilasi di profil toko; '.*' memungkinkan ada kata di tengah (misal: A5 Kertas Koran)
+        mask = df_iklan['Nama Iklan'].str.contains(pattern, regex=True, na=False)
+        return df_iklan[mask]['Biaya'].sum()
+
+    # --- LOGIKA BIAYA IKLAN PER TOKO (lihat RINCIAN_BIAYA_IKLAN_* di profil toko) ---
+    rincian_biaya_khusus = [(label, get_biaya_regex(pattern)) for label, pattern in get_store_profile(toko)['rincian_biaya_iklan']]
+
+    # Hitung Total Biaya Rinci
+    total_biaya_iklan_rinci = sum([val for label, val in rincian_biaya_khusus])
+    
+    # Hitung ROASI
+    roasi = (penjualan_iklan / total_biaya_iklan_rinci) if total_biaya_iklan_rinci > 0 else 0
+
+    # SIAPKAN LIST ITEM UNTUK DITULIS KE EXCEL
+    rincian_items = [
+        ('Total Iklan Dilihat', total_dilihat),
+        ('Total Jumlah Klik', total_klik),
+        ('Presentase Klik', persentase_klik),
+        ('Penjualan Iklan', penjualan_iklan),
+    ]
+    
+    # Masukkan rincian biaya dinamis ke list
+    for label, val in rincian_biaya_khusus:
+        rincian_items.append((label, val))
+        
+    # Tambahkan ROASI di akhir
+    rincian_items.append(('ROASI', roasi))
+    
+    # D. PREP AFFILIATE & ORGANIK DATA
+    tbl_affiliate_data = agg_dynamic_hours(df_affiliate)
+    # Tambah komisi untuk affiliate
+    if not tbl_affiliate_data.empty:
+        # if 'Kode Pesanan' in df_seller.columns and 'Pengeluaran(Rp)' in df_seller.columns:
+        #     df_aff_merged = df_affiliate.merge(df_seller[['Kode Pesanan', 'Pengeluaran(Rp)']], left_on='No. Pesanan', right_on='Kode Pesanan', how='left')
+        #     komisi_per_jam = df_aff_merged.groupby('Jam')['Pengeluaran(Rp)'].sum().reset_index()
+        #     tbl_affiliate_data = tbl_affiliate_data.merge(komisi_per_jam, on='Jam', how='left').fillna(0)
+        #     tbl_affiliate_data.rename(columns={'Pengeluaran(Rp)': 'KOMISI'}, inplace=True)
+        # else:
+        #     tbl_affiliate_data['KOMISI'] = 0
+        if 'Kode Pesanan' in df_seller.columns and 'Pengeluaran(Rp)' in df_seller.columns:
+        
+            # 1. Sum Komisi per pesanan DULU (misal Order ID 123 ada 3 baris komisi, disatukan dulu totalnya)
+            komisi_per_order = total_per_pesanan(indeks_order, df_seller['Kode Pesanan'], df_seller['Pengeluaran(Rp)'])
+            
+            # 2. Komisi tiap pesanan affiliate dibukukan sekali, di jam baris pertama pesanan tersebut
+            awal_affiliate = indeks_order['awal'] & pesanan_affiliate[indeks_order['kode']]
+            komisi_per_jam = pd.DataFrame({
+                'Jam': df_order['Jam'].to_numpy()[awal_affiliate],
+                'KOMISI': komisi_per_order[indeks_order['kode'][awal_affiliate]],
+            }).groupby('Jam')['KOMISI'].sum().reset_index()
+            
+            # 3. Masukkan ke Tabel Akhir
+            tbl_affiliate_data = tbl_affiliate_data.merge(komisi_per_jam, on='Jam', how='left').fillna(0)
+            
+        else:
+            # Jika file seller tidak ada atau kosong
+            tbl_affiliate_data['KOMISI'] = 0
+            
+    tbl_organik_data = agg_dynamic_hours(df_organic)
+
+    # E. TABEL RINCIAN SELURUH PESANAN (Product Level)
+    # 1. Siapkan kolom variasi bersih
+    # df_order['Variasi_Clean'] = df_order['Nama Variasi'].apply(clean_variasi)
+    if 'Nama Variasi' in df_order.columns:
+        df_order['Variasi_Clean'] = apply_unique(clean_variasi, df_order['Nama Variasi'], df_order['Nama Produk'])
+    else:
+        df_order['Variasi_Clean'] = ''
+    
+    # 2. Group by Nama Produk & Variasi
+    # Sum kolom 'Jumlah' untuk mendapatkan total qty produk tersebut
+    grp_rincian = df_order.groupby(['Nama Produk', 'Variasi_Clean']).agg(
+        Kuantitas=('Jumlah', 'sum') 
+    ).reset_index()
+    
+    # 3. Hitung Eksemplar (Kuantitas * Eksemplar per variasi)
+    # grp_rincian['Jumlah Eksemplar'] = grp_rincian.apply(
+    #     lambda row: extract_eksemplar(row['Variasi_Clean']) * row['Kuantitas'], axis=1
+    # )
+    grp_rincian['Jumlah Eksemplar'] = grp_rincian.apply(
+        lambda row: (
+            extract_eksemplar(row['Variasi_Clean']) * 50 * row['Kuantitas']
+            if PRODUK_PAKET_WAKAF_50 in str(row['Nama Produk'])
+            else extract_eksemplar(row['Variasi_Clean']) * row['Kuantitas']
+        ),
+        axis=1
+    )
+
+    # F. TABEL SUMMARY
+    total_omzet_all = 0
+    
+    # 1. Tambah Iklan
+    if 'OMZET PENJUALAN' in tbl_iklan_data.columns:
+        total_omzet_all += tbl_iklan_data['OMZET PENJUALAN'].sum()
+        
+    # 2. Tambah Affiliate (Cek empty dan kolom)
+    if not tbl_affiliate_data.empty and 'OMZET PENJUALAN' in tbl_affiliate_data.columns:
+        total_omzet_all += tbl_affiliate_data['OMZET PENJUALAN'].sum()
+        
+    # 3. Tambah Organik (Cek empty dan kolom)
+    if not tbl_organik_data.empty and 'OMZET PENJUALAN' in tbl_organik_data.columns:
+        total_omzet_all += tbl_organik_data['OMZET PENJUALAN'].sum()
+    
+    # Hitung Komisi
+    total_komisi_aff = 0
+    if not tbl_affiliate_data.empty and 'KOMISI' in tbl_affiliate_data.columns:
+        total_komisi_aff = tbl_affiliate_data['KOMISI'].sum()
+        
+    # Hitung ROASF
+    roasf = total_omzet_all / (total_biaya_iklan_rinci + total_komisi_aff) if (total_biaya_iklan_rinci + total_komisi_aff) > 0 else 0
+
+    # --- MEMBUAT FILE EXCEL ---
+    output = io.BytesIO()
+    writer = pd.ExcelWriter(output, engine='xlsxwriter')
+    workbook = writer.book
+    
+    # FORMATS
+    fmt_header_main = workbook.add_format({'bold': True, 'font_size': 14, 'bg_color': '#ADD8E6', 'align': 'left', 'valign': 'vcenter'})
+    fmt_header_table = workbook.add_format({'bold': True, 'align': 'center', 'valign': 'vcenter', 'border': 1})
+    fmt_date = workbook.add_format({'bold': True, 'align': 'center', 'valign': 'vcenter', 'border': 1})
+    fmt_col_name = workbook.add_format({'bold': True, 'align': 'center', 'border': 1, 'bg_color': '#f0f0f0'})
+    fmt_num = workbook.add_format({'border': 1, 'align': 'center'})
+    fmt_curr = workbook.add_format({'border': 1, 'num_format': '#,##0', 'align': 'center'})
+    fmt_percent = workbook.add_format({'border': 1, 'num_format': '0.00%', 'align': 'center'})
+    fmt_text_left = workbook.add_format({'border': 1, 'align': 'left'})
+
+    # --- FORMAT WARNA HEADER BARU ---
+    # Tabel 1: Orange (#FFA500)
+    fmt_head_orange = workbook.add_format({'bold': True, 'align': 'center', 'border': 1, 'bg_color': '#FFA500'})
+    # Tabel 2: Coklat (#D2691E - Chocolate, agar tulisan hitam masih terbaca)
+    fmt_head_brown = workbook.add_format({'bold': True, 'align': 'center', 'border': 1, 'bg_color': '#D2691E', 'font_color': 'white'})
+    # Tabel 3: Kuning (#FFFF00)
+    fmt_head_yellow = workbook.add_format({'bold': True, 'align': 'center', 'border': 1, 'bg_color': '#FFFF00'})
+    # Tabel 4: Pink (#FFC0CB)
+    fmt_head_pink = workbook.add_format({'bold': True, 'align': 'center', 'border': 1, 'bg_color': '#FFC0CB'})
+    # Tabel 5: Hijau (#90EE90)
+    fmt_head_green = workbook.add_format({'bold': True, 'align': 'center', 'border': 1, 'bg_color': '#90EE90'})
+
+    # TAMBAHKAN INI: Format angka dengan 2 desimal
+    fmt_decimal = workbook.add_format({'border': 1, 'num_format': '0.00', 'align': 'center'})
+    
+    # --- SHEET 1: LAPORAN IKLAN ---
+    # Tiap tabel dideklarasikan sebagai blok (posisi, bagian, format); penulisan & lebar kolom oleh tulis_tata_letak
+    ws_lap = workbook.add_worksheet('LAPORAN IKLAN')
+
+    def kolom_jam(df):
+        return df['Jam'].astype(int).map('{:02d}:00'.format)
+
+    def baris_kosong(jumlah_kolom):
+        # Tabel tanpa data tetap digambar 5 baris kosong bergaris
+        return pd.DataFrame({i: [''] * 5 for i in range(jumlah_kolom)})
+
+    # Tabel 1: PESANAN IKLAN (A-G)
+    cols_t1 = ['JAM', 'LIHAT', 'KLIK', 'PESANAN', 'KUANTITAS', 'OMZET PENJUALAN', 'JUMLAH EKSEMPLAR']
+    isi_t1 = pd.DataFrame({
+        'JAM': kolom_jam(tbl_iklan_data),
+        'LIHAT': tbl_iklan_data['LIHAT'].astype(int),
+        'KLIK': tbl_iklan_data['KLIK'].astype(int),
+        'PESANAN': tbl_iklan_data['PESANAN'].astype(int),
+        'KUANTITAS': tbl_iklan_data['KUANTITAS'].astype(int),
+        'OMZET PENJUALAN': tbl_iklan_data['OMZET PENJUALAN'],
+        'JUMLAH EKSEMPLAR': tbl_iklan_data['JUMLAH EKSEMPLAR'].astype(int),
+    })
+    total_t1 = ['TOTAL'] + [int(tbl_iklan_data[c].sum()) for c in ['LIHAT', 'KLIK', 'PESANAN', 'KUANTITAS']] + [
+        tbl_iklan_data['OMZET PENJUALAN'].sum(), int(tbl_iklan_data['JUMLAH EKSEMPLAR'].sum())]
+
+    # Tabel 2: RINCIAN IKLAN KLIK (I-J), format nilai per baris
+    def format_rincian(label):
+        if 'Presentase' in label: return fmt_percent
+        if 'ROAS' in label: return fmt_decimal
+        if 'Total' in label and ('Dilihat' in label or 'Klik' in label): return fmt_num
+        return fmt_curr # Default currency
+    isi_t2 = pd.DataFrame(rincian_items, columns=['LABEL', 'NILAI'], dtype=object)
+
+    # Tabel 3: PESANAN AFFILIATE (N-S)
+    t3_cols = ['Jam', 'Pesanan', 'Kuantitas', 'Omzet Penjualan', 'Komisi', 'Jumlah Eksemplar']
+    bagian_t3 = [('judul', 'PESANAN AFFILIATE', fmt_head_yellow, 1), ('baris', t3_cols, fmt_col_name)]
+    if tbl_affiliate_data.empty:
+        bagian_t3.append(('tabel', baris_kosong(6), [fmt_num] * 6))
+    else:
+        kolom_t3 = ['PESANAN', 'KUANTITAS', 'OMZET PENJUALAN', 'KOMISI', 'JUMLAH EKSEMPLAR']
+        isi_t3 = tbl_affiliate_data[kolom_t3].copy()
+        isi_t3.insert(0, 'Jam', kolom_jam(tbl_affiliate_data))
+        total_komisi_aff_val = tbl_affiliate_data['KOMISI'].sum()
+        roasa = tbl_affiliate_data['OMZET PENJUALAN'].sum() / total_komisi_aff_val if total_komisi_aff_val > 0 else 0
+        bagian_t3 += [
+            ('tabel', isi_t3, [fmt_num, fmt_num, fmt_num, fmt_curr, fmt_curr, fmt_num]),
+            ('baris', ['TOTAL'] + [tbl_affiliate_data[c].sum() for c in kolom_t3], fmt_col_name, False),
+            ('sel', [('ROASA', fmt_col_name), ('', fmt_num, 2), (roasa, fmt_decimal), ('', fmt_num)], False),
+        ]
+
+    # Tabel 4: PESANAN ORGANIK (N-R)
+    t4_cols = ['Jam', 'Pesanan', 'Kuantitas', 'Omzet Penjualan', 'Jumlah Eksemplar']
+    bagian_t4 = [('judul', 'PESANAN ORGANIK', fmt_head_pink, 1), ('baris', t4_cols, fmt_col_name)]
+    if tbl_organik_data.empty:
+        bagian_t4.append(('tabel', baris_kosong(5), [fmt_num] * 5))
+    else:
+        kolom_t4 = ['PESANAN', 'KUANTITAS', 'OMZET PENJUALAN', 'JUMLAH EKSEMPLAR']
+        isi_t4 = tbl_organik_data[kolom_t4].copy()
+        isi_t4.insert(0, 'Jam', kolom_jam(tbl_organik_data))
+        bagian_t4 += [
+            ('tabel', isi_t4, [fmt_num, fmt_num, fmt_num, fmt_curr, fmt_num]),
+            ('baris', ['TOTAL'] + [tbl_organik_data[c].sum() for c in kolom_t4], fmt_col_name, False),
+        ]
+
+    # Tabel 5: RINCIAN SELURUH PESANAN (I-L)
+    total_seluruh_pesanan_val = tbl_iklan_data['PESANAN'].sum()
+    if not tbl_affiliate_data.empty: total_seluruh_pesanan_val += tbl_affiliate_data['PESANAN'].sum()
+    if not tbl_organik_data.empty: total_seluruh_pesanan_val += tbl_organik_data['PESANAN'].sum()
+    t5_cols = ['Nama Produk', 'Variasi', 'Kuantitas', 'Jumlah Eksemplar']
+
+    # Tabel 6: SUMMARY (I-K)
+    summary_data = [
+        ('Penjualan Keseluruhan', total_omzet_all, fmt_curr),
+        ('Total Biaya Iklan Klik', total_biaya_iklan_rinci, fmt_curr),
+        ('Total Komisi Affiliate', total_komisi_aff, fmt_curr),
+        ('ROASF', roasf, fmt_decimal)
+    ]
+
+    tulis_tata_letak(ws_lap, [
+        {'nama': 'judul', 'baris': 0, 'kolom': 0, 'lebar': 19,
+         'bagian': [('judul', f'LAPORAN IKLAN SHOPEE {toko}', fmt_header_main, 2)]},
+        {'nama': 'iklan', 'baris': 3, 'kolom': 0, 'lebar': 7, 'ribuan': [5],
+         'bagian': [
+             ('judul', 'PESANAN IKLAN', fmt_head_orange, 1),
+             ('judul', report_date, fmt_date, 2),
+             ('baris', cols_t1, fmt_col_name),
+             ('tabel', isi_t1, [fmt_num] * 5 + [fmt_curr, fmt_num]),
+             ('baris', total_t1, fmt_col_name),
+         ]},
+        {'nama': 'rincian_klik', 'baris': 3, 'kolom': 8, 'lebar': 2,
+         'bagian': [
+             ('judul', 'RINCIAN IKLAN KLIK', fmt_head_brown, 1),
+             ('tabel', isi_t2, [fmt_text_left, [format_rincian(label) for label, _ in rincian_items]]),
+         ]},
+        {'nama': 'affiliate', 'baris': 3, 'kolom': 13, 'lebar': 6, 'ribuan': [3], 'bagian': bagian_t3},
+        {'nama': 'organik', 'di_bawah': ('affiliate', 2), 'kolom': 13, 'lebar': 5, 'ribuan': [3], 'bagian': bagian_t4},
+        {'nama': 'rincian_pesanan', 'di_bawah': ('rincian_klik', 2), 'kolom': 8, 'lebar': 4,
+         'bagian': [
+             ('sel', [('RINCIAN SELURUH PESANAN', fmt_head_green), (total_seluruh_pesanan_val, fmt_header_table),
+                      ('', fmt_header_table, 2)], False),
+             ('baris', t5_cols, fmt_col_name),
+             ('tabel', grp_rincian[['Nama Produk', 'Variasi_Clean', 'Kuantitas', 'Jumlah Eksemplar']],
+              [fmt_text_left, fmt_num, fmt_num, fmt_num]),
+             ('sel', [None, None, ("TOTAL EKSEMPLAR", fmt_col_name), (grp_rincian['Jumlah Eksemplar'].sum(), fmt_col_name)]),
+         ]},
+        # Summary mulai 1 baris kosong di bawah baris TOTAL EKSEMPLAR
+        {'nama': 'summary', 'di_bawah': ('rincian_pesanan', 1), 'kolom': 8, 'lebar': 3,
+         'bagian': [('sel', [(label, fmt_text_left, 2), (val, fmt)]) for label, val, fmt in summary_data]},
+    ])
+
+    # --- SIMPAN SHEET LAINNYA ---
+    # 1. order-all (dengan highlight)
+    df_order_export['is_affiliate'] = df_order['is_affiliate']
+    df_order_export['is_iklan_product'] = df_order['is_iklan_product']
+    
+    df_order_export.to_excel(writer, sheet_name='order-all', index=False)
+    ws_order = workbook.get_worksheet_by_name('order-all')
+    
+    # Format Highlight
+    fmt_yellow = workbook.add_format({'bg_color': '#FFFF00'})
+    fmt_pink = workbook.add_format({'bg_color': '#FFC0CB'})
+    
+    # Iterasi untuk highlight
+    # Note: XlsxWriter tidak bisa overwrite format cell dengan mudah tanpa menulis ulang
+    # Kita loop df_order untuk nulis ulang baris dengan format yang sesuai
+    
+    # Get columns for rewrite
+    columns = df_order_export.columns.tolist()
+    
+    for row_idx, row_data in df_order_export.iterrows():
+        row_fmt = None
+        if row_data['is_affiliate']:
+            row_fmt = fmt_yellow
+        # Kondisi Pink: Diluar Affiliate (sudah checked via elif/logic) DAN Diluar Iklan
+        # Logika Highlight Pink: "diluar yang termasuk Seller conversion dan diluar dari Nama Produk yang tidak ada di Nama Iklan"
+        elif not row_data['is_iklan_product']:
+            row_fmt = fmt_pink
+            
+        if row_fmt:
+            for col_idx, col_name in enumerate(columns):
+                # Tulis ulang cell dengan format. Handle datetime convert
+                val = row_data[col_name]
+                # Sederhanakan penulisan (XlsxWriter handle basic types)
+                if pd.isna(val):
+                    ws_order.write(row_idx + 1, col_idx, "", row_fmt)
+                else:
+                     # Check if datetime
+                    if isinstance(val, pd.Timestamp):
+                        ws_order.write_datetime(row_idx + 1, col_idx, val, workbook.add_format({'num_format': 'yyyy-mm-dd hh:mm', 'bg_color': row_fmt.bg_color}))
+                    else:
+                        ws_order.write(row_idx + 1, col_idx, val, row_fmt)
+
+    # 2. Iklan klik (Cleaned)
+    df_iklan_export.to_excel(writer, sheet_name='Iklan klik', index=False)
+    
+    # 3. Seller conversion (Raw)
+    df_seller_export.to_excel(writer, sheet_name='Seller conversion', index=False)
+
+    writer.close()
+    output.seek(0)
+    if return_tables:
+        tables = {
+            'PESANAN IKLAN': tbl_iklan_data,
+            'PESANAN AFFILIATE': tbl_affiliate_data,
+            'PESANAN ORGANIK': tbl_organik_data,
+            'RINCIAN SELURUH PESANAN': grp_rincian,
+        }
+        return output, report_date, tables
+    return output, report_date
+
+
+# ============================================
+# WATCH FOLDER (LAPORAN OTOMATIS TANPA UPLOAD)
+# ============================================
+# Struktur folder: <root>/<folder toko>/[<subfolder batch>/]file-file export Shopee.
+# Satu batch = satu folder. Batch dengan file Income diproses sebagai rekapan mingguan,
+# tanpa Income sebagai laporan iklan harian. Output ditulis di folder batch yang sama.
+
+DAFTAR_TOKO = ["Human Store", "Pacific Bookstore", "DAMA.ID STORE", "Raka Bookstore"]
+
+# Peran file ditebak dari nama file (dicek berurutan, yang pertama cocok dipakai)
+WATCH_POLA_FILE = [
+    ('seller', re.compile(r'seller', re.IGNORECASE)),
+    ('income', re.compile(r'income|dilepas', re.IGNORECASE)),
+    ('hourly', re.compile(r'hourly|klik.?views?|per.?jam', re.IGNORECASE)),
+    ('order', re.compile(r'order', re.IGNORECASE)),
+    ('iklan', re.compile(r'iklan|ads', re.IGNORECASE)),
+]
+WATCH_FILE_WAJIB = {
+    'harian': ['order', 'iklan', 'seller', 'hourly'],
+    'mingguan': ['order', 'income', 'iklan', 'seller'],
+}
+WATCH_PREFIX_OUTPUT = {'harian': 'LAPORAN_IKLAN_', 'mingguan': 'Rekapanku_Shopee_'}
+WATCH_INTERVAL_DETIK = 15
+WATCH_DEBOUNCE_DETIK = 30   # file dianggap selesai ditulis jika ukuran & waktu ubah tidak berubah selama ini
+
+def toko_dari_folder(nama_folder):
+    """Nama toko untuk folder watch ('human', 'DAMA.ID STORE', ...), None jika tidak dikenal."""
+    nama = nama_folder.strip().lower()
+    for toko in DAFTAR_TOKO:
+        if nama == toko.lower() or toko.split()[0].lower().split('.')[0] in nama:
+            return toko
+    return None
+
+def kenali_file_export(nama_file):
+    """Peran file export Shopee dari namanya; None untuk file sementara, output, atau bukan file input."""
+    if nama_file.startswith(('~$', '.')) or not nama_file.lower().endswith(tuple(f'.{e}' for e in EKSTENSI_INPUT)):
+        return None
+    if nama_file.startswith(tuple(WATCH_PREFIX_OUTPUT.values())):
+        return None
+    for peran, pola in WATCH_POLA_FILE:
+        if pola.search(nama_file):
+            return peran
+    return None
+
+def scan_batch(folder):
+    """Peran -> path file terbaru di satu folder batch."""
+    files = {}
+    for entry in os.scandir(folder):
+        if not entry.is_file():
+            continue
+        peran = kenali_file_export(entry.name)
+        if peran and (peran not in files or entry.stat().st_mtime > os.stat(files[peran]).st_mtime):
+            files[peran] = entry.path
+    return files
+
+def jenis_batch(toko, files):
+    """'mingguan' / 'harian' jika set file sudah lengkap, None jika belum."""
+    jenis = 'mingguan' if 'income' in files else 'harian'
+    wajib = list(WATCH_FILE_WAJIB[jenis])
+    if jenis == 'mingguan' and toko == "DAMA.ID STORE":
+        wajib.remove('seller')
+    return jenis if all(peran in files for peran in wajib) else None
+
+def file_stabil(path, riwayat, debounce=WATCH_DEBOUNCE_DETIK, sekarang=None):
+    """True jika file tidak berubah selama `debounce` detik dan (untuk xlsx/zip) sudah berupa zip utuh."""
+    sekarang = time.time() if sekarang is None else sekarang
+    try:
+        st_file = os.stat(path)
+    except FileNotFoundError:
+        riwayat.pop(path, None)
+        return False
+    tanda = (st_file.st_size, st_file.st_mtime)
+    if riwayat.get(path, (None, None))[0] != tanda:
+        riwayat[path] = (tanda, sekarang)
+        return False
+    if sekarang - riwayat[path][1] < debounce:
+        return False
+    return zipfile.is_zipfile(path) if path.lower().endswith(('.xlsx', '.zip')) else True
+
+def batch_sudah_diproses(folder, jenis, files):
+    """True jika sudah ada output yang lebih baru dari semua file input."""
+    input_terbaru = max(os.stat(p).st_mtime for p in files.values())
+    for entry in os.scandir(folder):
+        if entry.is_file() and entry.name.startswith(WATCH_PREFIX_OUTPUT[jenis]) and entry.name.endswith('.xlsx'):
+            if entry.stat().st_mtime >= input_terbaru:
+                return True
+    return False
+
+def _tulis_output(folder, nama_file, data):
+    # Tulis ke file sementara lalu rename, supaya output setengah jadi tidak pernah terlihat
+    path = os.path.join(folder, nama_file)
+    path_tmp = os.path.join(folder, f".{nama_file}.tmp")
+    with open(path_tmp, 'wb') as f:
+        f.write(data.getvalue())
+    os.replace(path_tmp, path)
+    return path
+
+def jalankan_batch_watch(toko, jenis, files, folder, folder_katalog='.'):
+    """Memproses satu batch watch folder dan menulis output di folder batch; mengembalikan path output."""
+    if jenis == 'harian':
+        output, report_date = process_data_iklan_harian(toko, files['order'], files['iklan'], files.get('seller'), files.get('hourly'),
+                                                        kamus_iklan=os.path.join(folder_katalog, KAMUS_IKLAN_FILE))
+        suffix_date = report_date.replace('/', '_')
+        return _tulis_output(folder, f"LAPORAN_IKLAN_{toko.upper()}_{suffix_date}.xlsx", output)
+
+    katalog_df = load_katalog_harga_online(os.path.join(folder_katalog, 'HARGA ONLINE.xlsx'))
+    harga_custom_tlj_df = load_harga_custom_tlj(os.path.join(folder_katalog, 'Harga Custom TLJ.xlsx'))
+    katalog_dama_df = None
+    if toko == "DAMA.ID STORE":
+        katalog_dama_df = load_katalog_dama(os.path.join(folder_katalog, 'KATALOG_DAMA.xlsx'))
+    price_tiers = load_price_tiers(os.path.join(folder_katalog, HARGA_GROSIR_FILE))
+    match_override = load_match_override(os.path.join(folder_katalog, MATCH_OVERRIDE_FILE))
+    hasil = process_rekap_mingguan(toko, files['order'], files['income'], files['iklan'], files.get('seller'),
+                                   katalog_df, katalog_dama_df, harga_custom_tlj_df, price_tiers=price_tiers,
+                                   match_override=match_override, kamus_iklan=os.path.join(folder_katalog, KAMUS_IKLAN_FILE))
+    output = build_rekap_workbook(hasil['sheets'], toko, hasil['date_range_str'])
+    return _tulis_output(folder, nama_file_rekap_mingguan(toko, hasil['date_range_str']), output)
+
+def daftar_batch_watch(root):
+    """(toko, folder batch) untuk setiap folder toko di root dan subfoldernya."""
+    for entry in sorted(os.scandir(root), key=lambda e: e.name):
+        toko = toko_dari_folder(entry.name) if entry.is_dir() else None
+        if toko is None:
+            continue
+        yield toko, entry.path
+        for sub in sorted(os.scandir(entry.path), key=lambda e: e.name):
+            if sub.is_dir() and not sub.name.startswith('.'):
+                yield toko, sub.path
+
+def watch_folder(root, interval=WATCH_INTERVAL_DETIK, debounce=WATCH_DEBOUNCE_DETIK, workers=2,
+                 folder_katalog='.', sekali=False, log=print):
+    """Memantau folder toko dan memproses setiap set export yang lengkap di process pool berukuran `workers`.
+
+    Dengan sekali=True, berhenti setelah semua batch yang siap selesai diproses (untuk cron/tes).
+    """
+    riwayat = {}
+    sedang_jalan = {}   # future -> (folder, tanda file input)
+    gagal = {}          # folder -> tanda file input yang gagal, tidak diulang sampai file berubah
+    with ProcessPoolExecutor(max_workers=workers, mp_context=konteks_proses_worker()) as executor:
+        while True:
+            folder_aktif = {folder for folder, _ in sedang_jalan.values()}
+            ada_yang_menunggu = False
+            for toko, folder in daftar_batch_watch(root):
+                if folder in folder_aktif:
+                    continue
+                files = scan_batch(folder)
+                jenis = jenis_batch(toko, files)
+                if jenis is None:
+                    continue
+                tanda = tuple(sorted((p, os.stat(p).st_mtime) for p in files.values()))
+                if gagal.get(folder) == tanda or batch_sudah_diproses(folder, jenis, files):
+                    continue
+                # Semua file dicek setiap putaran supaya riwayat debounce ikut diperbarui
+                if not all([file_stabil(p, riwayat, debounce) for p in files.values()]):
+                    ada_yang_menunggu = True
+                    continue
+                log(f"[{datetime.now():%H:%M:%S}] Memproses {jenis} {toko}: {folder}")
+                future = executor.submit(jalankan_batch_watch, toko, jenis, files, folder, folder_katalog)
+                sedang_jalan[future] = (folder, tanda)
+
+            if sedang_jalan:
+                selesai, _ = wait(list(sedang_jalan), timeout=0 if not sekali else None, return_when=FIRST_COMPLETED)
+                for future in selesai:
+                    folder, tanda = sedang_jalan.pop(future)
+                    try:
+                        log(f"[{datetime.now():%H:%M:%S}] Selesai: {future.result()}")
+                        gagal.pop(folder, None)
+                    except Exception as e:
+                        gagal[folder] = tanda
+                        log(f"[{datetime.now():%H:%M:%S}] Gagal {folder}: {e}")
+            if sekali and not sedang_jalan and not ada_yang_menunggu:
+                return
+            time.sleep(min(interval, debounce) if ada_yang_menunggu else interval)
+
+def main_watch(argv=None):
+    """CLI: python mysopipi.py watch <root> [--interval N] [--debounce N] [--workers N] [--katalog DIR] [--sekali]"""
+    import argparse
+    parser = argparse.ArgumentParser(prog='mysopipi.py watch', description="Laporan otomatis dari folder export Shopee per toko.")
+    parser.add_argument('root', help="Folder berisi subfolder per toko (mis. 'Human Store', 'dama').")
+    parser.add_argument('--interval', type=float, default=WATCH_INTERVAL_DETIK, help="Jeda antar pemindaian (detik).")
+    parser.add_argument('--debounce', type=float, default=WATCH_DEBOUNCE_DETIK, help="File harus stabil selama ini (detik).")
+    parser.add_argument('--workers', type=int, default=2, help="Jumlah batch yang diproses bersamaan.")
+    parser.add_argument('--katalog', default='.', help="Folder berisi HARGA ONLINE.xlsx, Harga Custom TLJ.xlsx, dst.")
+    parser.add_argument('--sekali', action='store_true', help="Proses batch yang siap lalu berhenti.")
+    args = parser.parse_args(argv)
+    try:
+        watch_folder(args.root, interval=args.interval, debounce=args.debounce, workers=max(1, args.workers),
+                     folder_katalog=args.katalog, sekali=args.sekali)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+# ============================================
+# REGISTRY JOB BERSAMA (ANTAR SESI STREAMLIT)
+# ============================================
+# Semua sesi Streamlit berjalan di satu proses dan modul ini hanya di-import sekali per proses,
+# jadi registry di sini bertahan antar rerun. Proses dengan input identik (hash isi file
+# + parameter) hanya dijalankan sekali; sesi lain menunggu hasil job yang sama.
+
+JOB_BERAT_MAKS = 2        # jumlah proses berat (rekap/iklan) yang boleh berjalan bersamaan
+JOB_SIMPAN_DETIK = 300    # hasil job yang sudah selesai masih dibagikan selama ini
+
+_JOB_REGISTRY = {'lock': threading.Lock(), 'jobs': {}, 'slot': threading.BoundedSemaphore(JOB_BERAT_MAKS)}
+
+def job_registry():
+    """Registry job se-proses, dipakai bersama semua sesi."""
+    return _JOB_REGISTRY
+
+def tanda_file_katalog(folder='.'):
+    """Waktu ubah file katalog, supaya hasil lama tidak dipakai setelah katalog diganti."""
+    tanda = []
+    for nama in ['HARGA ONLINE.xlsx', 'Harga Custom TLJ.xlsx', 'KATALOG_DAMA.xlsx', HARGA_GROSIR_FILE, MATCH_OVERRIDE_FILE, KAMUS_IKLAN_FILE]:
+        path = os.path.join(folder, nama)
+        tanda.append((nama, os.path.getmtime(path) if os.path.exists(path) else None))
+    return tuple(tanda)
+
+def hash_input_job(jenis, files, **params):
+    """Kunci job: hash isi semua file input (upload, BytesIO atau path) dan parameternya."""
+    h = hashlib.sha256(jenis.encode())
+    for f in files:
+        if f is None:
+            data = b''
+        elif hasattr(f, 'getvalue'):
+            data = f.getvalue()
+        else:
+            with open(f, 'rb') as fh:
+                data = fh.read()
+        h.update(len(data).to_bytes(8, 'little'))
+        h.update(data)
+    h.update(repr(sorted(params.items())).encode())
+    return h.hexdigest()
+
+def jalankan_job_bersama(kunci, fungsi, saat_antri=None, registry=None):
+    """Menjalankan `fungsi()` sekali per kunci; pemanggil lain dengan kunci sama menunggu hasil yang sama.
+
+    Job baru menunggu slot jika sudah ada JOB_BERAT_MAKS job berjalan (`saat_antri` dipanggil sekali).
+    Mengembalikan (hasil, ikut) dengan ikut=True jika hasil berasal dari job pemanggil lain.
+    """
+    registry = registry or job_registry()
+    with registry['lock']:
+        sekarang = time.time()
+        for k, job in list(registry['jobs'].items()):
+            if job['selesai'] is not None and sekarang - job['selesai'] > JOB_SIMPAN_DETIK:
+                del registry['jobs'][k]
+        job = registry['jobs'].get(kunci)
+        pemilik = job is None
+        if pemilik:
+            job = {'future': Future(), 'selesai': None}
+            registry['jobs'][kunci] = job
+    if not pemilik:
+        return job['future'].result(), True
+
+    try:
+        if not registry['slot'].acquire(blocking=False):
+            if saat_antri:
+                saat_antri()
+            registry['slot'].acquire()
+        try:
+            hasil = fungsi()
+        finally:
+            registry['slot'].release()
+    except BaseException as e:
+        # Job gagal/dihentikan tidak disimpan; sesi yang menunggu ikut menerima error
+        with registry['lock']:
+            registry['jobs'].pop(kunci, None)
+        job['future'].set_exception(e if isinstance(e, Exception) else RuntimeError("Proses dihentikan di sesi lain, silakan ulangi."))
+        raise
+    job['selesai'] = time.time()
+    job['future'].set_result(hasil)
+    return hasil, False
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == 'watch':
+        sys.exit(main_watch(sys.argv[2:]))
+    print("Pemakaian: python mysopipi_core.py watch <root> [--sekali] ...", file=sys.stderr)
+    sys.exit(2)
@@ -0,0 +1,42 @@
+"""Ingesti paralel (baca_excel_paralel): hasil sama persis dengan jalur serial."""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import mysopipi_core as core
+
+
+@pytest.fixture(scope='module')
+def file_besar(tmp_path_factory):
+    """Dua workbook berukuran export mingguan besar (di atas INGEST_PARALEL_MIN_BYTES, supaya jalur pool benar-benar dipakai)."""
+    folder = tmp_path_factory.mktemp('ingesti')
+    rng = np.random.default_rng(0)
+    paths = []
+    for nama in ['order', 'income']:
+        n = 30000
+        df = pd.DataFrame({
+            'No. Pesanan': [f"25{1000000 + i}ABC" for i in range(n)],
+            'Nama Produk': rng.choice(["AL QUR'AN AL AQEEL A5 KERTAS KORAN", 'HIJAB PASMINA KAOS RAYON'], n),
+            'Jumlah': rng.integers(1, 5, n),
+            'Total Harga Produk': rng.integers(10, 500, n) * 1000,
+        })
+        path = folder / f"{nama}.xlsx"
+        df.to_excel(path, index=False)
+        paths.append(str(path))
+    assert min(os.path.getsize(p) for p in paths) >= core.INGEST_PARALEL_MIN_BYTES
+    return {'Order-all': (paths[0], {}), 'Income': (paths[1], {})}
+
+
+def test_paralel_setara_serial(file_besar):
+    serial, err_serial = core.baca_excel_paralel(file_besar, workers=1)
+    paralel, err_paralel = core.baca_excel_paralel(file_besar, workers=2)
+    assert err_serial == err_paralel == {}
+    for nama, df in serial.items():
+        pd.testing.assert_frame_equal(df, paralel[nama], obj=nama)
+
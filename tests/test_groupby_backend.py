@@ -0,0 +1,108 @@
+"""Kesetaraan engine agregasi pandas & DuckDB (groupby_agg) untuk REKAP dan SUMMARY semua profil toko."""
+import os
+import random
+import sys
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import mysopipi_core as core
+
+pytest.importorskip('duckdb')
+
+# Nama produk & variasi yang memicu aturan khusus tiap toko (paket, custom, harga tier, hijab, ...)
+PRODUK_TOKO = {
+    'Human Store': [
+        ("AL QUR'AN NON TERJEMAH Al AQEEL A5 KERTAS KORAN WAKAF", ["SATUAN", "PAKET ISI 3", "A5,KORAN"]),
+        ("Alquran Cover Emas Kertas HVS Al Aqeel Gold Murah", ["A7 SATUAN", "A7 PAKET ISI 3"]),
+        ("AL QUR'AN EDISI TAHLILAN 30 Juz + Doa Tahlil | Pengganti Buku Yasin | Al Aqeel A6 Pastel HVS Edisi Tahlilan",
+         ["MERAH,Custom sisipan 1 hal", "BIRU,Custom jacket"]),
+        (core.PRODUK_PAKET_WAKAF_50, ["AL AQEEL A5, KORAN"]),
+        ("KAMUS BERGAMBAR 3 BAHASA - INDONESIA INGGRIS ARAB", ["Standar"]),
+    ],
+    'Pacific Bookstore': [
+        ("Al Quran Saku Pastel Al Aqeel A6 Kertas HVS | SURABAYA | Alquran Untuk Wakaf Hadiah Islami Hampers", ["MERAH"]),
+        ("Al Quran Untuk Wakaf Al Aqeel A5 Kertas Koran 18 Baris | SURABAYA | Alquran Hadiah Islami Hampers", ["HIJAU"]),
+        ("Alquran GOLD Hard Cover Al Aqeel Kertas HVS | SURABAYA | Alquran untuk Pengajian Wakaf Hadiah Islami Hampers",
+         ["A5 Gold Satuan", "A7 Gold Paket isi 3"]),
+        ("Al Qur'an Untuk Wakaf Al Aqeel A5 Kertas Koran 18 Baris", ["PAKET ISI 5", "SATUAN"]),
+    ],
+    'DAMA.ID STORE': [
+        ("Paket Hemat Paket Grosir Al Quran | AQ Al Aqeel Wakaf Kerta koran Non Terjemah", ["A5"]),
+        ("Al Quran Gold Silver Al Aqeel Besar Sedang Kecil", ["GOLD,A5 Satuan", "SILVER,A7 Paket isi 3"]),
+        ("HIJAB PASMINA KAOS RAYON COOL TECH BY DAMA", ["HITAM", "SAGE"]),
+        ("Alquran Al Aqeel A5 Kertas Koran Tanpa Terjemahan Wakaf Ibtida", ["PAKET 5", "A5 KK"]),
+    ],
+}
+PRODUK_TOKO['Raka Bookstore'] = PRODUK_TOKO['Human Store']
+
+
+def rupiah(angka):
+    return f"{angka:,}".replace(',', '.')
+
+
+def export_shopee(toko, jumlah_pesanan=150, seed=1):
+    """Order-all, Income, Iklan & Seller conversion sintetis seperti hasil baca file export."""
+    r = random.Random(seed)
+    orders, income, seller = [], [], []
+    awal = pd.Timestamp('2025-12-28 08:00')
+    for i in range(jumlah_pesanan):
+        no = f"25{1000000 + i}ABC"
+        waktu = (awal + pd.Timedelta(minutes=r.randint(0, 60 * 24 * 7))).strftime('%Y-%m-%d %H:%M')
+        retur = r.random() < 0.06
+        total = 0
+        for k in range(r.choice([1, 1, 2, 3])):
+            nama, variasi = r.choice(PRODUK_TOKO[toko])
+            qty, harga = r.randint(1, 4), r.choice([15000, 19500, 21800, 48000])
+            total += qty * harga
+            orders.append({'No. Pesanan': no, 'Status Pesanan': 'Selesai', 'Waktu Pesanan Dibuat': waktu,
+                           'Status Pembatalan/ Pengembalian': 'Permintaan Disetujui' if retur and k == 0 else '',
+                           'Nama Produk': nama, 'Nama Variasi': r.choice(variasi), 'Jumlah': qty,
+                           'Harga Setelah Diskon': rupiah(harga), 'Total Harga Produk': rupiah(harga * qty)})
+        income.append({'No. Pesanan': no, 'No. Pengajuan': f"R{i}" if retur else None, 'Waktu Pesanan Dibuat': waktu,
+                       'Tanggal Dana Dilepaskan': '2026-01-03', 'Voucher dari Penjual': -r.choice([0, 1000]),
+                       'Promo Gratis Ongkir dari Penjual': -r.choice([0, 500]),
+                       'Biaya Administrasi': -round(total * 0.08), 'Biaya Layanan': -round(total * 0.045),
+                       'Biaya Proses Pesanan': -1250, 'Total Penghasilan': 0 if retur else round(total * 0.85)})
+        if r.random() < 0.2:
+            seller.append({'Kode Pesanan': no, 'Pengeluaran(Rp)': r.choice([1500, 2500])})
+    iklan = [{'Nama Iklan': f"{nama} [{r.randint(1, 99)}]", 'Dilihat': r.randint(100, 9000), 'Jumlah Klik': r.randint(5, 300),
+              'Biaya': rupiah(r.randint(10, 400) * 1000), 'Produk Terjual': r.randint(0, 30),
+              'Omzet Penjualan': rupiah(r.randint(0, 900) * 1000)} for nama, _ in PRODUK_TOKO[toko]]
+
+    order_df = core.terapkan_skema(pd.DataFrame(orders).astype({'No. Pesanan': str}), 'order_all')
+    income_df = core.terapkan_skema(pd.DataFrame(income), 'income')
+    iklan_df = core.terapkan_skema(pd.DataFrame(iklan), 'iklan')
+    seller_df = core.terapkan_skema(pd.DataFrame(seller, columns=['Kode Pesanan', 'Pengeluaran(Rp)']), 'seller_conversion')
+    core.clean_rekap_inputs(order_df, income_df, iklan_df, seller_df)
+    return order_df, income_df, iklan_df, seller_df
+
+
+@pytest.fixture(scope='module')
+def katalog():
+    return (core.load_katalog_harga_online(os.path.join(ROOT, 'HARGA ONLINE.xlsx')),
+            core.load_katalog_dama(os.path.join(ROOT, 'KATALOG_DAMA.xlsx')),
+            core.load_harga_custom_tlj(os.path.join(ROOT, 'Harga Custom TLJ.xlsx')))
+
+
+@pytest.mark.parametrize('toko', list(PRODUK_TOKO))
+def test_duckdb_setara_pandas(toko, katalog, tmp_path):
+    katalog_df, katalog_dama_df, harga_custom_tlj_df = katalog
+    override = core.load_match_override(str(tmp_path / core.MATCH_OVERRIDE_FILE))
+    kamus = str(tmp_path / core.KAMUS_IKLAN_FILE)
+    hasil = {}
+    for backend in ['pandas', 'duckdb']:
+        order_df, income_df, iklan_df, seller_df = export_shopee(toko)
+        rekap = core.process_rekap_toko(toko, order_df, income_df, seller_df, backend=backend)
+        agg = core.aggregate_rekap_toko(toko, rekap, backend=backend)
+        iklan = core.process_iklan(iklan_df, backend=backend, kamus_iklan=kamus)
+        summary = core.process_summary_toko(toko, rekap, iklan, katalog_df, katalog_dama_df, harga_custom_tlj_df,
+                                            backend=backend, match_override=override)
+        hasil[backend] = {'REKAP': rekap, 'AGREGAT': agg, 'IKLAN': iklan, 'SUMMARY': summary}
+
+    for nama, df in hasil['pandas'].items():
+        assert len(df) > 0, nama
+        pd.testing.assert_frame_equal(df, hasil['duckdb'][nama], check_exact=True, obj=f"{toko} {nama}")
@@ -0,0 +1,44 @@
+"""Import malas pandas/numpy/rapidfuzz aman dipakai bersamaan dari banyak thread (server Streamlit yang baru start)."""
+import os
+import subprocess
+import sys
+import textwrap
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dijalankan di interpreter baru, supaya pandas dkk. benar-benar belum ter-import saat thread mulai
+SKRIP = textwrap.dedent('''
+    import sys, threading
+    sys.path.insert(0, sys.argv[1])
+    import mysopipi_core as core
+    assert 'pandas' not in sys.modules
+
+    jumlah = 16
+    mulai = threading.Barrier(jumlah)
+    gagal = []
+
+    def sesi(i):
+        mulai.wait()
+        try:
+            core.pd.DataFrame({'a': [i]})
+            core.np.arange(i + 1)
+            core.rapidfuzz.fuzz.token_set_ratio('AL AQEEL A5', 'AL AQEEL A6')
+            nama = core.petakan_nama_iklan(core.pd.Series([f"Produk {i} [1]"]), sys.argv[2])
+            assert nama.tolist() == [f"Produk {i}"]
+        except Exception as e:
+            gagal.append(f"{type(e).__name__}: {e}")
+
+    threads = [threading.Thread(target=sesi, args=(i,)) for i in range(jumlah)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    print(gagal)
+    sys.exit(1 if gagal else 0)
+''')
+
+
+def test_modul_malas_aman_antar_thread(tmp_path):
+    hasil = subprocess.run([sys.executable, '-c', SKRIP, ROOT, str(tmp_path / 'KAMUS NAMA IKLAN.csv')],
+                           capture_output=True, text=True, timeout=120)
+    assert hasil.returncode == 0, hasil.stdout + hasil.stderr
@@ -0,0 +1,28 @@
+"""File bersama (override harga beli, kamus nama iklan) tidak kehilangan baris saat disimpan bersamaan dari banyak sesi."""
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import mysopipi_core as core
+
+
+def test_override_bersamaan(tmp_path):
+    path = str(tmp_path / core.MATCH_OVERRIDE_FILE)
+    with ThreadPoolExecutor(16) as executor:
+        list(executor.map(lambda i: core.simpan_match_override('Human Store', f"PRODUK {i}", 1000 + i, '', path), range(40)))
+    override = core.load_match_override(path)
+    assert sorted(override['HARGA BELI']) == list(range(1000, 1040))
+    assert sorted(os.listdir(tmp_path)) == [f".{core.MATCH_OVERRIDE_FILE}.lock", core.MATCH_OVERRIDE_FILE]
+
+
+def test_kamus_iklan_bersamaan(tmp_path):
+    path = str(tmp_path / core.KAMUS_IKLAN_FILE)
+    with ThreadPoolExecutor(16) as executor:
+        list(executor.map(lambda i: core.simpan_kamus_iklan({f"Iklan {i} [1]": f"Iklan {i}"}, path), range(40)))
+    assert core.load_kamus_iklan(path) == {f"Iklan {i} [1]": f"Iklan {i}" for i in range(40)}
+    assert pd.read_csv(path).shape == (40, 2)
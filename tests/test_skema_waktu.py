@@ -0,0 +1,43 @@
+"""Kolom waktu export: format Shopee ('%Y-%m-%d %H:%M') dan timestamp ISO dengan detik (CSV dari tool sendiri)."""
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import mysopipi_core as core
+
+
+def order_all(waktu):
+    return pd.DataFrame({
+        'No. Pesanan': ['2512310001ABC', '2512310002ABC'],
+        'Waktu Pesanan Dibuat': waktu,
+        'Nama Produk': ['Al Quran A5', 'Al Quran A6'],
+        'Nama Variasi': ['SATUAN', 'SATUAN'],
+        'Jumlah': [1, 2],
+        'Harga Setelah Diskon': ['15.000', '19.500'],
+        'Total Harga Produk': ['15.000', '39.000'],
+        'Status Pembatalan/ Pengembalian': ['', ''],
+    })
+
+
+@pytest.mark.parametrize('waktu', [
+    ['2025-12-31 00:58', '2026-01-02 13:05'],                     # export Shopee
+    ['2025-12-31 00:58:00', '2026-01-02 13:05:00'],               # DataFrame.to_csv
+    ['2025-12-31T00:58:00', '2026-01-02 13:05'],                  # campuran
+])
+def test_waktu_diterima(waktu, tmp_path):
+    path = tmp_path / 'order.csv'
+    order_all(waktu).to_csv(path, index=False)
+    frames, errors = core.baca_excel_paralel({'Order-all': (str(path), 'order_all')})
+    assert errors == {}
+    assert frames['Order-all']['Waktu Pesanan Dibuat'].tolist() == [pd.Timestamp('2025-12-31 00:58'),
+                                                                    pd.Timestamp('2026-01-02 13:05')]
+
+
+def test_waktu_tidak_valid_ditolak():
+    with pytest.raises(ValueError, match="Waktu Pesanan Dibuat.*baris 3"):
+        core.terapkan_skema(order_all(['2025-12-31 00:58', '31/12/2025 00:58']), 'order_all')